@@ -0,0 +1,8 @@
+"""
+Benchmarks for the hot paths of drf_snap_testing.
+
+They run against the sample project, so its dependencies must be installed.
+Run them from the repository root, all of them with `python -m benchmarks`,
+which keeps a history of the results, or one with e.g.
+`python -m benchmarks.filter_render`.
+"""
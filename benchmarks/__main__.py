@@ -0,0 +1,117 @@
+"""
+Run the benchmarks, and keep their results in a history to compare runs with.
+
+Run them all with `python -m benchmarks`, or some with e.g.
+`python -m benchmarks overhead sql_format`. Each run is appended to the history,
+a JSON lines file, along with the commit it ran on, and compared with the last one.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import subprocess  # nosec
+from pathlib import Path
+from typing import Any
+
+from .common import RESULTS
+
+BENCHMARKS = (
+    "bit_setup",
+    "filter_render",
+    "sql_format",
+    "overhead",
+    "database_diff",
+    "database_reset",
+)
+HISTORY = Path(__file__).resolve().parent.parent / ".benchmarks" / "history.jsonl"
+# Changes smaller than this, as a fraction, are reported as noise
+THRESHOLD = 0.1
+
+
+def git_commit() -> str | None:
+    """Return the commit the benchmarks run on, if in a git repository."""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],  # noqa: S603, S607
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(history: Path) -> list[dict[str, Any]]:
+    """Return the runs in the history, from the oldest to the newest."""
+    if not history.exists():
+        return []
+    with history.open() as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def compare(previous: dict[str, Any], results: dict[str, float]) -> None:
+    """Print how the results changed since a previous run."""
+    common = [name for name in results if name in previous["results"]]
+    if not common:
+        return
+
+    print(  # ruff: noqa: T201
+        f"\nCompared with {previous['commit']} ({previous['date']}):",
+    )
+    for name in common:
+        change = results[name] / previous["results"][name] - 1
+        verdict = "noise" if abs(change) < THRESHOLD else "slower"
+        if change <= -THRESHOLD:
+            verdict = "faster"
+        print(f"{name:<56} {change:+8.1%} {verdict}")
+
+
+def main() -> None:
+    """Run the benchmarks, and record their results."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        metavar="BENCHMARK",
+        help=f"The benchmarks to run, out of {', '.join(BENCHMARKS)} (default: all).",
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=HISTORY,
+        help="The JSON lines file the results are kept in.",
+    )
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Don't add the results to the history.",
+    )
+    args = parser.parse_args()
+    if unknown := set(args.benchmarks) - set(BENCHMARKS):
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    for name in args.benchmarks or BENCHMARKS:
+        print(f"\n# {name}")
+        importlib.import_module(f".{name}", __package__).main()
+
+    history = load_history(args.history)
+    if history:
+        compare(history[-1], RESULTS)
+
+    if not args.no_save:
+        run = {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "benchmarks": args.benchmarks or list(BENCHMARKS),
+            "results": RESULTS,
+        }
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with args.history.open("a") as file:
+            file.write(json.dumps(run) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark the per-test setup of the bits."""
+from collections import OrderedDict
+from functools import partial
+from typing import Any
+
+from .common import measure, report, setup_django
+
+
+def main() -> None:
+    """Run the benchmark."""
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from drf_snap_testing import bits
+    from drf_snap_testing.bit import Bit
+    from drf_snap_testing.testcase import SnapGenericHelper
+
+    class Test:
+        """A stand-in for a generated test."""
+
+        bit_templates: dict[str, tuple[int, OrderedDict[str, Bit]]] = {}
+
+    cases: list[tuple[str, dict[str, Any]]] = [
+        ("default bits", {}),
+        (
+            "all bits",
+            {
+                "bits": [
+                    bits.FreezeGun,
+                    bits.TestInfo,
+                    bits.Queries,
+                    bits.Response,
+                    bits.DatabaseDiff,
+                    bits.Mailbox,
+                    bits.VCR,
+                ],
+            },
+        ),
+    ]
+    for name, tam in cases:
+        instantiate = partial(SnapGenericHelper.get_bit_instances, tam)
+        clone = partial(SnapGenericHelper.get_bits, Test(), name, tam)
+
+        legacy = measure(instantiate, number=1000)
+        report(f"instantiate bits per test, {name}", legacy)
+        report(
+            f"clone bit templates per test, {name}",
+            measure(clone, number=1000),
+            baseline=legacy,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import functools
+import os
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable
+
+import django
+
+SAMPLE_PROJECT = Path(__file__).resolve().parent.parent / "sample_project"
+
+# The time per call of everything reported so far, in seconds, by name
+RESULTS: dict[str, float] = {}
+
+
+def setup_django() -> None:
+    """Configure Django with the sample project's settings."""
+    sys.path.insert(0, str(SAMPLE_PROJECT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sample_project.settings")
+    django.setup()
+
+
+@functools.cache
+def setup_test_database() -> None:
+    """Create and migrate a test database, once, and set up the test environment."""
+    # pylint: disable=import-outside-toplevel
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def measure(
+    func: Callable[[], object],
+    number: int = 10,
+    repeat: int = 5,
+    setup: Callable[[], object] | None = None,
+) -> float:
+    """
+    Return the best time per call of the function, in seconds.
+
+    The setup, if any, is called before each repeat, and isn't timed.
+    """
+    times = timeit.repeat(func, setup=setup or "pass", number=number, repeat=repeat)
+    return min(times) / number
+
+
+def report(name: str, seconds: float, baseline: float | None = None) -> None:
+    """
+    Print the time per call, and the speedup against a baseline if given.
+
+    It's also kept in RESULTS, for the history of the results.
+    """
+    RESULTS[name] = seconds
+    line = f"{name:<56} {seconds * 1e3:10.3f} ms"
+    if baseline is not None:
+        line += f" {baseline / seconds:8.2f}x"
+    print(line)  # ruff: noqa: T201
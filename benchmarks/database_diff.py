@@ -0,0 +1,72 @@
+"""Benchmark the DatabaseDiff capture modes on a large table."""
+import time
+import tracemalloc
+from typing import Any, Type
+
+from .common import RESULTS, setup_django, setup_test_database
+
+ROWS = 50_000
+
+
+def run(snippet_model: Type[Any], capture: str) -> tuple[float, int, Any]:
+    """Diff a test that changes a single row, returning the time and memory peak."""
+    # pylint: disable=import-outside-toplevel
+    from django.db import transaction
+
+    from drf_snap_testing.bits import DatabaseDiff
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with transaction.atomic():
+        bit = DatabaseDiff(models=[snippet_model], capture=capture)
+        with bit:
+            snippet = snippet_model.objects.get(pk=ROWS // 2)
+            snippet.title = "changed"
+            snippet.save()
+        data = bit.data
+        transaction.set_rollback(rollback=True)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, data
+
+
+def main() -> None:
+    """Run the benchmark."""
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.apps import apps
+    from django.contrib.auth.models import User
+    from django.db import transaction
+
+    snippet_model = apps.get_model("snippets", "Snippet")
+    setup_test_database()
+    # Everything is rolled back, for the other benchmarks to run after this one
+    with transaction.atomic():
+        owner = User.objects.create(username="owner")
+        snippet_model.objects.bulk_create(
+            snippet_model(title=f"snippet {i}", code="print()\n" * 10, owner=owner)
+            for i in range(ROWS)
+        )
+
+        results = {
+            capture: run(snippet_model, capture)
+            for capture in ("full", "signals", "stream")
+        }
+        transaction.set_rollback(rollback=True)
+
+    for capture, (seconds, peak, data) in results.items():
+        if data != results["signals"][2]:
+            msg = f'The "{capture}" capture doesn\'t match the others'
+            raise AssertionError(msg)
+        name = f'DatabaseDiff, capture="{capture}" ({ROWS} rows)'
+        RESULTS[name] = seconds
+        print(  # ruff: noqa: T201
+            name.ljust(56),
+            f"{seconds * 1e3:10.3f} ms {peak / 2**20:8.2f} MB peak",
+        )
+
+
+if __name__ == "__main__":
+    main()
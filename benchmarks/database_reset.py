@@ -0,0 +1,52 @@
+"""Benchmark resetting the test database between transactional tests."""
+from .common import measure, report, setup_django, setup_test_database
+
+ROWS = 10_000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.apps import apps
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import connection
+
+    from drf_snap_testing.reset import SNAPSHOT_CLASSES
+
+    setup_test_database()
+    snapshot = SNAPSHOT_CLASSES[connection.vendor](connection)
+    # The data of the migrations, as a serialized rollback reloads it
+    migrated = connection.creation.serialize_db_to_string()
+    snippet_model = apps.get_model("snippets", "Snippet")
+
+    def populate() -> None:
+        """Commit what a test leaves behind, for each reset to remove."""
+        owner = User.objects.create(username="reset")
+        snippet_model.objects.bulk_create(
+            snippet_model(title=f"snippet {row}", code="print()", owner=owner)
+            for row in range(ROWS)
+        )
+
+    def flush() -> None:
+        """Flush every table, and reload the data of the migrations."""
+        call_command("flush", verbosity=0, interactive=False)
+        connection.creation.deserialize_db_from_string(migrated)
+
+    flush_time = measure(flush, number=1, setup=populate)
+    report("flush and reload, as TransactionTestCase", flush_time)
+    report(
+        f"{type(snapshot).__name__} restore",
+        measure(snapshot.restore, number=1, setup=populate),
+        baseline=flush_time,
+    )
+
+    # The data of the migrations is back, for the other benchmarks to run after this one
+    snapshot.restore()
+    snapshot.discard()
+
+
+if __name__ == "__main__":
+    main()
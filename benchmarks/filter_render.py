@@ -0,0 +1,72 @@
+"""Benchmark Bit.filter_render on multi-megabyte renders."""
+import re
+from functools import partial
+
+from .common import measure, report, setup_django
+
+
+def legacy_filter_render(ignore_list: list[bytes], content: bytes) -> bytes:
+    """Filter the render the way Bit.filter_render used to, for comparison."""
+    lines = content.split(b"\n")
+
+    for ignore in ignore_list:
+        regex = re.compile(ignore)
+        lines = [line for line in lines if not regex.match(line)]
+
+    return b"\n".join(lines)
+
+
+def queries_render(queries: int) -> bytes:
+    """Build a render shaped like the one of an N+1-heavy endpoint."""
+    query = (
+        b"- sql: |-\n"
+        b'    SELECT "snippets_snippet"."id",\n'
+        b'           "snippets_snippet"."title",\n'
+        b'           "snippets_snippet"."owner_id"\n'
+        b'    FROM "snippets_snippet"\n'
+        b'    WHERE "snippets_snippet"."owner_id" = %d\n'
+        b"  time: 0.001\n"
+    )
+    return b"default:\n" + b"".join(query % i for i in range(queries))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from drf_snap_testing.bits import Queries, Response
+
+    cases = [
+        ("Queries", Queries()),
+        (
+            "Queries, 4 patterns",
+            Queries(
+                ignore_list=[
+                    *Queries.ignore_list,
+                    rb"^\s*-?\sduration: \d+$",
+                    rb"^\s*-?\scursor: \d+$",
+                    rb"^\s*-?\sconnection: \w+$",
+                ],
+            ),
+        ),
+        ("Response, no patterns", Response()),
+    ]
+    for queries in (10_000, 50_000):
+        content = queries_render(queries)
+        size = f"{len(content) / 2**20:.1f} MB"
+
+        for name, bit in cases:
+            legacy_result = legacy_filter_render(bit.ignore_list, content)
+            if legacy_result != bit.filter_render(content):
+                msg = "filter_render doesn't match the legacy implementation"
+                raise AssertionError(msg)
+
+            legacy = measure(partial(legacy_filter_render, bit.ignore_list, content))
+            current = measure(partial(bit.filter_render, content))
+            report(f"legacy filter_render, {name} ({size})", legacy)
+            report(f"filter_render, {name} ({size})", current, baseline=legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Benchmark the per-test overhead of the framework, and of each bit, on big tests."""
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Any, cast
+
+from .common import measure, report, setup_django, setup_test_database
+
+# ruff: noqa: S608
+
+QUERIES = 1000
+ROWS = 10_000
+BODY_SIZE = 2**20
+
+
+def test_attrs(tests: int) -> dict[str, Any]:
+    """Build the attributes of a test case with that many tests, nested 3 deep."""
+    return {
+        "__module__": __name__,
+        "url_pattern_name": "snippet-list",
+        "user": None,
+        **{
+            f"Group{group}": type(
+                f"Group{group}",
+                (),
+                {
+                    "method": "GET",
+                    **{
+                        f"Test{group}x{test}": type(
+                            f"Test{group}x{test}",
+                            (),
+                            {"data": {"page": test}},
+                        )
+                        for test in range(10)
+                    },
+                },
+            )
+            for group in range(tests // 10)
+        },
+    }
+
+
+def render(bit: Any, value: Any) -> bytes:
+    """Render a fresh clone of the bit with the value, like a test does."""
+    clone = bit.clone()
+    clone.value = value
+    return bytes(clone.render)
+
+
+def main() -> None:  # pylint: disable=too-many-locals
+    """Run the benchmark."""
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from django.apps import apps
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from drf_snap_testing import bits
+    from drf_snap_testing.testcase import (
+        SnapAPITestCase,
+        SnapGenericHelper,
+        SnapTestCaseMetaclass,
+    )
+
+    setup_test_database()
+
+    # The metaclass expansion of the test cases
+    attrs = test_attrs(100)
+
+    def resolve() -> None:
+        list(SnapTestCaseMetaclass.resolve_test_attrs(attrs))
+
+    def create() -> None:
+        bases = cast(tuple[type[type]], (SnapAPITestCase,))
+        SnapTestCaseMetaclass("Benchmark", bases, dict(attrs))
+
+    report("resolve_test_attrs, 100 tests", measure(resolve))
+    report("test case class creation, 100 tests", measure(create))
+
+    # The bits of each test
+    all_bits = {
+        "bits": [
+            bits.FreezeGun,
+            bits.TestInfo,
+            bits.Queries,
+            bits.Response,
+            bits.DatabaseDiff,
+            bits.Mailbox,
+            bits.VCR,
+        ],
+    }
+    report(
+        "get_bit_instances, all bits",
+        measure(partial(SnapGenericHelper.get_bit_instances, all_bits), number=1000),
+    )
+
+    queries_benchmarks()
+
+    # Everything is rolled back, for the other benchmarks to run after this one
+    with transaction.atomic():
+        snippet_model = apps.get_model("snippets", "Snippet")
+        owner = User.objects.create(username="overhead")
+
+        # Rendering a big response
+        snippet = snippet_model.objects.create(
+            title="big",
+            code="x" * BODY_SIZE,
+            language="text",
+            owner=owner,
+        )
+        client = APIClient()
+        client.force_authenticate(owner)
+        response = client.get(reverse("snippet-detail", kwargs={"pk": snippet.pk}))
+        response_body(response)
+
+        # Diffing a big table, where a single row changes
+        snippet_model.objects.bulk_create(
+            snippet_model(title=f"snippet {row}", code="print()", owner=owner)
+            for row in range(ROWS)
+        )
+        changed = snippet_model.objects.filter(title="snippet 0").get()
+        for capture in ("full", "signals", "stream"):
+            diff = bits.DatabaseDiff(models=[snippet_model], capture=capture)
+            report(
+                f'DatabaseDiff, capture="{capture}", {ROWS} rows',
+                measure(partial(diff_test, diff, changed), number=1),
+            )
+
+        transaction.set_rollback(rollback=True)
+
+
+def queries_benchmarks() -> None:
+    """Benchmark rendering, filtering, reading and diffing a test with many queries."""
+    # pylint: disable=import-outside-toplevel
+    from drf_snap_testing import bits
+    from drf_snap_testing.diff import diff_renders
+    from drf_snap_testing.storage import FileStorage
+
+    # Rendering and filtering a test with many queries
+    queries = bits.Queries()
+    queries_value = {
+        "default": [
+            {
+                "sql": 'SELECT "snippets_snippet"."id", "snippets_snippet"."title" '
+                f'FROM "snippets_snippet" WHERE "snippets_snippet"."id" = {query}',
+                "time": "0.001",
+            }
+            for query in range(QUERIES)
+        ],
+    }
+    queries_render = render(queries, queries_value)
+    report(
+        f"Queries render, {QUERIES} queries",
+        measure(partial(render, queries, queries_value)),
+    )
+    report(
+        f"Queries render, fingerprint=True, {QUERIES} queries",
+        measure(partial(render, bits.Queries(fingerprint=True), queries_value)),
+    )
+    report(
+        f"filter_render, Queries, {QUERIES} queries",
+        measure(partial(queries.filter_render, queries_render)),
+    )
+
+    # Listing the differences of a mismatching snapshot
+    changed_value = {
+        "default": [*queries_value["default"][1:], {"sql": "", "time": "0"}],
+    }
+    report(
+        f"diff_renders, Queries, {QUERIES} queries",
+        measure(
+            partial(diff_renders, queries_render, render(queries, changed_value), 50),
+        ),
+    )
+
+    # Reading the snapshot of the last run
+    with tempfile.TemporaryDirectory() as directory:
+        storage = FileStorage()
+        snapshot = queries.clone()
+        snapshot.directory = Path(directory)
+        snapshot.storage = storage
+        snapshot.value = queries_value
+        snapshot.write()
+
+        def read() -> bytes:
+            return snapshot.previous_render
+
+        report(f"previous_render, Queries, {QUERIES} queries", measure(read))
+
+
+def response_body(response: Any) -> None:
+    """Benchmark the rendering of a big response, and the encoders of its body."""
+    # pylint: disable=import-outside-toplevel
+    from drf_snap_testing import bits, encoders
+
+    report(
+        f"Response render, {BODY_SIZE // 2**20} MB body",
+        measure(partial(render, bits.Response(), response), number=1),
+    )
+    report(
+        f"Response render, include_body=False, {BODY_SIZE // 2**20} MB body",
+        measure(partial(render, bits.Response(include_body=False), response)),
+    )
+    report(
+        f"ResponseBody render, {BODY_SIZE // 2**20} MB body",
+        measure(partial(render, bits.ResponseBody(), response)),
+    )
+    report(
+        f"Response render, content=True, {BODY_SIZE // 2**20} MB body",
+        measure(partial(render, bits.Response(content=True), response), number=1),
+    )
+    report(
+        f"ResponseBody render, content=True, {BODY_SIZE // 2**20} MB body",
+        measure(partial(render, bits.ResponseBody(content=True), response)),
+    )
+    for encoder in (encoders.json_body, encoders.canonical_json_body):
+        report(
+            f"{encoder.__name__}, {BODY_SIZE // 2**20} MB body",
+            measure(partial(encoder, response.data)),
+        )
+
+
+def diff_test(diff: Any, snippet: Any) -> bytes:
+    """Run a test that changes a single row, with a fresh clone of the DatabaseDiff."""
+    # pylint: disable=import-outside-toplevel
+    from django.db import transaction
+
+    clone = diff.clone()
+    with transaction.atomic():
+        with clone:
+            snippet.title = "changed"
+            snippet.save()
+        transaction.set_rollback(rollback=True)
+    return bytes(clone.render)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark the SQL formatting of the Queries bit on a repetitive workload."""
+from .common import measure, report, setup_django
+
+# ruff: noqa: S608
+
+# A handful of ORM statements, repeated like they are across a test suite
+STATEMENTS = [
+    'SELECT "snippets_snippet"."id", "snippets_snippet"."created", '
+    '"snippets_snippet"."title", "snippets_snippet"."code", '
+    '"snippets_snippet"."owner_id" FROM "snippets_snippet" '
+    f'WHERE "snippets_snippet"."owner_id" = {owner} '
+    'ORDER BY "snippets_snippet"."created" ASC'
+    for owner in range(10)
+] + [
+    'SELECT "auth_user"."id", "auth_user"."password", "auth_user"."username" '
+    'FROM "auth_user" WHERE "auth_user"."id" = 1 LIMIT 21',
+    'INSERT INTO "snippets_snippet" ("created", "title", "code", "owner_id") '
+    "VALUES ('2023-01-01 00:00:00', 'title', 'code', 1) RETURNING "
+    '"snippets_snippet"."id"',
+]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    setup_django()
+
+    # pylint: disable=import-outside-toplevel
+    from drf_snap_testing.serializers.fields import SQLField
+    from drf_snap_testing.sql_cache import format_sql, sql_format_cache
+
+    field = SQLField()
+    workload = STATEMENTS * 50
+
+    def uncached() -> None:
+        for sql in workload:
+            format_sql(sql)
+
+    def cached() -> None:
+        for sql in workload:
+            field.to_representation(sql)
+
+    baseline = measure(uncached, number=1)
+    report(f"sqlparse.format, {len(workload)} statements", baseline)
+    report(
+        f"SQLField, {len(workload)} statements",
+        measure(cached, number=1),
+        baseline=baseline,
+    )
+    print(  # ruff: noqa: T201
+        f"cache: {sql_format_cache.hits} hits, {sql_format_cache.misses} misses",
+    )
+
+
+if __name__ == "__main__":
+    main()
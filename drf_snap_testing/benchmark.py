@@ -0,0 +1,111 @@
+import math
+import os
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Iterable, Mapping, TypedDict
+
+from django.db import transaction
+
+from .capture import QueryCapture
+from .records import TestRecords
+from .settings import snap_settings
+
+# Benchmarks every test, with this many repeats, when set.
+# The workers of Django's parallel runner inherit the environment of the main process.
+BENCHMARK_VARIABLE = "DRF_SNAP_TESTING_BENCHMARK"
+
+
+class BenchmarkResult(TypedDict):
+    """The latencies of the repeats of a request, in seconds, and its queries."""
+
+    repeats: int
+    warmup: int
+    min_time: float
+    median_time: float
+    p95_time: float
+    queries: int
+
+
+def get_benchmark(tam: Mapping[str, Any]) -> tuple[int, int] | None:
+    """
+    Return how many times to repeat the request of a test, and to warm it up.
+
+    The benchmark test attribute is either the repeats, or a dict of the repeats
+    and warmup. Setting DRF_SNAP_TESTING_BENCHMARK to the repeats benchmarks every
+    test. Unless set, the warmup is BENCHMARK_WARMUP.
+    """
+    benchmark = tam.get("benchmark")
+    if benchmark and not isinstance(benchmark, Mapping):
+        benchmark = {"repeats": benchmark}
+    if env_repeats := os.environ.get(BENCHMARK_VARIABLE):
+        benchmark = {**(benchmark or {}), "repeats": int(env_repeats)}
+    if not benchmark:
+        return None
+
+    repeats = int(benchmark["repeats"])
+    warmup = int(benchmark.get("warmup", snap_settings.BENCHMARK_WARMUP))
+    if repeats < 1 or warmup < 0:
+        msg = f"Invalid benchmark {benchmark}, it must repeat at least once"
+        raise ValueError(msg)
+    return repeats, warmup
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Return the percentile of the values, by the nearest-rank method."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(len(ordered) * percent / 100) - 1, 0)]
+
+
+def run_benchmark(
+    request: Callable[[], Any],
+    db_aliases: Iterable[str],
+    repeats: int,
+    warmup: int,
+) -> BenchmarkResult:
+    """
+    Repeat the request, timing it and counting its queries.
+
+    Each request runs in a savepoint that's rolled back, so they all see
+    the same data, whatever they write. The warmup requests aren't measured.
+    """
+    db_aliases = list(db_aliases)
+    latencies: list[float] = []
+    queries: list[int] = []
+    for repeat in range(warmup + repeats):
+        with ExitStack() as stack:
+            for db_alias in db_aliases:
+                stack.enter_context(transaction.atomic(using=db_alias))
+                stack.callback(transaction.set_rollback, rollback=True, using=db_alias)
+            capture = stack.enter_context(QueryCapture(db_aliases))
+
+            start = time.perf_counter()
+            request()
+            latency = time.perf_counter() - start
+
+        if repeat >= warmup:
+            latencies.append(latency)
+            queries.append(sum(map(len, capture.captured.values())))
+
+    return {
+        "repeats": repeats,
+        "warmup": warmup,
+        "min_time": round(min(latencies), 6),
+        "median_time": round(statistics.median(latencies), 6),
+        "p95_time": round(percentile(latencies, 95), 6),
+        "queries": statistics.median_low(queries),
+    }
+
+
+class BenchmarkResults(TestRecords[BenchmarkResult]):
+    """
+    The benchmark results of the snapshot tests, by test id.
+
+    They're kept in the JSON file set by BENCHMARK_PATH,
+    to be compared with the results of other runs.
+    """
+
+    setting = "BENCHMARK_PATH"
+
+
+benchmark_results = BenchmarkResults()
@@ -1,12 +1,24 @@
+import copy
 import functools
+import itertools
 import re
 import sys
 from pathlib import Path
-from typing import Any, Callable, TypedDict, cast
+from typing import Any, Callable, TypedDict, TypeVar, cast
 
 from drf_yaml.renderers import YAMLRenderer
 from rest_framework import renderers, serializers
 
+from .digests import content_digest
+from .records import TestRecords
+from .settings import snap_settings
+from .storage import SnapshotStorage
+
+_B = TypeVar("_B", bound="Bit")
+
+# The flags of the patterns without inline global flags
+DEFAULT_FLAGS = re.compile(b"").flags
+
 
 class SerializerParams(TypedDict):
     """The parameters passed to the serializer."""
@@ -16,6 +28,46 @@ class SerializerParams(TypedDict):
     context: dict[str, Any]
 
 
+@functools.cache
+def compile_ignore_list(
+    ignore_list: tuple[bytes, ...],
+) -> Callable[[bytes], object] | None:
+    """
+    Return a function matching the lines that any of the ignore patterns match.
+
+    Bits of the same class share their ignore_list, so it's compiled only once.
+    The patterns are combined into a single alternation, unless any of them has
+    groups or global flags, which wouldn't mean the same within the alternation.
+    """
+    if not ignore_list:
+        return None
+    patterns = [re.compile(pattern) for pattern in ignore_list]
+    if len(patterns) == 1:
+        return patterns[0].match
+    if any(pattern.groups or pattern.flags != DEFAULT_FLAGS for pattern in patterns):
+        return lambda line: any(pattern.match(line) for pattern in patterns)
+    return re.compile(
+        b"|".join(b"(?:" + pattern + b")" for pattern in ignore_list),
+    ).match
+
+
+@functools.cache
+def configuration_digest(configuration: tuple[Any, ...]) -> str:
+    """Return the digest of the configuration of a bit, once per configuration."""
+    return content_digest(repr(configuration).encode())
+
+
+@functools.cache
+def cached_properties(cls: type) -> tuple[str, ...]:
+    """Return the names of the cached properties of the class."""
+    return tuple(
+        name
+        for klass in cls.__mro__
+        for name, value in vars(klass).items()
+        if isinstance(value, functools.cached_property)
+    )
+
+
 def dynamic_path(
     test: Callable[[Any], None],
     *_args: Any,
@@ -39,6 +91,17 @@ def dynamic_path(
 
 
 class Bit:
+    # What the generic tests set as the value: response, testinfo or mailbox.
+    # Defaults to the key of the bit
+    source: str | None = None
+    # Whether the bit needs DEBUG=True during the test, like to read connection.queries
+    requires_debug = False
+    # Whether the render is compared with the file. If it isn't, like for
+    # measurements that vary from run to run, nothing is kept with the snapshots,
+    # and the data is recorded by test id in the records of the bit instead
+    compared = True
+    records: TestRecords[Any] | None = None
+
     # ruff: noqa: PLR0913
     def __init__(  # pylint: disable=too-many-arguments
         self,
@@ -112,18 +175,68 @@ class Bit:
         # 2. The many attribute on the class
         self.many = many if many is not None else getattr(self, "many", False)
 
-        # The value and directory will be set after instantiation on the testcase itself
+        # The value, directory and storage will be set after instantiation
+        # on the testcase itself
         self.value: Any | None = None
         self.directory: Path | None = None
+        self.storage: SnapshotStorage | None = None
+
+    def clone(self: _B) -> _B:
+        """
+        Return a copy of the bit, ready to be used by another test.
+
+        The copy shares the configuration of the bit, which is only resolved once,
+        but none of the state left behind by the tests that used it.
+        """
+        clone = copy.copy(self)
+        clone.reset()
+        return clone
+
+    def reset(self) -> None:
+        """
+        Forget the state left behind by a test, including the cached renders.
+
+        Bits that keep any other state during a test must extend it,
+        as their clones would share that state otherwise.
+        """
+        self.value = None
+        self.directory = None
+        self.storage = None
+        for name in cached_properties(cast(type, self.__class__)):
+            self.__dict__.pop(name, None)
+
+    def check(self) -> None:
+        """
+        Make the bit's own assertions about the test, besides matching the snapshot.
+
+        It's called after the test, and does nothing by default.
+        """
+
+    def record(self, test_id: str) -> None:
+        """Record the data of the test, if the bit has records and a value."""
+        if self.records is not None and self.value is not None:
+            self.records.record(test_id, self.data)
+
+    def display(self, content: bytes) -> bytes | str:
+        """
+        Return a render as it's displayed when it doesn't match the file.
+
+        It's only called on a mismatch, for a readable diff,
+        and returns the render as is by default.
+        """
+        return content
 
     def filter_render(self, content: bytes) -> bytes:
-        """Filter out lines that should not be compared."""
-        lines = content.split(b"\n")
+        """
+        Filter out lines that should not be compared.
 
-        for ignore in self.ignore_list:
-            regex = re.compile(ignore)
-            lines = [line for line in lines if not regex.match(line)]
+        All the ignore patterns are matched in a single pass over the lines.
+        """
+        match = compile_ignore_list(tuple(self.ignore_list))
+        if match is None:
+            return content
 
+        lines = itertools.filterfalse(match, content.split(b"\n"))
         return b"\n".join(lines)
 
     @functools.cached_property
@@ -139,13 +252,40 @@ class Bit:
 
         return cast(bytes, self.renderer.render(self.data))
 
+    @property
+    def configuration_digest(self) -> str:
+        """
+        The digest of how the bit renders and filters its data.
+
+        A change of the ignore patterns or of the serializer or renderer class
+        can leave the filtered render as it was, while the file no longer matches.
+        """
+        configuration: tuple[Any, ...] = (
+            type(self),
+            type(self.renderer),
+            self.serializer_class,
+            self.many,
+            tuple(self.ignore_list),
+        )
+        return configuration_digest(configuration)
+
+    @functools.cached_property
+    def digest(self) -> str:
+        """The digest of the filtered render, and of the bit's configuration."""
+        return content_digest(self.configuration_digest.encode() + self.render)
+
+    @property
+    def serializer_context(self) -> dict[str, Any]:
+        """The context passed to the serializer."""
+        return {}
+
     @property
     def data(self) -> Any:
         """The data to render."""
         serializer_args: SerializerParams = {
             "instance": self.value,
             "many": self.many,
-            "context": {},
+            "context": self.serializer_context,
         }
         return self.serializer_class(**serializer_args).data
 
@@ -161,16 +301,32 @@ class Bit:
 
         return self.directory / self.filename
 
+    @property
+    def snapshot_storage(self) -> SnapshotStorage:
+        """The storage the file is kept in (default: DEFAULT_SNAP_STORAGE)."""
+        if self.storage is None:
+            return cast(SnapshotStorage, snap_settings.DEFAULT_SNAP_STORAGE)
+        return self.storage
+
     @property
     def previous_render(self) -> bytes:
         """Read the current file."""
-        try:
-            return self.filter_render(self.path.read_bytes())
-        except FileNotFoundError:
+        content = self.snapshot_storage.read(self.path)
+        if content is None:
             return b""
+        return self.filter_render(content)
+
+    @property
+    def previous_digest(self) -> str | None:
+        """The digest of the current file, as recorded by the bit, if it's known."""
+        return self.snapshot_storage.get_digest(self.path)
+
+    def record_digest(self) -> None:
+        """Record the digest of the render, if the file exists."""
+        self.snapshot_storage.set_digest(self.path, self.digest)
 
     def write(self) -> None:
         """Save the file."""
         render = self.unfiltered_render
         if render:
-            self.path.write_bytes(render)
+            self.snapshot_storage.write(self.path, render, self.digest)
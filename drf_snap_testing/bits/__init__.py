@@ -1,8 +1,11 @@
 from .database_diff import DatabaseDiff
 from .freezegun import FreezeGun
+from .load import Load
 from .mailbox import Mailbox
+from .profile import Profile
 from .queries import Queries
 from .response import Response
+from .response_body import ResponseBody
 from .starter import Starter
 from .test_info import TestInfo
 from .thing import Thing
@@ -14,8 +17,11 @@ __all__ = (
     "Thing",
     "TestInfo",
     "Response",
+    "ResponseBody",
     "DatabaseDiff",
     "FreezeGun",
     "Mailbox",
+    "Profile",
+    "Load",
     "VCR",
 )
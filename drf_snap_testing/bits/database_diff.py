@@ -1,10 +1,13 @@
-from typing import Any, Literal, Type, cast
+from typing import Any, Iterable, Literal, Type, cast
 
+from django.db import connections
 from django.db.models import Model
-from django.forms.models import model_to_dict
 
 from ..bit import Bit
+from ..capture import unlogged
+from ..change_tracker import ChangeTracker, RecordData, record_data
 from ..serializers import DatabaseDiffSerializer
+from ..streaming import Row, RowSpool, merge_rows, stream_rows
 
 
 class DatabaseDiff(Bit):
@@ -12,6 +15,9 @@ class DatabaseDiff(Bit):
 
     # TODO: Change this to DictSerializer
     serializer_class = DatabaseDiffSerializer
+    capture = "full"
+    captures = ("full", "signals", "stream")
+    chunk_size = 2000
 
     def __init__(
         self,
@@ -24,18 +30,57 @@ class DatabaseDiff(Bit):
         Args:
         ----
         models (list[Type[Model]], default=[]): A list of models to compare.
+        capture (str, default="full"): How the state of the tables is captured.
+            - "full": Record every row of the tables before and after the test.
+            - "signals": Only record the rows that change during the test,
+                by listening to the model signals. Writes that don't send signals,
+                like QuerySet.update() or raw SQL, make it record the whole table.
+            - "stream": Read every row of the tables in chunks, ordered by primary key,
+                and spill the rows from before the test to a temporary file.
+                Memory stays bounded by the chunk size and the number of changes.
+                Many-to-many fields are recorded as lists of primary keys.
+        chunk_size (int, default=2000): How many rows are read at once when streaming.
         *args: Arguments to pass to the Bit superclass.
         **kwargs: Keyword arguments to pass to the Bit superclass.
         """
         models = kwargs.pop("models", None)
+        capture = kwargs.pop("capture", None)
+        chunk_size = kwargs.pop("chunk_size", None)
 
         super().__init__(*args, **kwargs)
         self.models = cast(list[Type[Model]], models or getattr(self, "models", []))
-        self.record_data: dict[Type[Model], dict[int, dict[str, Any]]] = {}
+        self.capture = cast(str, capture or getattr(self, "capture", "full"))
+        if self.capture not in self.captures:
+            msg = f"capture must be one of {self.captures}"
+            raise AssertionError(msg)
+        self.chunk_size = cast(int, chunk_size or getattr(self, "chunk_size", 2000))
+
+        self.record_data: dict[Type[Model], RecordData] = {}
+        self.spools: dict[Type[Model], RowSpool] = {}
+        self.tracker: ChangeTracker | None = None
         self.diffs: dict[Type[Model], dict[str, Any]] = {}
 
+    def reset(self) -> None:
+        """Forget the table data and the diffs of the last test."""
+        super().reset()
+        self.record_data = {}
+        self.spools = {}
+        self.tracker = None
+        self.diffs = {}
+
     def __enter__(self) -> "DatabaseDiff":
         """Take a list of models and record their table data."""
+        if self.capture == "signals":
+            self.tracker = ChangeTracker(self.models)
+            self.tracker.start()
+            return self
+
+        if self.capture == "stream":
+            for model in self.models:
+                with unlogged(connections[model.objects.db]):
+                    self.spools[model] = RowSpool(stream_rows(model, self.chunk_size))
+            return self
+
         for model in self.models:
             self.record_data[model] = self._generate_record_data(model)
 
@@ -43,6 +88,22 @@ class DatabaseDiff(Bit):
 
     def __exit__(self, *args: Any) -> Literal[False]:
         """Compare the state of the database before and after a test."""
+        if self.tracker is not None:
+            self.tracker.stop()
+            for model in self.models:
+                self.diffs[model] = self._diff_records(*self.tracker.changes(model))
+            return False
+
+        if self.capture == "stream":
+            for model, spool in self.spools.items():
+                with unlogged(connections[model.objects.db]):
+                    self.diffs[model] = self._diff_rows(
+                        spool,
+                        stream_rows(model, self.chunk_size),
+                    )
+                spool.close()
+            return False
+
         self._generate_diff()
         return False
 
@@ -61,38 +122,66 @@ class DatabaseDiff(Bit):
             )
         return result
 
-    def _generate_record_data(self, model: Type[Model]) -> dict[int, dict[str, Any]]:
-        record_data = {}
-        for instance in model.objects.all():
-            data = model_to_dict(instance)
-            record_data[instance.id] = data  # type: ignore [attr-defined]
-        return record_data
+    def _generate_record_data(self, model: Type[Model]) -> RecordData:
+        return record_data(model.objects.all())
 
     def _generate_diff(self) -> None:
         for model in self.models:
-            new_record_data = self._generate_record_data(model)
-            added_records = []
-            removed_records = []
-            altered_records = {}
-
-            for instance_id, data in self.record_data[model].items():
-                if instance_id not in new_record_data:
-                    removed_records.append(data)
-                elif new_record_data[instance_id] != data:
-                    altered_records[instance_id] = self._compare_records(
-                        data,
-                        new_record_data[instance_id],
-                    )
-
-            for instance_id, records in new_record_data.items():
-                if instance_id not in self.record_data[model]:
-                    added_records.append(records)
+            self.diffs[model] = self._diff_records(
+                self.record_data[model],
+                self._generate_record_data(model),
+            )
 
-            self.diffs[model] = {
-                "added": added_records,
-                "removed": removed_records,
-                "altered": altered_records,
-            }
+    def _diff_records(
+        self,
+        old_record_data: RecordData,
+        new_record_data: RecordData,
+    ) -> dict[str, Any]:
+        added_records = []
+        removed_records = []
+        altered_records = {}
+
+        for instance_id, data in old_record_data.items():
+            if instance_id not in new_record_data:
+                removed_records.append(data)
+            elif new_record_data[instance_id] != data:
+                altered_records[instance_id] = self._compare_records(
+                    data,
+                    new_record_data[instance_id],
+                )
+
+        for instance_id, records in new_record_data.items():
+            if instance_id not in old_record_data:
+                added_records.append(records)
+
+        return {
+            "added": added_records,
+            "removed": removed_records,
+            "altered": altered_records,
+        }
+
+    def _diff_rows(
+        self,
+        old_rows: Iterable[Row],
+        new_rows: Iterable[Row],
+    ) -> dict[str, Any]:
+        added_records = []
+        removed_records = []
+        altered_records = {}
+
+        for instance_id, old_data, new_data in merge_rows(old_rows, new_rows):
+            if new_data is None:
+                removed_records.append(old_data)
+            elif old_data is None:
+                added_records.append(new_data)
+            elif new_data != old_data:
+                altered_records[instance_id] = self._compare_records(old_data, new_data)
+
+        return {
+            "added": added_records,
+            "removed": removed_records,
+            "altered": altered_records,
+        }
 
     def _compare_records(
         self,
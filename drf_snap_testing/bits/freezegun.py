@@ -40,6 +40,8 @@ class FreezeGun(Bit):
             "2020-03-01 01:02:03",
         )
         self.freezer = freeze_time(self.freeze_datetime)
+        # Only freezegun 1.3 and later can leave the event loop on real time
+        self.real_asyncio = getattr(self.freezer, "real_asyncio", None)
 
     def __enter__(self) -> "FreezeGun":
         """Start to mock the datetime."""
@@ -51,6 +53,23 @@ class FreezeGun(Bit):
         self.freezer.stop()
         return False
 
+    async def __aenter__(self) -> "FreezeGun":
+        """Start to mock the datetime from an async test, but not for its event loop."""
+        # The timers of the event loop would never fire, if it saw the frozen time.
+        # The freezer is shared by the clones, so the flag is restored on exit.
+        if hasattr(self.freezer, "real_asyncio"):
+            self.real_asyncio = self.freezer.real_asyncio
+            self.freezer.real_asyncio = True
+        return self.__enter__()
+
+    async def __aexit__(self, *args: Any) -> Literal[False]:
+        """Stop mocking the datetime, and let the sync tests freeze the event loop."""
+        try:
+            return self.__exit__(*args)
+        finally:
+            if hasattr(self.freezer, "real_asyncio"):
+                self.freezer.real_asyncio = self.real_asyncio
+
     @property
     def render(self) -> bytes:
         """Don't render anything, so that it never fails."""
@@ -0,0 +1,78 @@
+from typing import Any, cast
+
+from ..bit import Bit
+from ..load import load_results
+from ..serializers import LoadSerializer
+
+
+class Load(Bit):
+    """
+    A bit for the outcome of a load of concurrent requests to a live server.
+
+    With the load test attribute, the request of the test is sent again, from many
+    threads at once, to the live server of a SnapLiveServerTestCase. It's set to
+    the threads, or to a dict of the threads and the requests to send in total.
+    The outcome is the count of each status, the failed requests, the throughput
+    and the latency percentiles.
+
+    Like the Profile bit's, the outcome is never compared, and it's recorded
+    in LOAD_PATH rather than with the snapshots. Limits can be set instead,
+    and the test fails if the load goes over any of them: max_failed,
+    max_p95_time, in seconds, and min_throughput, in requests per second.
+
+    Args:
+    ----
+    max_failed (int, default=None): The most failed requests allowed.
+    max_p95_time (float, default=None): The highest 95th percentile latency allowed.
+    min_throughput (float, default=None): The lowest throughput allowed.
+    """
+
+    serializer_class = LoadSerializer
+    compared = False
+    records = load_results
+    max_failed: int | None = None
+    max_p95_time: float | None = None
+    min_throughput: float | None = None
+
+    def __init__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the load bit."""
+        options = {
+            name: kwargs.pop(name, None)
+            for name in ("max_failed", "max_p95_time", "min_throughput")
+        }
+
+        super().__init__(*args, **kwargs)
+        for name, value in options.items():
+            if value is not None:
+                setattr(self, name, value)
+
+    @property
+    def load(self) -> dict[str, Any]:
+        """The outcome of the load."""
+        return cast(dict[str, Any], self.value)
+
+    def check(self) -> None:
+        """Assert that the load didn't go over any of the limits, if it was sent."""
+        if self.value is None:
+            return
+
+        exceeded = [
+            f"{name} is {self.load[name]}, over the limit of {limit}"
+            for name, limit in (
+                ("failed", self.max_failed),
+                ("p95_time", self.max_p95_time),
+            )
+            if limit is not None and self.load[name] > limit
+        ]
+        throughput = self.load["throughput"]
+        if self.min_throughput is not None and throughput < self.min_throughput:
+            exceeded.append(
+                f"throughput is {throughput}, under the limit of {self.min_throughput}",
+            )
+        if exceeded:
+            msg = "The load went over the limits:\n" + "\n".join(exceeded)
+            raise AssertionError(msg)
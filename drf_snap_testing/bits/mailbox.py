@@ -11,4 +11,5 @@ class Mailbox(Bit):
     """
 
     serializer_class = MailboxSerializer
+    source = "mailbox"
     many = True
@@ -0,0 +1,216 @@
+import cProfile
+import heapq
+import pstats
+import sys
+import time
+import tracemalloc
+from typing import Any, Literal, cast
+
+from asgiref.sync import sync_to_async
+
+from ..bit import Bit
+from ..records import TestRecords
+from ..serializers import ProfileSerializer
+
+
+def function_name(filename: str, line: int, name: str) -> str:
+    """Name a function of a cProfile table, as pstats prints it."""
+    if filename == "~":
+        # Built-in functions have no file
+        return name
+    return f"{filename}:{line}({name})"
+
+
+class TestProfiles(TestRecords[dict[str, Any]]):
+    """
+    The profiles of the requests of the snapshot tests, by test id.
+
+    They're kept in the JSON file set by PROFILE_PATH, apart from the snapshots,
+    as they change from run to run.
+    """
+
+    setting = "PROFILE_PATH"
+
+
+test_profiles = TestProfiles()
+
+# From Python 3.12, cProfile profiles every thread, and only one can be enabled
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class Profile(Bit):
+    """
+    A bit for the cost of the request: its wall time, CPU time and peak memory.
+
+    The peak memory is the most memory allocated at once during the request,
+    above what was allocated before it, as traced by tracemalloc.
+    With top=N, the N functions with the most cumulative time, as profiled
+    by cProfile, are recorded too.
+
+    The measurements vary from run to run, so they're never compared, and
+    they're recorded in PROFILE_PATH rather than with the snapshots. Limits
+    can be set instead, and the test fails if the request goes over any of them:
+    max_wall_time and max_cpu_time, in seconds, and max_peak_memory, in bytes.
+
+    The bits' context managers are entered in order, so list it last for it
+    to measure the request alone. In async tests, both the event loop and
+    the thread the sync code runs in are profiled.
+
+    Args:
+    ----
+    top (int, default=None): How many functions of the cProfile table to record.
+    trace_memory (bool, default=True): Whether to trace the memory allocations,
+        which slows the request down.
+    max_wall_time (float, default=None): The most wall time allowed.
+    max_cpu_time (float, default=None): The most CPU time allowed.
+    max_peak_memory (int, default=None): The most peak memory allowed.
+    """
+
+    serializer_class = ProfileSerializer
+    compared = False
+    records = test_profiles
+    top: int | None = None
+    trace_memory = True
+    max_wall_time: float | None = None
+    max_cpu_time: float | None = None
+    max_peak_memory: int | None = None
+
+    def __init__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the profile bit."""
+        options = {
+            name: kwargs.pop(name, None)
+            for name in (
+                "top",
+                "trace_memory",
+                "max_wall_time",
+                "max_cpu_time",
+                "max_peak_memory",
+            )
+        }
+
+        super().__init__(*args, **kwargs)
+        for name, value in options.items():
+            if value is not None:
+                setattr(self, name, value)
+
+        self.profiler: cProfile.Profile | None = None
+        self.sync_profiler: cProfile.Profile | None = None
+        self.started_tracing = False
+        self.start: tuple[float, float, int] = (0.0, 0.0, 0)
+
+    def reset(self) -> None:
+        """Forget the measurements of the last test."""
+        super().reset()
+        self.profiler = None
+        self.sync_profiler = None
+        self.started_tracing = False
+        self.start = (0.0, 0.0, 0)
+
+    @property
+    def profile(self) -> dict[str, Any]:
+        """The measurements of the request."""
+        return cast(dict[str, Any], self.value)
+
+    def __enter__(self) -> "Profile":
+        """Start measuring."""
+        memory = 0
+        if self.trace_memory:
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+
+        if self.top is not None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+        self.start = (time.perf_counter(), time.process_time(), memory)
+        return self
+
+    def __exit__(self, *args: Any) -> Literal[False]:
+        """Stop measuring."""
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall_time = time.perf_counter() - self.start[0]
+        cpu_time = time.process_time() - self.start[1]
+
+        peak_memory = None
+        if self.trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1] - self.start[2]
+            if self.started_tracing:
+                tracemalloc.stop()
+
+        self.value = {
+            "wall_time": round(wall_time, 6),
+            "cpu_time": round(cpu_time, 6),
+            "peak_memory": peak_memory,
+        }
+        if self.profiler is not None:
+            self.value["functions"] = self.top_functions()
+        return False
+
+    async def __aenter__(self) -> "Profile":
+        """
+        Start measuring from an async test.
+
+        Before Python 3.12, cProfile only profiles the thread it's enabled in,
+        so besides the event loop, the thread the sync code, like the views',
+        runs in is profiled by another profiler.
+        """
+        if self.top is not None and not PROFILES_ALL_THREADS:
+            self.sync_profiler = cProfile.Profile()
+            await sync_to_async(self.sync_profiler.enable)()
+        return self.__enter__()
+
+    async def __aexit__(self, *args: Any) -> Literal[False]:
+        """Stop measuring, in both threads."""
+        if self.sync_profiler is not None:
+            await sync_to_async(self.sync_profiler.disable)()
+        return self.__exit__(*args)
+
+    def top_functions(self) -> list[dict[str, Any]]:
+        """Return the functions of the profiles with the most cumulative time."""
+        stats = pstats.Stats(cast(cProfile.Profile, self.profiler))
+        if self.sync_profiler is not None:
+            stats.add(self.sync_profiler)
+        table = stats.stats  # type: ignore [attr-defined]
+        top = heapq.nlargest(
+            cast(int, self.top),
+            table.items(),
+            key=lambda item: item[1][3],
+        )
+        return [
+            {
+                "function": function_name(*function),
+                "calls": calls,
+                "total_time": round(total_time, 6),
+                "cumulative_time": round(cumulative_time, 6),
+            }
+            for function, (_, calls, total_time, cumulative_time, _) in top
+        ]
+
+    def check(self) -> None:
+        """Assert that the request didn't go over any of the limits, if measured."""
+        if self.value is None:
+            return
+
+        limits = {
+            "wall_time": self.max_wall_time,
+            "cpu_time": self.max_cpu_time,
+            "peak_memory": self.max_peak_memory,
+        }
+        exceeded = [
+            f"{name} is {self.profile[name]}, over the limit of {limit}"
+            for name, limit in limits.items()
+            if limit is not None
+            and self.profile[name] is not None
+            and self.profile[name] > limit
+        ]
+        if exceeded:
+            msg = "The request cost too much:\n" + "\n".join(exceeded)
+            raise AssertionError(msg)
@@ -1,10 +1,21 @@
-from typing import Any, Literal, cast
+import functools
+from typing import Any, Literal, Mapping, cast
 
 from django.conf import settings
 from django.db import connections, reset_queries
 
 from ..bit import Bit
-from ..serializers import QuerySerializer
+from ..capture import QueryCapture
+from ..metrics import (
+    QueryBudget,
+    QueryMetrics,
+    exceeded_query_budget,
+    query_metrics,
+    resolve_query_budget,
+)
+from ..plans import PlanStep, explain, render_plan, table_size
+from ..serializers import QueryGroupSerializer, QuerySerializer
+from ..sql import QueryGroup, fingerprint, group_queries
 
 
 class Queries(Bit):
@@ -24,11 +35,38 @@ class Queries(Bit):
         >>> response = self.client.get("/foo/")
         >>> snap.add(queries={"default": connection.queries})
 
+    With fingerprint=True, queries that only differ in their parameters are
+    grouped together, with how many times they were run and their total time.
+
+    With max_repeats=N, the test fails if any query is run more than N times
+    with different parameters, which is what N+1 queries look like.
+
+    With a budget, the test fails if the queries cost more than it allows.
+    It's a dict of the most queries (count), total time (time) and single query
+    time (max_query_time) allowed, either for the default database,
+    or keyed by database alias. Tests usually set it with the query_budget
+    test attribute instead.
+
+    The queries are captured by a connection execute wrapper, so tests don't need
+    DEBUG=True. With capture="debug", they're read from connection.queries instead,
+    and the tests run with DEBUG=True.
+
+    With explain=True, the plan of each distinct query is snapshotted along with it,
+    so that changes to the plans show up in review. Only SQLite and PostgreSQL
+    are supported. With full_scan_threshold=N as well, the test fails if any query
+    reads every row of a table with more than N rows.
     """
 
     serializer_class = QuerySerializer
     ignore_list = [rb"^\s*-?\stime: \d+\.\d+$"]
     ignore_params = ["time"]
+    fingerprint = False
+    max_repeats: int | None = None
+    budget: QueryBudget | Mapping[str, QueryBudget] | None = None
+    explain = False
+    full_scan_threshold: int | None = None
+    capture = "wrapper"
+    captures = ("wrapper", "debug")
 
     def __init__(
         self,
@@ -37,29 +75,189 @@ class Queries(Bit):
     ) -> None:
         """Initialize the queries bit."""
         ignore_params = kwargs.pop("ignore_params", None)
+        group_by_fingerprint = kwargs.pop("fingerprint", None)
+        max_repeats = kwargs.pop("max_repeats", None)
+        budget = kwargs.pop("budget", None)
+        explain_plans = kwargs.pop("explain", None)
+        full_scan_threshold = kwargs.pop("full_scan_threshold", None)
+        capture = kwargs.pop("capture", None)
 
         super().__init__(*args, **kwargs)
         self._ignore_params = ignore_params or getattr(self, "ignore_params", [])
+        if group_by_fingerprint is not None:
+            self.fingerprint = group_by_fingerprint
+        if max_repeats is not None:
+            self.max_repeats = max_repeats
+        if budget is not None:
+            self.budget = budget
+        if explain_plans is not None:
+            self.explain = explain_plans
+        if full_scan_threshold is not None:
+            self.full_scan_threshold = full_scan_threshold
+        if capture is not None:
+            self.capture = capture
+        if self.capture not in self.captures:
+            msg = f"capture must be one of {self.captures}"
+            raise AssertionError(msg)
+        # connection.queries is only filled in with DEBUG=True
+        self.requires_debug = self.capture == "debug"
+        self.query_capture: QueryCapture | None = None
+
+    @property
+    def queries(self) -> dict[str, list[dict[str, Any]]]:
+        """The queries made during the request, by database."""
+        return cast(dict[str, list[dict[str, Any]]], self.value)
+
+    @functools.cached_property
+    def query_groups(self) -> dict[str, list[QueryGroup]]:
+        """The queries made during the request grouped by fingerprint, by database."""
+        return {
+            db_alias: group_queries(queries)
+            for db_alias, queries in self.queries.items()
+        }
+
+    @functools.cached_property
+    def metrics(self) -> dict[str, QueryMetrics]:
+        """The count and times of the queries made during the request, by database."""
+        return {
+            db_alias: query_metrics(queries)
+            for db_alias, queries in self.queries.items()
+        }
+
+    @functools.cached_property
+    def plans(self) -> dict[str, dict[str, list[PlanStep] | None]]:
+        """
+        The plan of each distinct query made during the request, by database.
+
+        They're keyed by the fingerprint of the queries. Each is explained once,
+        after the request, which hasn't been rolled back yet.
+        """
+        plans: dict[str, dict[str, list[PlanStep] | None]] = {}
+        for db_alias, queries in self.queries.items():
+            plans[db_alias] = {}
+            for query in queries:
+                sql = fingerprint(query["sql"])
+                if sql not in plans[db_alias]:
+                    plans[db_alias][sql] = explain(connections[db_alias], query["sql"])
+        return plans
+
+    def with_plan(self, db_alias: str, entry: Mapping[str, Any]) -> dict[str, Any]:
+        """Add its plan to a query, or to a group of queries."""
+        plan = self.plans[db_alias][fingerprint(entry["sql"])]
+        return {**entry, "plan": render_plan(plan) if plan is not None else None}
 
     @property
     def data(self) -> dict[str, Any]:
         """Return the queries made during the request grouped by database."""
-        queries_per_db = cast(dict[str, list[dict[str, Any]]], self.value)
+        entries: dict[str, list[Any]] = (
+            cast(dict[str, list[Any]], self.query_groups)
+            if self.fingerprint
+            else self.queries
+        )
+        if self.explain:
+            entries = {
+                db_alias: [self.with_plan(db_alias, entry) for entry in db_entries]
+                for db_alias, db_entries in entries.items()
+            }
+
+        serializer_class = (
+            QueryGroupSerializer if self.fingerprint else self.serializer_class
+        )
         return {
-            db_alias: self.serializer_class(
-                instance=queries,
-                many=True,
-            ).data
-            for db_alias, queries in queries_per_db.items()
+            db_alias: serializer_class(instance=db_entries, many=True).data
+            for db_alias, db_entries in entries.items()
+        }
+
+    def check(self) -> None:
+        """Assert that the queries don't repeat, scan or cost too much."""
+        self.check_repeats()
+        self.check_budget()
+        self.check_full_scans()
+
+    def check_repeats(self) -> None:
+        """Assert that no query is repeated more than max_repeats times."""
+        if self.max_repeats is None:
+            return
+
+        repeated = [
+            f"{group['count']} x {group['sql']}"
+            for groups in self.query_groups.values()
+            for group in groups
+            if group["count"] > self.max_repeats
+        ]
+        if repeated:
+            msg = (
+                f"Queries repeated more than {self.max_repeats} times, "
+                "which is usually an N+1 problem:\n" + "\n".join(repeated)
+            )
+            raise AssertionError(msg)
+
+    def check_budget(self) -> None:
+        """Assert that the queries of each database are within its budget."""
+        if self.budget is None:
+            return
+
+        exceeded = [
+            f"{db_alias}: {reason}"
+            for db_alias, budget in resolve_query_budget(self.budget).items()
+            for reason in exceeded_query_budget(self.metrics[db_alias], budget)
+        ]
+        if exceeded:
+            msg = "Queries over budget:\n" + "\n".join(exceeded)
+            raise AssertionError(msg)
+
+    def check_full_scans(self) -> None:
+        """Assert that no query reads every row of a table over full_scan_threshold."""
+        if self.full_scan_threshold is None:
+            return
+
+        scans = [
+            (db_alias, step.full_scan, sql)
+            for db_alias, plans in self.plans.items()
+            for sql, plan in plans.items()
+            for step in plan or []
+            if step.full_scan is not None
+        ]
+        sizes = {
+            (db_alias, table): table_size(connections[db_alias], table)
+            for db_alias, table in {(db_alias, table) for db_alias, table, _ in scans}
         }
+        full_scans = [
+            f"{table} ({sizes[db_alias, table]} rows): {sql}"
+            for db_alias, table, sql in scans
+            if sizes[db_alias, table] > self.full_scan_threshold
+        ]
+        if full_scans:
+            msg = (
+                "Queries reading every row of tables with more than "
+                f"{self.full_scan_threshold} rows:\n" + "\n".join(full_scans)
+            )
+            raise AssertionError(msg)
+
+    def reset(self) -> None:
+        """Forget the state left behind by a test, including the capture."""
+        super().reset()
+        self.query_capture = None
 
     def __enter__(self) -> None:
         """Start the data collection."""
-        reset_queries()
+        if self.capture == "debug":
+            reset_queries()
+            return
+
+        self.query_capture = QueryCapture(settings.DATABASES)
+        self.query_capture.__enter__()
 
     def __exit__(self, *args: Any) -> Literal[False]:
         """Stop the data collection."""
-        self.value = {
-            db_alias: connections[db_alias].queries for db_alias in settings.DATABASES
-        }
+        if self.query_capture is None:
+            self.value = {
+                db_alias: connections[db_alias].queries
+                for db_alias in settings.DATABASES
+            }
+            return False
+
+        self.query_capture.__exit__(*args)
+        self.value = self.query_capture.queries
+        self.query_capture = None
         return False
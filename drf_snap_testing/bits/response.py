@@ -1,4 +1,12 @@
+from io import BytesIO
+from typing import Any, cast
+
+from drf_yaml.parsers import YAMLParser
+from drf_yaml.styles import LiteralStr
+from rest_framework.exceptions import ParseError
+
 from ..bit import Bit
+from ..encoders import pretty_body
 from ..serializers import RequestResponseSerializer
 
 
@@ -16,6 +24,50 @@ class Response(Bit):
         >>> snap = Snap(bits=[Response])
         >>> response = self.client.get("/foo/")
         >>> snap.add(response=response)
+
+    With include_body=False, the response body is left out, like when it's
+    snapshotted by the ResponseBody bit instead.
+
+    With content=True, the body is the content rendered by the view, exactly as
+    the clients receive it, instead of the data encoded once more by BODY_ENCODER.
+    It's usually compact, so it's pretty-printed when it doesn't match the file.
     """
 
     serializer_class = RequestResponseSerializer
+    source = "response"
+    include_body = True
+    content = False
+
+    def __init__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the response bit."""
+        options = {name: kwargs.pop(name, None) for name in ("include_body", "content")}
+
+        super().__init__(*args, **kwargs)
+        for name, value in options.items():
+            if value is not None:
+                setattr(self, name, value)
+
+    @property
+    def serializer_context(self) -> dict[str, Any]:
+        """Tell the serializer whether to include the body, and which one."""
+        return {"include_body": self.include_body, "content": self.content}
+
+    def display(self, content: bytes) -> bytes | str:
+        """Pretty-print the rendered body, if it's JSON."""
+        if not (self.content and self.include_body):
+            return content
+
+        try:
+            snapshot = YAMLParser().parse(BytesIO(content))
+            body = snapshot["response"]["body"]
+        except (ParseError, KeyError, TypeError):
+            return content
+        if not isinstance(body, str):
+            return content
+
+        snapshot["response"]["body"] = LiteralStr(pretty_body(body))
+        return cast(bytes, self.renderer.render(snapshot)).decode()
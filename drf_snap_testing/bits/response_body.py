@@ -0,0 +1,58 @@
+import functools
+from typing import Any
+
+from ..bit import Bit
+from ..encoders import pretty_body
+from ..renderers import BodyRenderer
+from ..serializers import DictSerializer
+
+
+class ResponseBody(Bit):
+    """
+    A bit for the body of the response. Takes the response object as the value.
+
+    The body is saved as is, in a JSON file of its own, encoded by BODY_ENCODER,
+    instead of as a YAML literal block. It's much faster for big responses,
+    as it's only encoded once. Use it along with Response(include_body=False),
+    for the body not to be saved twice.
+
+    With content=True, the content rendered by the view is saved instead, exactly
+    as the clients receive it, without encoding anything. It's usually compact,
+    so it's pretty-printed when it doesn't match the file.
+    """
+
+    serializer_class = DictSerializer
+    renderer = BodyRenderer()
+    filename = "body.json"
+    source = "response"
+    content = False
+
+    def __init__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the response body bit."""
+        content = kwargs.pop("content", None)
+
+        super().__init__(*args, **kwargs)
+        if content is not None:
+            self.content = content
+
+    @property
+    def data(self) -> Any:
+        """Return the data of the response, if it's a DRF one."""
+        return getattr(self.value, "data", None)
+
+    @functools.cached_property
+    def unfiltered_render(self) -> bytes:
+        """Render the file, taking the rendered content as it is in content mode."""
+        if self.content:
+            return bytes(getattr(self.value, "content", b""))
+        return super().unfiltered_render
+
+    def display(self, content: bytes) -> bytes | str:
+        """Pretty-print the rendered content, if it's JSON."""
+        if not self.content:
+            return content
+        return pretty_body(content.decode(errors="backslashreplace"))
@@ -17,3 +17,4 @@ class TestInfo(Bit):
     """
 
     serializer_class = TestInfoSerializer
+    source = "testinfo"
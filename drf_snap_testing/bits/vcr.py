@@ -5,6 +5,9 @@ import vcr
 from ..bit import Bit
 from ..serializers import DictSerializer
 
+# The keyword arguments that are passed on to vcr.VCR
+VCR_PARAMETERS = frozenset(vcr.VCR.__init__.__code__.co_varnames)
+
 
 def partition(
     dictionary: Mapping[Any, Any],
@@ -45,14 +48,19 @@ class VCR(Bit):
 
         vcr_kwargs, init_kwargs = partition(
             kwargs,
-            lambda parameter_name, _: parameter_name
-            in vcr.VCR.__init__.__code__.co_varnames,
+            lambda parameter_name, _: parameter_name in VCR_PARAMETERS,
         )
         super().__init__(*args, **init_kwargs)
         self.vcr = vcr.VCR(**default_vcr_kwargs, **vcr_kwargs)
         self.cassette: vcr.cassette.Cassette | None = None
         self.cassette_ctx: vcr.cassette.CassetteContextDecorator | None = None
 
+    def reset(self) -> None:
+        """Forget the cassette of the last test."""
+        super().reset()
+        self.cassette = None
+        self.cassette_ctx = None
+
     def __enter__(self) -> "VCR":
         """Enter VCR's context manager."""
         if not self.filename:
@@ -0,0 +1,118 @@
+import time
+import weakref
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+# How many unlogged blocks each connection is in
+_unlogged_depth: "weakref.WeakKeyDictionary[BaseDatabaseWrapper, int]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@contextmanager
+def unlogged(connection: BaseDatabaseWrapper) -> Iterator[None]:
+    """
+    Keep the queries run inside out of the connection's query log.
+
+    They're kept out of any QueryCapture too.
+    """
+    logged = len(connection.queries_log)
+    _unlogged_depth[connection] = _unlogged_depth.get(connection, 0) + 1
+    try:
+        yield
+    finally:
+        _unlogged_depth[connection] -= 1
+        while len(connection.queries_log) > logged:
+            connection.queries_log.pop()
+
+
+def is_unlogged(connection: BaseDatabaseWrapper) -> bool:
+    """Whether the connection is inside an unlogged block."""
+    return _unlogged_depth.get(connection, 0) > 0
+
+
+class QueryCapture:
+    """
+    Capture the queries run on some databases, without needing DEBUG=True.
+
+    It's a connection execute wrapper, which records the SQL and duration
+    of each query, the way Django logs them in connection.queries when DEBUG=True,
+    but without turning on the debug cursor for everything else.
+    Like connection.queries, it's cleared when a request starts.
+    """
+
+    def __init__(self, db_aliases: Iterable[str]) -> None:
+        """Initialize the capture of the queries of the given databases."""
+        self.db_aliases = list(db_aliases)
+        # The SQL and duration of each query, by database alias
+        self.captured: dict[str, list[tuple[str, float]]] = {
+            db_alias: [] for db_alias in self.db_aliases
+        }
+        self.stack = ExitStack()
+
+    def __enter__(self) -> "QueryCapture":
+        """Start capturing the queries."""
+        request_started.connect(self.clear)
+        self.stack.callback(request_started.disconnect, self.clear)
+        for db_alias in self.db_aliases:
+            self.stack.enter_context(
+                connections[db_alias].execute_wrapper(self.capture),
+            )
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop capturing the queries."""
+        self.stack.close()
+
+    def clear(self, **_kwargs: Any) -> None:
+        """Forget the queries captured so far."""
+        for captured in self.captured.values():
+            captured.clear()
+
+    # ruff: noqa: PLR0913
+    def capture(  # pylint: disable=too-many-arguments
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,  # ruff: noqa: FBT001
+        context: dict[str, Any],
+    ) -> Any:
+        """Run the query, and record it unless it's run in an unlogged block."""
+        connection = context["connection"]
+        if is_unlogged(connection):
+            return execute(sql, params, many, context)
+
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.monotonic() - start
+            if many:
+                try:
+                    times: Any = len(params)
+                except TypeError:
+                    # params could be an iterator
+                    times = "?"
+                sql = f"{times} times: {sql}"
+            else:
+                sql = connection.ops.last_executed_query(
+                    context["cursor"].cursor,
+                    sql,
+                    params,
+                )
+            self.captured[connection.alias].append((sql, duration))
+
+    @property
+    def queries(self) -> dict[str, list[dict[str, str]]]:
+        """The queries captured, by database alias, as in connection.queries."""
+        return {
+            db_alias: [
+                {"sql": sql, "time": f"{duration:.3f}"} for sql, duration in captured
+            ]
+            for db_alias, captured in self.captured.items()
+        }
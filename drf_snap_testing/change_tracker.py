@@ -0,0 +1,298 @@
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterator, Type, cast
+
+from django.db import connections
+from django.db.models import ManyToManyField, Model, QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.forms.models import model_to_dict
+
+from .capture import unlogged
+
+# pylint: disable=protected-access
+# ruff: noqa: SLF001
+
+RecordData = dict[Any, dict[str, Any]]
+
+# A table name, plain or quoted, optionally qualified by its schema
+IDENTIFIER = r"""(?:"(?:[^"]|"")+"|`[^`]+`|\[[^\]]+\]|\w+)"""
+
+# Statements that write to a table, and the name of that table
+WRITE_STATEMENT = re.compile(
+    rf"""
+    ^\s*(?P<kind>
+        INSERT(?:\s+OR\s+\w+)?\s+INTO
+        | REPLACE\s+INTO
+        | UPDATE(?:\s+OR\s+\w+)?
+        | DELETE\s+FROM
+        | TRUNCATE(?:\s+TABLE)?
+    )\s+(?P<table>{IDENTIFIER}(?:\s*\.\s*{IDENTIFIER})*)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Statements that may write to any table, whose table isn't parsed,
+# like the ones with a common table expression or a multiple-table delete
+UNPARSED_WRITE = re.compile(
+    r"""
+    ^\s*(?:
+        (?:INSERT|REPLACE|UPDATE|DELETE|TRUNCATE|MERGE)\b
+        | WITH\b.*\b(?:INSERT|REPLACE|UPDATE|DELETE|MERGE)\b
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE | re.DOTALL,
+)
+
+
+def table_name(name: str) -> str:
+    """Return the name of a table, without its schema and quotes."""
+    table = re.findall(IDENTIFIER, name)[-1]
+    if table[0] in '"`[':
+        table = table[1:-1].replace('""', '"')
+    return cast(str, table)
+
+
+def record_data(queryset: QuerySet[Model]) -> RecordData:
+    """Return the data of every row of the queryset, by primary key."""
+    return {instance.pk: model_to_dict(instance) for instance in queryset}
+
+
+class ChangeTracker:
+    """
+    Track the rows of some models that change while it's running.
+
+    Rows saved or deleted through the ORM are captured by the model signals,
+    right before they change, so only those rows are ever materialized.
+
+    Other writes to the models' tables, such as QuerySet.update(), bulk_create()
+    or raw SQL, don't send signals. They're spotted by a connection execute wrapper
+    instead, and the whole table is captured right before the write goes through.
+    """
+
+    def __init__(self, models: list[Type[Model]]) -> None:
+        """Initialize the tracker for the given models."""
+        self.models = models
+        # The data of the changed rows before they changed, or None if they were added
+        self.before: dict[Type[Model], dict[Any, dict[str, Any] | None]] = {
+            model: {} for model in models
+        }
+        # The data of the whole table, right before its first untracked write
+        self.tables: dict[Type[Model], RecordData] = {}
+
+        # The models and m2m fields each table belongs to
+        self.table_models: dict[str, Type[Model]] = {}
+        self.m2m_fields: dict[Type[Model], ManyToManyField[Any, Any]] = {}
+        for model in models:
+            self.table_models[model._meta.db_table] = model
+            for field in model._meta.get_fields():
+                if isinstance(field, ManyToManyField):
+                    through = cast(Type[Model], field.remote_field.through)
+                    self.table_models[through._meta.db_table] = model
+                    self.m2m_fields[through] = field
+
+        # The writes that are being explained by a signal, by model
+        self.writing: dict[str, Counter[Type[Model]]] = {
+            "save": Counter(),
+            "delete": Counter(),
+            "m2m": Counter(),
+        }
+        self.capturing = False
+        self.exit_stack = ExitStack()
+
+    def start(self) -> None:
+        """Start tracking the changes."""
+        for model in self.models:
+            self.connect(pre_save, self.pre_save, model)
+            self.connect(post_save, self.post_save, model)
+            self.connect(pre_delete, self.pre_delete, model)
+            self.connect(post_delete, self.post_delete, model)
+        for through in self.m2m_fields:
+            self.connect(m2m_changed, self.m2m_changed, through)
+
+        for alias in {model.objects.db for model in self.models}:
+            self.exit_stack.enter_context(connections[alias].execute_wrapper(self))
+
+    def stop(self) -> None:
+        """Stop tracking the changes."""
+        self.exit_stack.close()
+        self.clear_writing()
+
+    def clear_writing(self) -> None:
+        """Stop explaining any write, as the ones in progress were aborted."""
+        for counter in self.writing.values():
+            counter.clear()
+
+    def done_writing(self, kind: str, model: Type[Model]) -> None:
+        """Stop explaining one write of the model, unless they were all cleared."""
+        if self.writing[kind][model] > 0:
+            self.writing[kind][model] -= 1
+
+    def connect(
+        self,
+        signal: Any,
+        receiver: Callable[..., None],
+        sender: Type[Model],
+    ) -> None:
+        """Connect the receiver to the signal until the tracker is stopped."""
+        signal.connect(receiver, sender=sender, weak=False)
+        self.exit_stack.callback(signal.disconnect, receiver, sender=sender)
+
+    @contextmanager
+    def capture(self, model: Type[Model]) -> Iterator[None]:
+        """Query the model's table without tracking or logging the queries."""
+        self.capturing = True
+        try:
+            with unlogged(connections[model.objects.db]):
+                yield
+        finally:
+            self.capturing = False
+
+    def capture_rows(self, model: Type[Model], pks: set[Any]) -> None:
+        """Record the data of the rows, unless they were already recorded."""
+        before = self.before[model]
+        pks = {key for key in pks if key not in before}
+        if not pks:
+            return
+
+        if model in self.tables:
+            # The table was captured after these rows last changed
+            for key in pks:
+                before[key] = self.tables[model].get(key)
+            return
+
+        with self.capture(model):
+            data = record_data(model.objects.filter(pk__in=pks))
+        for key in pks:
+            before[key] = data.get(key)
+
+    def capture_table(self, model: Type[Model]) -> None:
+        """Record the data of the whole table."""
+        with self.capture(model):
+            self.tables[model] = record_data(model.objects.all())
+
+    def pre_save(self, sender: Type[Model], instance: Model, **_kwargs: Any) -> None:
+        """Record the row that's about to be saved."""
+        self.writing["save"][sender] += 1
+        if instance.pk is not None:
+            self.capture_rows(sender, {instance.pk})
+
+    def post_save(self, sender: Type[Model], instance: Model, **_kwargs: Any) -> None:
+        """Mark the row as added, if it didn't exist before."""
+        self.done_writing("save", sender)
+        self.before[sender].setdefault(instance.pk, None)
+
+    def pre_delete(self, sender: Type[Model], instance: Model, **_kwargs: Any) -> None:
+        """Record the row that's about to be deleted."""
+        self.writing["delete"][sender] += 1
+        self.capture_rows(sender, {instance.pk})
+
+    def post_delete(self, sender: Type[Model], **_kwargs: Any) -> None:
+        """Stop explaining the deletes of the model."""
+        self.done_writing("delete", sender)
+
+    # ruff: noqa: PLR0913
+    def m2m_changed(  # pylint: disable=too-many-arguments
+        self,
+        sender: Type[Model],
+        instance: Model,
+        action: str,
+        reverse: bool,  # ruff: noqa: FBT001
+        pk_set: set[Any] | None,
+        **_kwargs: Any,
+    ) -> None:
+        """Record the rows whose many-to-many field is about to change."""
+        field = self.m2m_fields[sender]
+        model = field.model
+        if action.startswith("post_"):
+            self.done_writing("m2m", model)
+            return
+
+        self.writing["m2m"][model] += 1
+        if not reverse:
+            pks: set[Any] = {instance.pk}
+        elif pk_set is not None:
+            pks = pk_set
+        else:
+            # Clearing the reverse side of the relation affects every related row
+            with self.capture(model):
+                pks = set(
+                    sender.objects.filter(
+                        **{field.m2m_reverse_field_name(): instance.pk},
+                    ).values_list(
+                        field.m2m_field_name(),  # type: ignore [attr-defined]
+                        flat=True,
+                    ),
+                )
+        self.capture_rows(model, pks)
+
+    def __call__(  # pylint: disable=too-many-arguments
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,  # ruff: noqa: FBT001
+        context: dict[str, Any],
+    ) -> Any:
+        """Capture the whole table before any write that no signal explains."""
+        if not self.capturing:
+            for model in self.untracked_writes(sql):
+                self.capture_table(model)
+        try:
+            return execute(sql, params, many, context)
+        except Exception:
+            # The save or delete that sent the signals is aborted, and won't send
+            # the ones that stop explaining its writes, which would hide later ones
+            self.clear_writing()
+            raise
+
+    def untracked_writes(self, sql: str) -> list[Type[Model]]:
+        """Return the models the statement writes to, if no signal explains it."""
+        match = WRITE_STATEMENT.match(sql)
+        if match is None:
+            if UNPARSED_WRITE.match(sql) is None:
+                return []
+            # It may write to any of the tables, so they're all captured
+            return [model for model in self.models if model not in self.tables]
+
+        table = table_name(match["table"])
+        model = self.table_models.get(table)
+        if model is None or model in self.tables:
+            return []
+
+        kind = match["kind"].split()[0].upper()
+        is_m2m = table != model._meta.db_table
+        explained = (
+            (kind in ("INSERT", "UPDATE") and self.writing["save"][model] > 0)
+            or (kind == "DELETE" and self.writing["delete"][model] > 0)
+            or (is_m2m and self.writing["m2m"][model] > 0)
+        )
+        return [] if explained else [model]
+
+    def changes(self, model: Type[Model]) -> tuple[RecordData, RecordData]:
+        """Return the data of the changed rows, before and after the changes."""
+        before = self.before[model]
+
+        if model not in self.tables:
+            with self.capture(model):
+                after = record_data(model.objects.filter(pk__in=before))
+            return {
+                key: data for key, data in before.items() if data is not None
+            }, after
+
+        # Rebuild the table as it was when tracking started
+        table = dict(self.tables[model])
+        for key, data in before.items():
+            if data is None:
+                table.pop(key, None)
+            else:
+                table[key] = data
+        with self.capture(model):
+            after = record_data(model.objects.all())
+        return table, after
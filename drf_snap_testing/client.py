@@ -0,0 +1,104 @@
+from typing import Any
+
+from django.http import HttpRequest, HttpResponseBase
+from django.test.client import AsyncClient, AsyncClientHandler
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+# The WSGI environ keys that are headers, besides the HTTP_ ones
+WSGI_HEADERS = ("CONTENT_TYPE", "CONTENT_LENGTH")
+
+
+class AsyncForceAuthClientHandler(AsyncClientHandler):
+    """An async version of DRF's ForceAuthClientHandler."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the handler, without a forced user."""
+        self.force_user: Any = None
+        self.force_token: Any = None
+        super().__init__(*args, **kwargs)
+
+    async def get_response_async(self, request: HttpRequest) -> HttpResponseBase:
+        """Authenticate the request as the forced user, if any, and handle it."""
+        force_authenticate(request, self.force_user, self.force_token)
+        return await super().get_response_async(request)
+
+
+class AsyncAPIClient(APIRequestFactory, AsyncClient):
+    """
+    An async version of DRF's APIClient, which goes through the ASGI handler.
+
+    Like APIClient, it encodes the data by format, and can force the authentication
+    of the requests. Its request methods are coroutines, as AsyncClient's are.
+    """
+
+    def __init__(self, enforce_csrf_checks: bool = False, **defaults: Any) -> None:
+        """Initialize the client, with a handler that can force the authentication."""
+        super().__init__(enforce_csrf_checks, **defaults)
+        self.handler: AsyncForceAuthClientHandler = AsyncForceAuthClientHandler(
+            enforce_csrf_checks,
+        )
+
+    def force_authenticate(self, user: Any = None, token: Any = None) -> None:
+        """Force the authentication of the next requests, or stop forcing it."""
+        self.handler.force_user = user
+        self.handler.force_token = token
+
+    # ruff: noqa: PLR0913
+    def generic(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        path: str,
+        data: Any = "",
+        content_type: str | None = "application/octet-stream",
+        secure: bool = False,  # ruff: noqa: FBT001, FBT002
+        **extra: Any,
+    ) -> Any:
+        """
+        Build the request, with the content type even without data, as APIClient.
+
+        With data, the async factory sets the content type header itself,
+        so APIRequestFactory's generic is skipped, as it would set it twice.
+        The extra values become headers, so only the ones that are headers
+        in the WSGI environ of APIClient's requests are kept, by header name.
+        """
+        extra = {
+            key.removeprefix("HTTP_"): value
+            for key, value in extra.items()
+            if value is not None and (key in WSGI_HEADERS or key.startswith("HTTP_"))
+        }
+        if content_type is not None and not data:
+            extra["CONTENT_TYPE"] = str(content_type)
+        return super(APIRequestFactory, self).generic(
+            method,
+            path,
+            data,
+            content_type,
+            secure,
+            **extra,
+        )
+
+    def request(self, **request: Any) -> Any:
+        """Make the request, as a coroutine, skipping APIRequestFactory's request."""
+        return super(APIRequestFactory, self).request(**request)
+
+    def _base_scope(self, **request: Any) -> dict[str, Any]:
+        """
+        Return the scope of the request, made like APIClient's WSGI environ.
+
+        The server is named testserver, without a host header unless one is given,
+        and the cookie header comes first, so both snapshot the same request.
+        """
+        # The stubs lack the private methods of the factory
+        scope: dict[str, Any] = super()._base_scope(  # type: ignore [misc]
+            **request,
+        )
+        scope["server"] = ("testserver", scope["server"][1])
+        scope["headers"] = sorted(
+            (
+                header
+                for header in scope["headers"]
+                if header != (b"host", b"testserver")
+            ),
+            key=lambda header: header[0] != b"cookie",
+        )
+        return scope
@@ -0,0 +1,276 @@
+"""
+A cache of the migrated test databases, kept between runs.
+
+Creating a test database replays every migration, data migrations included,
+which may take longer than the tests of a shard. With TEST_DATABASE_CACHE_PATH
+set, the database migrated by a run is kept, keyed by a digest of the migration
+files, the fixture files, the installed apps and the Django version, and the
+next runs copy it into place rather than migrating, until the digest changes:
+- SQLite databases are kept as files in that directory, and copied into
+  the test database with the backup API
+- PostgreSQL ones are kept as template databases on the server, named after
+  the test database and the digest, that the test database is cloned from
+The other databases are migrated as usual, as are the ones kept with --keepdb.
+
+SnapDiscoverRunner creates its test databases within cached_test_databases(),
+and so can the django_db_setup fixture of pytest-django.
+"""
+import hashlib
+import json
+import sqlite3
+import sys
+from contextlib import closing, contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.base.creation import BaseDatabaseCreation
+from django.db.migrations.loader import MigrationLoader
+
+from .impact import file_digest, source_file
+from .parallel import file_lock
+from .settings import snap_settings
+
+# PostgreSQL truncates longer database names
+MAX_NAME_LENGTH = 63
+
+
+def fixture_files() -> list[Path]:
+    """Return the fixture files, as data migrations may load them."""
+    directories = [Path(app.path) / "fixtures" for app in apps.get_app_configs()]
+    directories.extend(Path(directory) for directory in settings.FIXTURE_DIRS)
+    return sorted(
+        path
+        for directory in directories
+        if directory.is_dir()
+        for path in directory.rglob("*")
+        if path.is_file()
+    )
+
+
+def migrations_key(connection: BaseDatabaseWrapper) -> str:
+    """Return the digest of everything the migrated database depends on."""
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            [
+                django.__version__,
+                connection.settings_dict["ENGINE"],
+                [app.name for app in apps.get_app_configs()],
+            ],
+        ).encode(),
+    )
+
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    for (app_label, name), migration in sorted(loader.disk_migrations.items()):
+        path = source_file(sys.modules.get(migration.__module__))
+        content_digest = file_digest(path) if path is not None else ""
+        digest.update(f"{app_label}.{name}:{content_digest}\n".encode())
+    for fixture_path in fixture_files():
+        digest.update(f"{fixture_path}:{file_digest(str(fixture_path))}\n".encode())
+
+    return digest.hexdigest()[:16]
+
+
+class CachedDatabase:
+    """A migrated test database, kept between runs under a key."""
+
+    def __init__(self, connection: BaseDatabaseWrapper, key: str) -> None:
+        """Initialize the cached database of the connection, for the key."""
+        self.connection = connection
+        self.key = key
+
+    def exists(self) -> bool:
+        """Whether the database was cached under the key."""
+        raise NotImplementedError
+
+    def load(self, verbosity: int, *, autoclobber: bool) -> str:
+        """Create the test database from the cached one, returning its name."""
+        raise NotImplementedError
+
+    def store(self) -> None:
+        """Cache the test database, replacing the ones of the other keys."""
+        raise NotImplementedError
+
+    def use_test_database(self, verbosity: int, *, autoclobber: bool) -> str:
+        """Create the empty test database, and connect to it, as Django does."""
+        # The stubs lack the private methods of the creation
+        creation: Any = self.connection.creation
+        # pylint: disable-next=protected-access
+        name = creation._create_test_db(  # noqa: SLF001
+            verbosity,
+            autoclobber,
+            keepdb=False,
+        )
+        self.connection.close()
+        settings.DATABASES[self.connection.alias]["NAME"] = name
+        self.connection.settings_dict["NAME"] = name
+        return str(name)
+
+
+class SQLiteCachedDatabase(CachedDatabase):
+    """A migrated SQLite database, kept as a file in TEST_DATABASE_CACHE_PATH."""
+
+    def __init__(self, connection: BaseDatabaseWrapper, key: str) -> None:
+        """Initialize the cached database, and its file."""
+        super().__init__(connection, key)
+        self.directory = Path(snap_settings.TEST_DATABASE_CACHE_PATH)
+        self.path = self.directory / f"{connection.alias}-{key}.sqlite3"
+
+    def exists(self) -> bool:
+        """Whether the file of the database exists."""
+        return self.path.exists()
+
+    def load(self, verbosity: int, *, autoclobber: bool) -> str:
+        """Copy the file into the test database."""
+        name = self.use_test_database(verbosity, autoclobber=autoclobber)
+        self.connection.ensure_connection()
+        with closing(sqlite3.connect(self.path)) as cached:
+            cached.backup(self.connection.connection)
+        return name
+
+    def store(self) -> None:
+        """Copy the test database into the file, through a temporary one."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        self.connection.ensure_connection()
+        with file_lock(self.path):
+            with closing(sqlite3.connect(temp_path)) as cached:
+                self.connection.connection.backup(cached)
+            temp_path.replace(self.path)
+
+        for path in self.directory.glob(f"{self.connection.alias}-*.sqlite3"):
+            if path != self.path:
+                path.unlink(missing_ok=True)
+
+
+class PostgresCachedDatabase(CachedDatabase):
+    """A migrated PostgreSQL database, kept as a template database."""
+
+    def __init__(self, connection: BaseDatabaseWrapper, key: str) -> None:
+        """Initialize the cached database, and the name of its template."""
+        super().__init__(connection, key)
+        creation: Any = connection.creation
+        test_name = creation._get_test_db_name()  # noqa: SLF001
+        self.prefix = f"{test_name[: MAX_NAME_LENGTH - len(key) - 1]}_"
+        self.template = f"{self.prefix}{key}"
+
+    def templates(self) -> list[str]:
+        """Return the templates of every key."""
+        # pylint: disable-next=protected-access
+        with self.connection._nodb_cursor() as cursor:  # noqa: SLF001
+            cursor.execute("SELECT datname FROM pg_database")
+            names = [name for (name,) in cursor.fetchall()]
+        return [
+            name
+            for name in names
+            if name.startswith(self.prefix)
+            and len(name) == len(self.template)
+            and name.removeprefix(self.prefix).isalnum()
+        ]
+
+    def exists(self) -> bool:
+        """Whether the template database exists."""
+        return self.template in self.templates()
+
+    def load(self, verbosity: int, *, autoclobber: bool) -> str:
+        """Create the test database from the template."""
+        test_settings = self.connection.settings_dict["TEST"]
+        template = test_settings.get("TEMPLATE")
+        test_settings["TEMPLATE"] = self.template
+        try:
+            return self.use_test_database(verbosity, autoclobber=autoclobber)
+        finally:
+            test_settings["TEMPLATE"] = template
+
+    def store(self) -> None:
+        """Create the template from the test database, dropping the stale ones."""
+        quote_name = self.connection.ops.quote_name
+        stale = [name for name in self.templates() if name != self.template]
+        # No session may be connected to the database while it's copied
+        self.connection.close()
+        # pylint: disable-next=protected-access
+        with self.connection._nodb_cursor() as cursor:  # noqa: SLF001
+            for name in stale:
+                cursor.execute(f"DROP DATABASE IF EXISTS {quote_name(name)}")
+            cursor.execute(
+                f"CREATE DATABASE {quote_name(self.template)} "
+                f"TEMPLATE {quote_name(self.connection.settings_dict['NAME'])}",
+            )
+
+
+# The cached database classes, by the vendor of the database
+CACHED_DATABASE_CLASSES: dict[str, type[CachedDatabase]] = {
+    "sqlite": SQLiteCachedDatabase,
+    "postgresql": PostgresCachedDatabase,
+}
+
+
+def create_test_db(  # noqa: PLR0913 # pylint: disable=too-many-arguments
+    creation: BaseDatabaseCreation,
+    create: Callable[..., str],
+    verbosity: int = 1,
+    autoclobber: bool = False,  # noqa: FBT001, FBT002
+    serialize: bool = True,  # noqa: FBT001, FBT002
+    keepdb: bool = False,  # noqa: FBT001, FBT002
+) -> str:
+    """
+    Create the test database from the cached one, if any, else migrate it.
+
+    It's BaseDatabaseCreation.create_test_db, with the migrations replaced
+    by the copy of the cached database. The database migrated is cached.
+    """
+    # The stubs lack the attribute the serialized database is kept in
+    connection: Any = creation.connection
+    cached_database_class = CACHED_DATABASE_CLASSES.get(connection.vendor)
+    if (
+        keepdb
+        or cached_database_class is None
+        or snap_settings.TEST_DATABASE_CACHE_PATH is None
+        or connection.settings_dict["TEST"]["MIGRATE"] is False
+    ):
+        return create(verbosity, autoclobber, serialize, keepdb)
+
+    cached = cached_database_class(connection, migrations_key(connection))
+    if not cached.exists():
+        name = create(verbosity, autoclobber, serialize, keepdb)
+        cached.store()
+        return name
+
+    if verbosity >= 1:
+        creation.log(  # type: ignore [attr-defined]
+            f"Copying the cached test database for alias '{connection.alias}'...",
+        )
+    name = cached.load(verbosity, autoclobber=autoclobber)
+
+    # As after the migrations
+    if serialize:
+        serialized = creation.serialize_db_to_string()
+        # pylint: disable-next=protected-access
+        connection._test_serialized_contents = serialized  # noqa: SLF001
+    call_command("createcachetable", database=connection.alias)
+    connection.ensure_connection()
+    return name
+
+
+@contextmanager
+def cached_test_databases() -> Iterator[None]:
+    """Create the test databases from the cached ones, within the context."""
+    creations = [connection.creation for connection in connections.all()]
+    for creation in creations:
+        creation.create_test_db = partial(  # type: ignore [method-assign]
+            create_test_db,
+            creation,
+            creation.create_test_db,
+        )
+    try:
+        yield
+    finally:
+        for creation in creations:
+            vars(creation).pop("create_test_db", None)
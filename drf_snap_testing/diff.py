@@ -0,0 +1,137 @@
+"""
+Structural diffs of mismatching snapshots.
+
+Both renders are parsed back to data, as JSON or YAML, and compared
+path by path, like `response.body.results[17].price`. JSON strings, like
+the bodies of the responses in the YAML files, are parsed and compared too.
+It takes linear time, as lists are compared item by item,
+and stops at a limit of differences.
+"""
+import itertools
+import json
+import re
+import reprlib
+from typing import Any, Iterator
+
+import yaml
+
+# The C loader is much faster, when PyYAML is built with libyaml
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+
+_repr = reprlib.Repr()
+_repr.maxstring = 80
+_repr.maxother = 80
+
+
+def parse(content: bytes) -> Any:
+    """Parse a render back to data, as JSON or else as YAML."""
+    try:
+        return json.loads(content)
+    except ValueError:
+        pass
+
+    try:
+        return yaml.load(content, Loader=Loader)  # noqa: S506 # nosec
+    except yaml.YAMLError as err:
+        msg = f"Unable to parse the render: {err}"
+        raise ValueError(msg) from err
+
+
+def parse_json_string(value: str) -> Any:
+    """Parse a string as JSON, if it's a JSON object or array."""
+    if not value.lstrip().startswith(("{", "[")):
+        msg = "Not a JSON object or array"
+        raise ValueError(msg)
+    return json.loads(value)
+
+
+def join_path(path: str, key: Any) -> str:
+    """Return the path of a key of a dict at a path."""
+    if isinstance(key, str) and IDENTIFIER.fullmatch(key):
+        return f"{path}.{key}" if path else key
+    return f"{path}[{key!r}]"
+
+
+def string_differences(path: str, old: str, new: str) -> Iterator[str]:
+    """Yield the difference of two strings, by their first mismatching line."""
+    old_lines, new_lines = old.split("\n"), new.split("\n")
+    if len(old_lines) == 1 and len(new_lines) == 1:
+        yield f"{path or '.'}: {_repr.repr(old)} -> {_repr.repr(new)}"
+        return
+
+    for number, (old_line, new_line) in enumerate(
+        itertools.zip_longest(old_lines, new_lines),
+        start=1,
+    ):
+        if old_line != new_line:
+            yield (
+                f"{path or '.'}, line {number}: "
+                f"{_repr.repr(old_line)} -> {_repr.repr(new_line)}"
+            )
+            return
+
+
+def dict_differences(
+    path: str,
+    old: dict[Any, Any],
+    new: dict[Any, Any],
+) -> Iterator[str]:
+    """Yield the differences between two dicts, in the order of their keys."""
+    for key in itertools.chain(old, (key for key in new if key not in old)):
+        key_path = join_path(path, key)
+        if key not in new:
+            yield f"{key_path}: removed {_repr.repr(old[key])}"
+        elif key not in old:
+            yield f"{key_path}: added {_repr.repr(new[key])}"
+        else:
+            yield from differences(key_path, old[key], new[key])
+
+
+def list_differences(path: str, old: list[Any], new: list[Any]) -> Iterator[str]:
+    """Yield the differences between two lists, item by item."""
+    for index, (old_item, new_item) in enumerate(zip(old, new, strict=False)):
+        yield from differences(f"{path}[{index}]", old_item, new_item)
+    for index in range(len(new), len(old)):
+        yield f"{path}[{index}]: removed {_repr.repr(old[index])}"
+    for index in range(len(old), len(new)):
+        yield f"{path}[{index}]: added {_repr.repr(new[index])}"
+
+
+def differences(path: str, old: Any, new: Any) -> Iterator[str]:
+    """Yield the differences between two values, by path, lazily."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        yield from dict_differences(path, old, new)
+    elif isinstance(old, list) and isinstance(new, list):
+        yield from list_differences(path, old, new)
+    elif isinstance(old, str) and isinstance(new, str):
+        if old == new:
+            return
+        try:
+            old_data, new_data = parse_json_string(old), parse_json_string(new)
+        except ValueError:
+            yield from string_differences(path, old, new)
+        else:
+            yield from differences(path, old_data, new_data)
+    elif old != new or type(old) is not type(new):
+        yield f"{path or '.'}: {_repr.repr(old)} -> {_repr.repr(new)}"
+
+
+def diff_renders(old: bytes, new: bytes, limit: int) -> list[str] | None:
+    """
+    Return the differences between two renders, up to the limit.
+
+    When there are more, a last line says so. It's None when either
+    can't be parsed, or when they're the same data rendered differently.
+    """
+    try:
+        old_data, new_data = parse(old), parse(new)
+    except ValueError:
+        return None
+
+    found = list(itertools.islice(differences("", old_data, new_data), limit + 1))
+    if not found:
+        return None
+    if len(found) > limit:
+        found[limit:] = [f"... and more differences, past the first {limit}"]
+    return found
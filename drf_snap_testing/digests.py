@@ -0,0 +1,91 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import TypedDict, cast
+
+from .parallel import STATE_DIRECTORY, atomic_write
+from .settings import snap_settings
+
+
+class DigestEntry(TypedDict):
+    """A manifest entry for a single snapshot file."""
+
+    digest: str
+    size: int
+    mtime_ns: int
+
+
+def content_digest(content: bytes) -> str:
+    """Return the hex digest of the given content."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def manifest_path(directory: Path) -> Path:
+    """
+    Return the manifest file of a snapshot directory.
+
+    The manifests are kept in SNAPSHOT_DIGESTS_PATH, or in the temporary directory,
+    by the digest of the snapshot directory's path, and never in the snapshot tree.
+    """
+    path = snap_settings.SNAPSHOT_DIGESTS_PATH
+    root = Path(path) if path is not None else STATE_DIRECTORY / "digests"
+    return root / f"{content_digest(str(directory.resolve()).encode())}.json"
+
+
+class DigestManifest:
+    """
+    A per-directory record of the digests of the snapshots it contains.
+
+    Each entry maps a snapshot filename to the digest of its filtered render,
+    along with the configuration of the bit, and to the size and modification
+    time of the file on disk. Those are checked before trusting an entry,
+    so that snapshots edited or removed by hand are never skipped. As modification
+    times are local, so is the manifest: it's kept outside of the snapshot
+    directory, which is under version control.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """Load the manifest of the given directory, if there is one."""
+        self.path = manifest_path(directory)
+        self.entries = self._load()
+
+    def _load(self) -> dict[str, DigestEntry]:
+        try:
+            return cast(dict[str, DigestEntry], json.loads(self.path.read_bytes()))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get(self, snapshot: Path) -> str | None:
+        """Return the recorded digest of the snapshot, if it's still valid."""
+        entry = self.entries.get(snapshot.name)
+        if entry is None:
+            return None
+
+        try:
+            stat = snapshot.stat()
+        except FileNotFoundError:
+            return None
+
+        if entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        return entry["digest"]
+
+    def record(self, snapshot: Path, digest: str) -> None:
+        """Record the digest of the snapshot and save the manifest."""
+        stat = snapshot.stat()
+        entry: DigestEntry = {
+            "digest": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if self.entries.get(snapshot.name) == entry:
+            return
+
+        self.entries[snapshot.name] = entry
+        self.save()
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        content = json.dumps(self.entries, indent=2, sort_keys=True) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, content.encode())
@@ -0,0 +1,69 @@
+"""
+Encoders of the response bodies, set by BODY_ENCODER.
+
+An encoder takes the data of a response, and returns it encoded as a string.
+"""
+import json
+from typing import Any, Callable
+
+from rest_framework.utils.encoders import JSONEncoder
+
+# pylint: disable=no-member
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    # It's optional, the canonical encoder falls back to json
+    orjson = None  # type: ignore [assignment]
+
+BodyEncoder = Callable[[Any], str]
+
+ORJSON_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    if orjson is not None
+    else 0
+)
+
+
+def encode_default(obj: Any) -> Any:
+    """Encode what JSON doesn't support, like decimals and dates, as DRF does."""
+    return JSONEncoder().default(obj)
+
+
+def json_body(data: Any) -> str:
+    """Encode the data as indented JSON, in the order of its keys."""
+    return json.dumps(data, indent=2)
+
+
+def pretty_body(body: str) -> str:
+    """Pretty-print a rendered JSON body for display, or return it as is if not JSON."""
+    try:
+        return json_body(json.loads(body))
+    except ValueError:
+        return body
+
+
+def canonical_json_body(data: Any) -> str:
+    """
+    Encode the data as indented JSON, with sorted keys, so its order doesn't matter.
+
+    Floats are encoded by their shortest representation. Non-ASCII characters
+    are kept as they are, and what JSON doesn't support is encoded as DRF does.
+
+    It's much faster with orjson installed. Without it, the output is the same
+    except for floats in exponent notation, like 1e+16 instead of 1e16,
+    and non-finite floats, which orjson encodes as null.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=encode_default,
+            option=ORJSON_OPTIONS,
+        ).decode()
+
+    return json.dumps(
+        data,
+        indent=2,
+        sort_keys=True,
+        ensure_ascii=False,
+        default=encode_default,
+    )
@@ -0,0 +1,271 @@
+"""
+Test-impact analysis: skip the tests whose inputs didn't change since they passed.
+
+A test's fingerprint is a digest of everything that could change its outcome:
+- its test attributes, and the file of its test case
+- the files of its view and of its permission, authentication, throttle, filter
+  and pagination classes, of its serializer, nested serializers and fields,
+  of their models and related models, and of the bits' classes
+- the settings, the URLconf and the migrations of the project
+- the versions of Django and DRF
+- its snapshot files
+The fingerprint of each passing test is kept in TEST_FINGERPRINTS_PATH, and with
+DRF_SNAP_TESTING_SKIP_UNCHANGED set, the tests whose fingerprint didn't change
+are skipped.
+
+It's a heuristic: what the view calls outside of these files, or the data it
+reads from fixtures, isn't part of the fingerprint.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import sysconfig
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+
+import django
+import rest_framework
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.migrations.loader import MigrationLoader
+from django.urls import resolve, reverse
+from rest_framework import serializers
+
+from .bit import Bit
+from .records import TestRecords
+
+# Skips the tests whose fingerprint didn't change since they last passed, when set.
+# The workers of Django's parallel runner inherit the environment of the main process.
+SKIP_UNCHANGED_VARIABLE = "DRF_SNAP_TESTING_SKIP_UNCHANGED"
+
+# The files of the standard library and of the installed packages
+LIBRARY_PATHS = tuple(
+    {
+        str(Path(path).resolve())
+        for name, path in sysconfig.get_paths().items()
+        if name in ("stdlib", "platstdlib", "purelib", "platlib")
+    },
+)
+
+
+# The attributes of the views, besides the permissions, listing the classes they use
+VIEW_CLASS_LISTS = (
+    "authentication_classes",
+    "throttle_classes",
+    "filter_backends",
+    "parser_classes",
+    "renderer_classes",
+)
+
+# The attributes of the views set to a class they use
+VIEW_CLASSES = ("pagination_class", "filterset_class", "content_negotiation_class")
+
+
+def skip_unchanged() -> bool:
+    """Whether the tests whose fingerprint didn't change are skipped."""
+    return bool(os.environ.get(SKIP_UNCHANGED_VARIABLE))
+
+
+@functools.cache
+def _file_digest(path: str, _mtime_ns: int, _size: int) -> str:
+    """Return the digest of a file, cached until it's modified."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """Return the digest of a file, reading it only once per modification."""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return "missing"
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+def source_file(obj: Any) -> str | None:
+    """Return the source file of a class, function or module, if it has one."""
+    try:
+        path = inspect.getsourcefile(obj)
+    except TypeError:
+        return None
+    return str(Path(path).resolve()) if path is not None else None
+
+
+def in_project(path: str) -> bool:
+    """Whether the file is the project's, and not of the installed packages."""
+    return not path.startswith(LIBRARY_PATHS)
+
+
+def project_files(objs: Iterable[Any]) -> set[str]:
+    """Return the source files of the classes, and of their bases, in the project."""
+    files = set()
+    for obj in objs:
+        for klass in inspect.getmro(obj) if inspect.isclass(obj) else (obj,):
+            path = source_file(klass)
+            if path is not None and in_project(path):
+                files.add(path)
+    return files
+
+
+def permission_objects(permissions: Iterable[Any]) -> Iterator[Any]:
+    """Yield the permission classes, including the operands of composed ones."""
+    for permission in permissions:
+        operands = [
+            getattr(permission, name)
+            for name in ("op1_class", "op2_class")
+            if hasattr(permission, name)
+        ]
+        yield from permission_objects(operands) if operands else (permission,)
+
+
+def model_objects(model: type[models.Model]) -> Iterator[Any]:
+    """Yield the model, and the models its relations point to."""
+    # pylint: disable=protected-access
+    # ruff: noqa: SLF001
+
+    yield model
+    for field in model._meta.get_fields():
+        # The reverse relations are auto created
+        if field.is_relation and not field.auto_created and field.related_model:
+            yield field.related_model
+
+
+def serializer_objects(serializer_class: type[Any], seen: set[Any]) -> Iterator[Any]:
+    """Yield the serializer, its model, and its nested serializers and fields."""
+    if serializer_class in seen:
+        return
+    seen.add(serializer_class)
+    yield serializer_class
+
+    if (
+        model := getattr(getattr(serializer_class, "Meta", None), "model", None)
+    ) is not None:
+        yield from model_objects(model)
+    for declared in getattr(serializer_class, "_declared_fields", {}).values():
+        # Like the child serializer of many=True, or of a ListField
+        field = getattr(declared, "child", declared)
+        if isinstance(field, serializers.BaseSerializer):
+            yield from serializer_objects(type(field), seen)
+        else:
+            yield type(field)
+
+
+def view_objects(view: Any) -> list[Any]:
+    """Return the view, and what it uses: its serializer, model and policies."""
+    objs = [view]
+    if not inspect.isclass(view):
+        return objs
+
+    # Like the handlers of function views, wrapped in a class by api_view
+    objs.extend(value for value in vars(view).values() if inspect.isfunction(value))
+
+    objs.extend(permission_objects(getattr(view, "permission_classes", ())))
+    for name in VIEW_CLASS_LISTS:
+        objs.extend(getattr(view, name, None) or ())
+    for name in VIEW_CLASSES:
+        if (klass := getattr(view, name, None)) is not None:
+            objs.append(klass)
+
+    if (serializer_class := getattr(view, "serializer_class", None)) is not None:
+        objs.extend(serializer_objects(serializer_class, set()))
+    if (model := getattr(getattr(view, "queryset", None), "model", None)) is not None:
+        objs.extend(model_objects(model))
+    return objs
+
+
+def view_files(tam: Mapping[str, Any]) -> set[str]:
+    """Return the files of the view of a test, and of what it uses."""
+    url = reverse(tam["url_pattern_name"], kwargs=tam.get("url_kwargs", {}))
+    func = resolve(url.split("?", 1)[0]).func
+    view = getattr(func, "cls", None) or getattr(func, "view_class", None) or func
+    return project_files(view_objects(view))
+
+
+@functools.lru_cache(maxsize=1)
+def common_files() -> tuple[str, ...]:
+    """Return the files every test depends on: settings, URLconf and migrations."""
+    modules = [
+        sys.modules.get(name)
+        for name in (os.environ.get("DJANGO_SETTINGS_MODULE"), settings.ROOT_URLCONF)
+        if name
+    ]
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    modules.extend(
+        sys.modules.get(migration.__module__)
+        for migration in loader.disk_migrations.values()
+    )
+    return tuple(
+        sorted(
+            path
+            for path in map(source_file, modules)
+            if path is not None and in_project(path)
+        ),
+    )
+
+
+def stable_name(obj: Any) -> str:
+    """Name an object that isn't JSON, in the same way across runs."""
+    klass = obj if isinstance(obj, type) else type(obj)
+    return f"{klass.__module__}.{klass.__qualname__}"
+
+
+def test_fingerprint(test: Any, tam: Mapping[str, Any], bits: Mapping[str, Bit]) -> str:
+    """Return the digest of everything that could change the outcome of a test."""
+    digest = hashlib.sha256()
+    digest.update(django.__version__.encode())
+    digest.update(rest_framework.VERSION.encode())
+    digest.update(json.dumps(tam, sort_keys=True, default=stable_name).encode())
+
+    files = {source_file(type(test))} | view_files(tam) | set(common_files())
+    # The bits are part of the framework, which may not be in the project
+    for bit in bits.values():
+        files.update(source_file(klass) for klass in type(bit).__mro__)
+    for path in sorted(path for path in files if path is not None):
+        digest.update(f"{path}:{file_digest(path)}\n".encode())
+
+    for key, bit in bits.items():
+        if bit.compared:
+            content = bit.snapshot_storage.read(bit.path)
+            content_digest = hashlib.sha256(content or b"").hexdigest()
+            digest.update(f"{key}:{content is not None}:{content_digest}\n".encode())
+
+    return digest.hexdigest()
+
+
+class TestFingerprints(TestRecords[str]):
+    """
+    The fingerprints of the snapshot tests when they last passed, by test id.
+
+    They're kept in the JSON file set by TEST_FINGERPRINTS_PATH.
+    """
+
+    setting = "TEST_FINGERPRINTS_PATH"
+
+    def __init__(self) -> None:
+        """Initialize the records, and the cache of the ones of the last run."""
+        super().__init__()
+        self.previous: dict[Path, dict[str, str]] = {}
+
+    def unchanged(self, test_id: str, fingerprint: str) -> bool:
+        """Whether the test passed the last time with the same fingerprint."""
+        if (path := self.path) is None:
+            return False
+        if path not in self.previous:
+            self.previous[path] = self.load(path)
+        return self.previous[path].get(test_id) == fingerprint
+
+
+test_fingerprints = TestFingerprints()
+
+
+def check_skip_unchanged() -> None:
+    """Raise an error if the unchanged tests are to be skipped, but can't be."""
+    if skip_unchanged() and test_fingerprints.path is None:
+        msg = (
+            "The unchanged tests can't be skipped without TEST_FINGERPRINTS_PATH, "
+            "where the fingerprints of the tests that passed are kept."
+        )
+        raise ImproperlyConfigured(msg)
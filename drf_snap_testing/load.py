@@ -0,0 +1,189 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Mapping, TypedDict
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+from django.test import Client
+from django.utils.crypto import get_random_string
+
+from .benchmark import percentile
+from .records import TestRecords
+
+if TYPE_CHECKING:
+    # The auth models can't be imported before the apps are ready
+    from django.contrib.auth.base_user import AbstractBaseUser
+
+# How long a request of the load may take, in seconds
+LOAD_TIMEOUT = 30
+# The statuses from this one on are counted as failed, along with the connection errors
+ERROR_STATUS = 500
+
+
+class LoadResult(TypedDict):
+    """
+    The outcome of the concurrent requests of a load.
+
+    The latencies are in seconds, and the throughput in requests per second.
+    The failed requests are the server errors, plus the ones that got no response,
+    by their connection errors.
+    """
+
+    threads: int
+    requests: int
+    statuses: dict[int, int]
+    connection_errors: dict[str, int]
+    failed: int
+    duration: float
+    throughput: float
+    min_time: float
+    median_time: float
+    p95_time: float
+    max_time: float
+
+
+class LoadRequest(TypedDict):
+    """A request to replay against the live server."""
+
+    method: str
+    url: str
+    body: bytes | None
+    headers: dict[str, str]
+
+
+def get_load(tam: Mapping[str, Any]) -> tuple[int, int] | None:
+    """
+    Return how many threads to send the request of a test from, and how many times.
+
+    The load test attribute is either the threads, or a dict of the threads
+    and requests. Unless set, each thread sends the request once.
+    """
+    load = tam.get("load")
+    if not load:
+        return None
+    if not isinstance(load, Mapping):
+        load = {"threads": load}
+
+    threads = int(load["threads"])
+    requests = int(load.get("requests", threads))
+    if threads < 1 or requests < 1:
+        msg = f"Invalid load {load}, it must send at least one request"
+        raise ValueError(msg)
+    return threads, requests
+
+
+def login(user: "AbstractBaseUser | None") -> dict[str, str]:
+    """
+    Return the headers of the requests of a user, logged in with a session.
+
+    The requests carry a CSRF token as well, as the views
+    of DRF's SessionAuthentication enforce it for the logged in users.
+    """
+    if user is None:
+        return {}
+
+    client = Client()
+    client.force_login(user)
+    csrf_token = get_random_string(CSRF_SECRET_LENGTH, CSRF_ALLOWED_CHARS)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return {
+        "Cookie": (
+            f"{settings.SESSION_COOKIE_NAME}={session}; "
+            f"{settings.CSRF_COOKIE_NAME}={csrf_token}"
+        ),
+        settings.CSRF_HEADER_NAME.removeprefix("HTTP_").replace("_", "-"): csrf_token,
+    }
+
+
+def load_request(
+    request: HttpRequest,
+    live_server_url: str,
+    headers: dict[str, str],
+) -> LoadRequest:
+    """Return the request of a test, built by the request factory, to replay it."""
+    url = live_server_url + request.path
+    if query_string := request.META.get("QUERY_STRING"):
+        url = f"{url}?{query_string}"
+
+    headers = dict(headers)
+    if content_type := request.META.get("CONTENT_TYPE"):
+        headers["Content-Type"] = content_type
+    return {
+        "method": request.method or "GET",
+        "url": url,
+        "body": request.body or None,
+        "headers": headers,
+    }
+
+
+def send(request: LoadRequest) -> tuple[int | str, float]:
+    """Send the request, and return its status, or the error it failed with."""
+    http_request = urllib.request.Request(
+        request["url"],
+        data=request["body"],
+        headers=request["headers"],
+        method=request["method"],
+    )
+    start = time.perf_counter()
+    status: int | str
+    try:
+        with urllib.request.urlopen(  # noqa: S310 # nosec
+            http_request,
+            timeout=LOAD_TIMEOUT,
+        ) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as err:
+        status = err.code
+    except OSError as err:
+        status = err.__class__.__name__
+    return status, time.perf_counter() - start
+
+
+def run_load(request: LoadRequest, threads: int, requests: int) -> LoadResult:
+    """Send the request that many times, from that many threads at once."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        outcomes = list(executor.map(send, [request] * requests))
+    duration = time.perf_counter() - start
+
+    latencies = [latency for _, latency in outcomes]
+    statuses = Counter(status for status, _ in outcomes if isinstance(status, int))
+    connection_errors = Counter(
+        status for status, _ in outcomes if isinstance(status, str)
+    )
+    failed = sum(connection_errors.values()) + sum(
+        count for status, count in statuses.items() if status >= ERROR_STATUS
+    )
+    return {
+        "threads": threads,
+        "requests": requests,
+        "statuses": dict(sorted(statuses.items())),
+        "connection_errors": dict(sorted(connection_errors.items())),
+        "failed": failed,
+        "duration": round(duration, 6),
+        "throughput": round(requests / duration, 2),
+        "min_time": round(min(latencies), 6),
+        "median_time": round(statistics.median(latencies), 6),
+        "p95_time": round(percentile(latencies, 95), 6),
+        "max_time": round(max(latencies), 6),
+    }
+
+
+class LoadResults(TestRecords[dict[str, Any]]):
+    """
+    The outcomes of the loads of the snapshot tests, by test id.
+
+    They're kept in the JSON file set by LOAD_PATH, apart from the snapshots,
+    as they change from run to run.
+    """
+
+    setting = "LOAD_PATH"
+
+
+load_results = LoadResults()
@@ -0,0 +1,97 @@
+from typing import Any, Iterable, Mapping, TypedDict, cast
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .records import TestRecords
+from .settings import snap_settings
+
+
+class QueryMetrics(TypedDict):
+    """The cost of the queries made to a database."""
+
+    count: int
+    time: float
+    max_query_time: float
+
+
+class QueryBudget(TypedDict, total=False):
+    """The most the queries made to a database may cost. Every limit is optional."""
+
+    count: int
+    time: float
+    max_query_time: float
+
+
+QUERY_BUDGET_KEYS = frozenset(QueryBudget.__annotations__)
+
+
+def query_metrics(queries: Iterable[Mapping[str, Any]]) -> QueryMetrics:
+    """Measure the queries, as logged by Django."""
+    times = [float(query["time"]) for query in queries]
+    return {
+        "count": len(times),
+        "time": round(sum(times), 6),
+        "max_query_time": max(times, default=0.0),
+    }
+
+
+def resolve_query_budget(
+    budget: QueryBudget | Mapping[str, QueryBudget],
+) -> dict[str, QueryBudget]:
+    """
+    Return the budget of each database.
+
+    A budget that isn't keyed by database alias is the budget of the default one.
+    """
+    if set(budget) <= QUERY_BUDGET_KEYS:
+        return {DEFAULT_DB_ALIAS: cast(QueryBudget, budget)}
+
+    budgets = dict(cast(Mapping[str, QueryBudget], budget))
+    for db_alias, db_budget in budgets.items():
+        if db_alias not in settings.DATABASES:
+            msg = f"Invalid query budget, there's no {db_alias} database"
+            raise ValueError(msg)
+        if not isinstance(db_budget, Mapping) or set(db_budget) - QUERY_BUDGET_KEYS:
+            msg = (
+                f"Invalid query budget for the {db_alias} database, "
+                f"it must be a dict of some of {', '.join(sorted(QUERY_BUDGET_KEYS))}"
+            )
+            raise ValueError(msg)
+    return budgets
+
+
+def exceeded_query_budget(metrics: QueryMetrics, budget: QueryBudget) -> list[str]:
+    """
+    Describe each limit of the budget that the metrics exceed.
+
+    The limits are raised by the tolerances first: QUERY_COUNT_TOLERANCE queries
+    for the count, and QUERY_TIME_TOLERANCE, as a fraction, for the times,
+    as they vary from run to run.
+    """
+    limits = cast(Mapping[str, float], budget)
+    values = cast(Mapping[str, float], metrics)
+    exceeded = []
+    for name, limit in limits.items():
+        if name == "count":
+            allowed = limit + snap_settings.QUERY_COUNT_TOLERANCE
+        else:
+            allowed = limit * (1 + snap_settings.QUERY_TIME_TOLERANCE)
+        if values[name] > allowed:
+            exceeded.append(f"{name} is {values[name]}, over the budget of {limit}")
+    return exceeded
+
+
+class TestMetrics(TestRecords[dict[str, QueryMetrics]]):
+    """
+    The query metrics of the snapshot tests, by test id and database alias.
+
+    They're kept in the JSON file set by QUERY_METRICS_PATH. Unlike the snapshots,
+    they're never compared, as they change from run to run, but they help
+    to set and review the query budgets.
+    """
+
+    setting = "QUERY_METRICS_PATH"
+
+
+test_metrics = TestMetrics()
@@ -0,0 +1,201 @@
+import functools
+import hashlib
+import multiprocessing.util
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Not available on Windows
+    fcntl = None  # type: ignore [assignment]
+
+# The id shared by every worker of a test run.
+# SnapDiscoverRunner and the pytest plugin set it for the run, and their workers
+# inherit it, else the ones of pytest-xdist have their own.
+RUN_ID_VARIABLE = "DRF_SNAP_TESTING_RUN_ID"
+XDIST_RUN_ID_VARIABLE = "PYTEST_XDIST_TESTRUNUID"
+
+# Where the claims and locks of every run are kept
+STATE_DIRECTORY = Path(tempfile.gettempdir()) / "drf-snap-testing"
+# Claims of runs older than this are removed
+STALE_RUN_SECONDS = 24 * 60 * 60
+
+
+@functools.cache
+def get_umask() -> int:
+    """
+    Return the umask of the process.
+
+    It can only be read by setting it, so it's read once, when first needed,
+    and set back right away.
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def get_run_id() -> str | None:
+    """Return the id of the current test run, if it's shared with the workers."""
+    return os.environ.get(RUN_ID_VARIABLE) or os.environ.get(XDIST_RUN_ID_VARIABLE)
+
+
+def start_run() -> None:
+    """Start a test run, shared with the worker processes started afterwards."""
+    os.environ[RUN_ID_VARIABLE] = uuid.uuid4().hex
+
+
+def end_run() -> None:
+    """End the test run, removing its snapshot claims."""
+    if (run_id := os.environ.pop(RUN_ID_VARIABLE, None)) is not None:
+        shutil.rmtree(STATE_DIRECTORY / "runs" / run_id, ignore_errors=True)
+
+
+_exit_functions: list[Callable[[], None]] = []
+
+
+def at_exit(func: Callable[[], None]) -> None:
+    """
+    Call the function when the process exits.
+
+    Unlike with atexit, it's also called when the worker processes of
+    multiprocessing exit, like the ones of Django's parallel test runner.
+    """
+    _exit_functions.append(func)
+
+
+def run_exit_functions() -> None:
+    """Call the functions registered with at_exit."""
+    for func in _exit_functions:
+        func()
+
+
+def register_exit_functions(*_args: Any) -> None:
+    """Run the exit functions when the process exits."""
+    multiprocessing.util.Finalize(None, run_exit_functions, exitpriority=0)
+
+
+register_exit_functions()
+# Forked worker processes start without the finalizers of their parent
+multiprocessing.util.register_after_fork(run_exit_functions, register_exit_functions)
+
+
+def atomic_write(path: Path, content: bytes) -> None:
+    """
+    Write the file through a temporary file that's then renamed over it.
+
+    Other processes see either the old or the new contents, never a torn file.
+    """
+    descriptor, name = tempfile.mkstemp(
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+    )
+    temp_path = Path(name)
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        # Temporary files are created private, but the files they replace aren't
+        temp_path.chmod(0o666 & ~get_umask())
+        temp_path.replace(path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on the path, across processes.
+
+    The lock file is kept apart from the path, so that the path itself can be
+    replaced while the lock is held. Where fcntl isn't available, nothing is locked.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+
+    lock_directory = STATE_DIRECTORY / "locks"
+    lock_directory.mkdir(parents=True, exist_ok=True)
+    lock_path = lock_directory / hashlib.sha256(str(path).encode()).hexdigest()
+    with lock_path.open("wb") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SnapshotClaims:
+    """
+    Detect snapshot paths used by more than one test of a run, across processes.
+
+    Each test claims the paths of its snapshots by linking a marker file, named
+    after the path, into a directory shared by all the workers of the run.
+    Linking fails if the marker exists, so only the first test gets it,
+    and the others read who got it instead. No lock is ever taken.
+
+    Without a run shared with the workers, the claims are the process' own,
+    and are removed when it exits.
+    """
+
+    def __init__(self, run_id: str | None) -> None:
+        """Initialize the claims of the run."""
+        if run_id is None:
+            run_id = uuid.uuid4().hex
+            at_exit(functools.partial(self.remove, os.getpid()))
+        self.directory = STATE_DIRECTORY / "runs" / run_id
+        # The paths claimed by this process, and their owners
+        self.owners: dict[str, str] = {}
+
+    def claim(self, path: Path, owner: str) -> str | None:
+        """Claim the path for the owner, returning the other owner if there's one."""
+        key = hashlib.sha256(str(path).encode()).hexdigest()
+        if self.owners.get(key) == owner:
+            return None
+
+        if not self.directory.exists():
+            self.prune()
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        marker = self.directory / key
+        descriptor, name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        temp_path = Path(name)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(owner)
+        try:
+            marker.hardlink_to(temp_path)
+        except FileExistsError:
+            claimant = marker.read_text(encoding="utf-8")
+            if claimant != owner:
+                return claimant
+        finally:
+            temp_path.unlink()
+
+        self.owners[key] = owner
+        return None
+
+    def prune(self) -> None:
+        """Remove the claims of old runs."""
+        with suppress(FileNotFoundError):
+            for directory in self.directory.parent.iterdir():
+                with suppress(FileNotFoundError):
+                    if time.time() - directory.stat().st_mtime > STALE_RUN_SECONDS:
+                        shutil.rmtree(directory, ignore_errors=True)
+
+    def remove(self, pid: int) -> None:
+        """Remove the claims, from the process that made them, not its forks."""
+        if os.getpid() == pid:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+@functools.cache
+def get_snapshot_claims() -> SnapshotClaims:
+    """Return the snapshot claims of the current run, created when first needed."""
+    return SnapshotClaims(get_run_id())
@@ -0,0 +1,104 @@
+import json
+import re
+from typing import Any, Iterator, NamedTuple
+
+from django.db import DatabaseError, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from .capture import unlogged
+
+# Statements that read tables, and whose plan is worth knowing
+EXPLAINABLE = re.compile(r"^\s*(?:SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+# A SQLite step that reads every row of a table, e.g. "SCAN snippets_snippet"
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\S+)(?: AS \S+)?$")
+
+
+class PlanStep(NamedTuple):
+    """A step of a query plan."""
+
+    depth: int
+    detail: str
+    # The table the step reads every row of, if it does
+    full_scan: str | None = None
+
+
+def explain(connection: BaseDatabaseWrapper, sql: str) -> list[PlanStep] | None:
+    """
+    Return the plan the database has for the statement.
+
+    Only SQLite and PostgreSQL are supported. The plan is None if the statement
+    can't be explained, like an INSERT, or if the database failed to explain it.
+    Either way, the EXPLAIN never shows in the connection's query log.
+    """
+    if not EXPLAINABLE.match(sql):
+        return None
+
+    if connection.vendor == "sqlite":
+        explain_sql, parse = f"EXPLAIN QUERY PLAN {sql}", parse_sqlite_plan
+    elif connection.vendor == "postgresql":
+        explain_sql, parse = f"EXPLAIN (FORMAT JSON) {sql}", parse_postgresql_plan
+    else:
+        msg = f"Query plans aren't supported for {connection.vendor} databases"
+        raise NotImplementedError(msg)
+
+    try:
+        # The savepoint keeps a failed EXPLAIN from breaking the transaction
+        with (
+            unlogged(connection),
+            transaction.atomic(using=connection.alias),
+            connection.cursor() as cursor,
+        ):
+            cursor.execute(explain_sql)
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    return list(parse(rows))
+
+
+def parse_sqlite_plan(rows: list[tuple[Any, ...]]) -> Iterator[PlanStep]:
+    """Parse the rows of EXPLAIN QUERY PLAN: id, parent, unused and detail."""
+    depths = {0: -1}
+    for step_id, parent, _, detail in rows:
+        depths[step_id] = depths.get(parent, -1) + 1
+        full_scan = SQLITE_FULL_SCAN.match(detail)
+        yield PlanStep(
+            depths[step_id],
+            detail,
+            full_scan.group(1) if full_scan else None,
+        )
+
+
+def parse_postgresql_plan(rows: list[tuple[Any, ...]]) -> Iterator[PlanStep]:
+    """Parse the JSON plan of EXPLAIN (FORMAT JSON), keeping only its shape."""
+    plan = rows[0][0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    yield from walk_postgresql_plan(plan[0]["Plan"], 0)
+
+
+def walk_postgresql_plan(node: dict[str, Any], depth: int) -> Iterator[PlanStep]:
+    """Yield the steps of a node of a PostgreSQL plan, and of its children."""
+    detail = node["Node Type"]
+    if "Index Name" in node:
+        detail += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        detail += f" on {node['Relation Name']}"
+    full_scan = node.get("Relation Name") if node["Node Type"] == "Seq Scan" else None
+    yield PlanStep(depth, detail, full_scan)
+
+    for child in node.get("Plans", []):
+        yield from walk_postgresql_plan(child, depth + 1)
+
+
+def render_plan(plan: list[PlanStep]) -> list[str]:
+    """Render the steps of the plan as lines, indented by their depth."""
+    return ["  " * step.depth + step.detail for step in plan]
+
+
+def table_size(connection: BaseDatabaseWrapper, table: str) -> int:
+    """Count the rows of the table, without logging the query."""
+    with unlogged(connection), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}",  # noqa: S608
+        )
+        return int(cursor.fetchone()[0])
@@ -0,0 +1,129 @@
+"""
+A pytest plugin that schedules the tests by their recorded timings.
+
+Enable it with `-p drf_snap_testing.pytest_plugin`, or by adding it to
+`pytest_plugins` in a conftest.py, and set TEST_TIMINGS_PATH for the timings
+to be recorded.
+
+The test classes are reordered to run the most expensive ones first,
+which balances the workers of pytest-xdist. With --snap-shard, only a shard
+of the tests is run, and the shards take about the same time. The tests of
+a class are kept in the same shard, unless the class costs more than a shard.
+
+With --snap-benchmark REPEATS, every test's request is benchmarked as well.
+With --snap-skip-unchanged, the tests whose inputs didn't change since they last
+passed are skipped.
+"""
+import os
+from collections import defaultdict
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from .benchmark import BENCHMARK_VARIABLE
+from .impact import SKIP_UNCHANGED_VARIABLE, check_skip_unchanged
+from .parallel import end_run, start_run
+from .records import save_records
+from .sql_cache import sql_format_cache
+from .storage import flush_bundles
+from .timings import parse_shard, split_schedule, test_timings
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the --snap-shard, --snap-benchmark and --snap-skip-unchanged options."""
+    group = parser.getgroup("drf-snap-testing")
+    group.addoption(
+        "--snap-shard",
+        type=parse_shard,
+        help=(
+            "Only run a shard of the tests, given as INDEX/COUNT, e.g. 1/4. "
+            "The shards are balanced by the recorded test timings."
+        ),
+    )
+    group.addoption(
+        "--snap-benchmark",
+        type=int,
+        metavar="REPEATS",
+        help=(
+            "Benchmark the request of every test, repeating it REPEATS times. "
+            "The results are written to BENCHMARK_PATH."
+        ),
+    )
+    group.addoption(
+        "--snap-skip-unchanged",
+        action="store_true",
+        help=(
+            "Skip the tests whose inputs didn't change since they last passed, "
+            "as recorded in TEST_FINGERPRINTS_PATH."
+        ),
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Start the test run, and benchmark and skip the tests if asked to."""
+    # Through the environment, so that the xdist workers inherit them
+    if not hasattr(config, "workerinput"):
+        start_run()
+    if (benchmark := config.getoption("snap_benchmark")) is not None:
+        os.environ[BENCHMARK_VARIABLE] = str(benchmark)
+    if config.getoption("snap_skip_unchanged"):
+        os.environ[SKIP_UNCHANGED_VARIABLE] = "1"
+
+
+def pytest_sessionstart() -> None:
+    """Check that the tests can be skipped if asked to, once Django is set up."""
+    try:
+        check_skip_unchanged()
+    except ImproperlyConfigured as error:
+        raise pytest.UsageError(str(error)) from error
+
+
+def schedule_group(item: pytest.Item) -> str:
+    """Return what the test is scheduled with: its class, or itself."""
+    if getattr(item, "cls", None) is None:
+        return item.nodeid
+    return item.nodeid.rsplit("::", 1)[0]
+
+
+def timing_id(item: pytest.Item) -> str:
+    """Return the id the test timings are recorded with."""
+    if (cls := getattr(item, "cls", None)) is None:
+        return item.nodeid
+    return f"{cls.__module__}.{cls.__qualname__}.{item.name}"
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config,
+    items: list[pytest.Item],
+) -> None:
+    """Sort the test classes by their cost, keeping only the tests of the shard."""
+    estimates = test_timings.estimates(timing_id(item) for item in items)
+    costs = {item: estimates[timing_id(item)] for item in items}
+    groups: dict[str, list[pytest.Item]] = defaultdict(list)
+    for item in items:
+        groups[schedule_group(item)].append(item)
+
+    if (shard := config.getoption("snap_shard")) is not None:
+        index, count = shard
+        scheduled = split_schedule(groups, costs, count)[index]
+        kept = {item for group_items in scheduled.values() for item in group_items}
+        config.hook.pytest_deselected(
+            items=[item for item in items if item not in kept],
+        )
+        groups = {group: scheduled[group] for group in groups if group in scheduled}
+
+    # Sorting is stable, so each class keeps the order of its tests
+    selected = sorted(
+        groups,
+        key=lambda group: -sum(costs[item] for item in groups[group]),
+    )
+    items[:] = [item for group in selected for item in groups[group]]
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Save the records and caches, as xdist workers may not run the exit handlers."""
+    flush_bundles()
+    save_records()
+    sql_format_cache.save()
+    if not hasattr(session.config, "workerinput"):
+        end_run()
@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+from typing import Any, Generic, TypeVar, cast
+
+from .parallel import at_exit, atomic_write, file_lock
+from .settings import snap_settings
+
+_V = TypeVar("_V")
+
+# Every instance of TestRecords, to save them all at once
+_all_records: list["TestRecords[Any]"] = []
+
+
+def save_records() -> None:
+    """Save the values recorded by every instance of TestRecords."""
+    for records in _all_records:
+        records.save()
+
+
+at_exit(save_records)
+
+
+class TestRecords(Generic[_V]):
+    """
+    Values recorded about the tests, by test id, kept in a JSON file.
+
+    The file is the one set by the `setting` of the subclass when the value is
+    recorded, and nothing is recorded when it's not set. Each process records
+    the tests it runs, and merges them into the file under a lock when it exits,
+    so parallel workers don't lose each other's.
+    """
+
+    setting: str
+
+    def __init__(self) -> None:
+        """Initialize the records of this process."""
+        # The recorded values by file, as tests may override the setting
+        self.recorded: dict[Path, dict[str, _V]] = {}
+        _all_records.append(self)
+
+    @property
+    def path(self) -> Path | None:
+        """The file the records are kept in."""
+        path = getattr(snap_settings, self.setting)
+        return Path(path) if path is not None else None
+
+    def record(self, test_id: str, value: _V) -> None:
+        """Record a value for a test, if the records are enabled."""
+        if (path := self.path) is not None:
+            self.recorded.setdefault(path, {})[test_id] = value
+
+    def load(self, path: Path | None = None) -> dict[str, _V]:
+        """Return the records in the file, or in the given one."""
+        if path is None:
+            path = self.path
+        if path is None:
+            return {}
+
+        try:
+            return cast(dict[str, _V], json.loads(path.read_bytes()))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        """Merge the recorded values into their files."""
+        for path, recorded in self.recorded.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(path):
+                records = {**self.load(path), **recorded}
+                content = json.dumps(records, indent=2, sort_keys=True) + "\n"
+                atomic_write(path, content.encode())
+        self.recorded.clear()
@@ -0,0 +1,24 @@
+from typing import Any, Mapping, cast
+
+from rest_framework import renderers
+
+from .encoders import BodyEncoder
+from .settings import snap_settings
+
+
+class BodyRenderer(renderers.BaseRenderer):
+    """Render the data as is, with the encoder set by BODY_ENCODER."""
+
+    media_type = "application/json"
+    format = "json"  # noqa: A003
+    charset = "utf-8"
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,  # noqa: ARG002
+        renderer_context: Mapping[str, Any] | None = None,  # noqa: ARG002
+    ) -> bytes:
+        """Encode the data, ending it with a newline."""
+        encoder = cast(BodyEncoder, snap_settings.BODY_ENCODER)
+        return (encoder(data) + "\n").encode()
@@ -0,0 +1,152 @@
+"""
+Fast resets of the test databases, for the tests that really commit.
+
+Rather than flushing every table after each test, and losing the data
+of the migrations along with the rest, the databases are restored from
+a snapshot taken before the first test:
+- SQLite, with its backup API, from a copy in memory
+- PostgreSQL, by cloning the database from a template of it
+The other databases are flushed, as Django's TransactionTestCase does.
+"""
+import abc
+import sqlite3
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from .parallel import at_exit
+
+
+class DatabaseSnapshot(abc.ABC):
+    """A copy of a database, taken when created, that it can be restored from."""
+
+    def __init__(self, connection: BaseDatabaseWrapper) -> None:
+        """Take the snapshot of the database of the connection."""
+        self.connection = connection
+
+    @abc.abstractmethod
+    def restore(self) -> None:
+        """Restore the database from the snapshot."""
+
+    def discard(self) -> None:  # noqa: B027
+        """Remove the snapshot, if there's anything to remove."""
+
+
+class SQLiteSnapshot(DatabaseSnapshot):
+    """
+    A snapshot of a SQLite database, in memory, restored with the backup API.
+
+    The backup copies the pages of the database as they are, so it
+    takes about as long as reading it, whatever its number of tables.
+    """
+
+    def __init__(self, connection: BaseDatabaseWrapper) -> None:
+        """Copy the database into memory."""
+        super().__init__(connection)
+        connection.ensure_connection()
+        self.copy = sqlite3.connect(":memory:", check_same_thread=False)
+        connection.connection.backup(self.copy)
+
+    def restore(self) -> None:
+        """Copy the snapshot back over the database."""
+        self.connection.ensure_connection()
+        self.copy.backup(self.connection.connection)
+
+    def discard(self) -> None:
+        """Free the copy."""
+        self.copy.close()
+
+
+class PostgresSnapshot(DatabaseSnapshot):
+    """
+    A snapshot of a PostgreSQL database, as a template database.
+
+    The database is restored by dropping it, and creating it again from
+    the template, which copies its files rather than replaying its data.
+    No other session may be connected to either of them meanwhile,
+    so the ones left to the database, like of a live server, are ended.
+    """
+
+    def __init__(self, connection: BaseDatabaseWrapper) -> None:
+        """Create the template database, as a copy of the database."""
+        super().__init__(connection)
+        self.name = connection.ops.quote_name(connection.settings_dict["NAME"])
+        self.template = connection.ops.quote_name(
+            f"{connection.settings_dict['NAME']}_snapshot",
+        )
+        self.execute(
+            f"DROP DATABASE IF EXISTS {self.template}",
+            f"CREATE DATABASE {self.template} TEMPLATE {self.name}",
+        )
+
+    def execute(self, *statements: str) -> None:
+        """Run the statements outside of the database, without sessions to it."""
+        self.connection.close()
+        # pylint: disable-next=protected-access
+        with self.connection._nodb_cursor() as cursor:  # noqa: SLF001
+            cursor.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = %s AND pid <> pg_backend_pid()",
+                [self.connection.settings_dict["NAME"]],
+            )
+            for statement in statements:
+                cursor.execute(statement)
+
+    def restore(self) -> None:
+        """Create the database again, from the template."""
+        self.execute(
+            f"DROP DATABASE {self.name}",
+            f"CREATE DATABASE {self.name} TEMPLATE {self.template}",
+        )
+
+    def discard(self) -> None:
+        """Drop the template database."""
+        # pylint: disable-next=protected-access
+        with self.connection._nodb_cursor() as cursor:  # noqa: SLF001
+            cursor.execute(f"DROP DATABASE IF EXISTS {self.template}")
+
+
+# The snapshot classes, by the vendor of the database
+SNAPSHOT_CLASSES: dict[str, type[DatabaseSnapshot]] = {
+    "sqlite": SQLiteSnapshot,
+    "postgresql": PostgresSnapshot,
+}
+
+
+class DatabaseSnapshots:
+    """
+    The snapshots of the test databases of this process, by database alias.
+
+    Each is taken once, the first time it's asked for, and discarded when
+    the process exits. The workers of a parallel run have their own
+    databases, and so take their own snapshots.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the snapshots, none taken yet."""
+        self.snapshots: dict[str, DatabaseSnapshot] = {}
+        at_exit(self.discard)
+
+    def take(self, alias: str) -> None:
+        """Take the snapshot of the database, unless taken or unsupported."""
+        connection = connections[alias]
+        snapshot_class = SNAPSHOT_CLASSES.get(connection.vendor)
+        if alias not in self.snapshots and snapshot_class is not None:
+            self.snapshots[alias] = snapshot_class(connection)
+
+    def restore(self, alias: str) -> bool:
+        """Restore the database from its snapshot, returning whether it had one."""
+        snapshot = self.snapshots.get(alias)
+        if snapshot is None:
+            return False
+        snapshot.restore()
+        return True
+
+    def discard(self) -> None:
+        """Discard every snapshot."""
+        while self.snapshots:
+            _, snapshot = self.snapshots.popitem()
+            snapshot.discard()
+
+
+database_snapshots = DatabaseSnapshots()
@@ -0,0 +1,199 @@
+import os
+import unittest
+from argparse import ArgumentParser
+from collections import defaultdict
+from typing import Any, Iterable, Iterator, Type
+
+from django.test import SimpleTestCase, TestCase
+from django.test.runner import DiscoverRunner, ParallelTestSuite
+
+from .benchmark import BENCHMARK_VARIABLE
+from .database_cache import cached_test_databases
+from .impact import SKIP_UNCHANGED_VARIABLE, check_skip_unchanged
+from .parallel import end_run, start_run
+from .testcase import SnapTransactionAPITestCase
+from .timings import parse_shard, split_schedule, test_timings
+
+
+def iter_test_cases(suite: unittest.TestSuite) -> Iterator[unittest.TestCase]:
+    """Yield the tests of the suite, flattening the nested suites."""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_test_cases(test)
+        else:
+            yield test
+
+
+def group_by_case(
+    tests: Iterable[unittest.TestCase],
+) -> dict[Type[Any], list[unittest.TestCase]]:
+    """Return the tests, by test case class."""
+    groups: dict[Type[Any], list[unittest.TestCase]] = defaultdict(list)
+    for test in tests:
+        groups[type(test)].append(test)
+    return groups
+
+
+def estimate_costs(
+    tests: Iterable[unittest.TestCase],
+) -> dict[unittest.TestCase, float]:
+    """Estimate the cost of each test, by its recorded timing."""
+    tests = list(tests)
+    estimates = test_timings.estimates(test.id() for test in tests)
+    return {test: estimates[test.id()] for test in tests}
+
+
+class SnapParallelTestSuite(ParallelTestSuite):
+    """
+    A parallel test suite that runs the most expensive test cases first.
+
+    Workers take the test cases one at a time, as they become free,
+    so starting with the longest ones balances them out. A test case
+    that costs more than a worker's share is split up between the workers.
+    """
+
+    def __init__(
+        self,
+        subsuites: list[unittest.TestSuite],
+        processes: int,
+        *args: Any,
+    ) -> None:
+        """Split and sort the test cases by their recorded timings."""
+        groups = {
+            index: list(iter_test_cases(subsuite))
+            for index, subsuite in enumerate(subsuites)
+        }
+        costs = estimate_costs(test for tests in groups.values() for test in tests)
+        parts = [
+            tests
+            for scheduled in split_schedule(groups, costs, processes)
+            for tests in scheduled.values()
+        ]
+        parts.sort(key=lambda tests: -sum(costs[test] for test in tests))
+        super().__init__(
+            [unittest.TestSuite(tests) for tests in parts],
+            processes,
+            *args,
+        )
+
+
+class SnapDiscoverRunner(DiscoverRunner):
+    """
+    A test runner that schedules the tests by their recorded timings.
+
+    Set TEST_TIMINGS_PATH for the timings to be recorded, and use this runner
+    with TEST_RUNNER = "drf_snap_testing.runner.SnapDiscoverRunner".
+
+    With --parallel, the most expensive test cases are run first. With --shard,
+    only a shard of the test cases is run, and the shards are balanced so that
+    they take about the same time. Test cases are only split across the workers
+    or the shards when they cost more than their share, as their class-level
+    setup is run again for each part.
+
+    With --benchmark REPEATS, every test's request is benchmarked as well.
+    With --skip-unchanged, the tests whose inputs didn't change since they last
+    passed are skipped, as recorded in TEST_FINGERPRINTS_PATH.
+
+    The SnapTransactionAPITestCase tests are run right after the TestCase ones,
+    before the other TransactionTestCase ones flush the databases, so that
+    the snapshots they restore the databases from keep the migrations' data.
+
+    With TEST_DATABASE_CACHE_PATH set, the migrated test databases are cached,
+    and copied into place by the next runs, until the migrations change.
+    """
+
+    parallel_test_suite = SnapParallelTestSuite
+    # The stubs type it as a tuple of test cases, rather than of their classes
+    reorder_by = (  # type: ignore [assignment]
+        TestCase,
+        SnapTransactionAPITestCase,
+        SimpleTestCase,
+    )
+
+    def __init__(
+        self,
+        *args: Any,
+        shard: tuple[int, int] | None = None,
+        benchmark: int | None = None,
+        skip_unchanged: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the runner."""
+        super().__init__(*args, **kwargs)
+        self.shard = shard
+        # Through the environment, so that the parallel workers inherit them
+        if benchmark is not None:
+            os.environ[BENCHMARK_VARIABLE] = str(benchmark)
+        if skip_unchanged:
+            os.environ[SKIP_UNCHANGED_VARIABLE] = "1"
+            check_skip_unchanged()
+
+    @classmethod
+    def add_arguments(cls: Type["SnapDiscoverRunner"], parser: ArgumentParser) -> None:
+        """Add the --shard, --benchmark and --skip-unchanged arguments."""
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--shard",
+            type=parse_shard,
+            help=(
+                "Only run a shard of the tests, given as INDEX/COUNT, e.g. 1/4. "
+                "The shards are balanced by the recorded test timings."
+            ),
+        )
+        parser.add_argument(
+            "--benchmark",
+            type=int,
+            metavar="REPEATS",
+            help=(
+                "Benchmark the request of every test, repeating it REPEATS times. "
+                "The results are written to BENCHMARK_PATH."
+            ),
+        )
+        parser.add_argument(
+            "--skip-unchanged",
+            action="store_true",
+            help=(
+                "Skip the tests whose inputs didn't change since they last passed, "
+                "as recorded in TEST_FINGERPRINTS_PATH."
+            ),
+        )
+
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        """Start the test run, that the parallel workers share."""
+        super().setup_test_environment(**kwargs)
+        start_run()
+
+    def teardown_test_environment(self, **kwargs: Any) -> None:
+        """End the test run."""
+        end_run()
+        super().teardown_test_environment(**kwargs)
+
+    def setup_databases(self, **kwargs: Any) -> list[tuple[Any, str, bool]]:
+        """Create the test databases, from the cached ones if they're unchanged."""
+        with cached_test_databases():
+            return super().setup_databases(**kwargs)
+
+    def build_suite(self, *args: Any, **kwargs: Any) -> unittest.TestSuite:
+        """Build the suite, keeping only the test cases of the shard."""
+        suite = super().build_suite(*args, **kwargs)
+        if self.shard is None:
+            return suite
+
+        index, count = self.shard
+        tests = list(iter_test_cases(suite))
+        scheduled = split_schedule(group_by_case(tests), estimate_costs(tests), count)
+        shard = {test for tests in scheduled[index].values() for test in tests}
+
+        if isinstance(suite, ParallelTestSuite):
+            subsuites = [
+                self.test_suite(
+                    test for test in iter_test_cases(subsuite) if test in shard
+                )
+                for subsuite in suite.subsuites
+            ]
+            suite.subsuites = [
+                subsuite for subsuite in subsuites if subsuite.countTestCases()
+            ]
+            return suite
+
+        return self.test_suite(test for test in tests if test in shard)
@@ -1,7 +1,9 @@
 from .base import DictSerializer, ReadOnlySerializer
 from .database_diff import DatabaseDiffSerializer
+from .load import LoadSerializer
 from .mailbox import MailboxSerializer
-from .query import QuerySerializer
+from .profile import ProfileFunctionSerializer, ProfileSerializer
+from .query import QueryGroupSerializer, QuerySerializer
 from .response import RequestResponseSerializer
 from .testinfo import TestInfoSerializer
 
@@ -11,6 +13,10 @@ __all__ = (
     "TestInfoSerializer",
     "RequestResponseSerializer",
     "QuerySerializer",
+    "QueryGroupSerializer",
     "DatabaseDiffSerializer",
     "MailboxSerializer",
+    "ProfileSerializer",
+    "ProfileFunctionSerializer",
+    "LoadSerializer",
 )
@@ -0,0 +1,21 @@
+from typing import Any
+
+from rest_framework import serializers
+
+from .base import ReadOnlySerializer
+
+
+class LoadSerializer(ReadOnlySerializer[dict[str, Any]]):
+    """A serializer for the outcome of the concurrent requests of a load."""
+
+    threads = serializers.IntegerField()
+    requests = serializers.IntegerField()
+    statuses = serializers.DictField(child=serializers.IntegerField())
+    connection_errors = serializers.DictField(child=serializers.IntegerField())
+    failed = serializers.IntegerField()
+    duration = serializers.FloatField()
+    throughput = serializers.FloatField()
+    min_time = serializers.FloatField()
+    median_time = serializers.FloatField()
+    p95_time = serializers.FloatField()
+    max_time = serializers.FloatField()
@@ -0,0 +1,23 @@
+from typing import Any
+
+from rest_framework import serializers
+
+from .base import ReadOnlySerializer
+
+
+class ProfileFunctionSerializer(ReadOnlySerializer[dict[str, Any]]):
+    """A serializer for a function of a cProfile table."""
+
+    function = serializers.CharField()
+    calls = serializers.IntegerField()
+    total_time = serializers.FloatField()
+    cumulative_time = serializers.FloatField()
+
+
+class ProfileSerializer(ReadOnlySerializer[dict[str, Any]]):
+    """A serializer for the profile of a request."""
+
+    wall_time = serializers.FloatField()
+    cpu_time = serializers.FloatField()
+    peak_memory = serializers.IntegerField(allow_null=True)
+    functions = ProfileFunctionSerializer(many=True, required=False)
@@ -2,6 +2,7 @@ from typing import Any
 
 from rest_framework import serializers
 
+from ..sql import QueryGroup
 from .base import ReadOnlySerializer
 from .fields import SQLField
 
@@ -11,3 +12,13 @@ class QuerySerializer(ReadOnlySerializer[list[dict[str, Any]]]):
 
     sql = SQLField()
     time = serializers.FloatField()
+    plan = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+
+class QueryGroupSerializer(ReadOnlySerializer[list[QueryGroup]]):
+    """A serializer for the queries grouped by fingerprint."""
+
+    sql = SQLField()
+    count = serializers.IntegerField()
+    time = serializers.FloatField()
+    plan = serializers.ListField(child=serializers.CharField(), read_only=True)
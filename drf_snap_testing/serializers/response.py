@@ -1,15 +1,18 @@
 import json
+from typing import Any, cast
 
-from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpRequest
 from drf_yaml.styles import LiteralStr
 from rest_framework import serializers
 from rest_framework.response import Response
 
+from ..encoders import BodyEncoder
+from ..settings import snap_settings
 from .base import ReadOnlySerializer
 
 
-class RequestSerializer(ReadOnlySerializer[WSGIRequest]):
-    """A serializer for django.core.handlers.wsgi.WSGIRequest."""
+class RequestSerializer(ReadOnlySerializer[HttpRequest]):
+    """A serializer for a WSGIRequest, or an ASGIRequest from the async client."""
 
     user = serializers.CharField()
     method = serializers.CharField()
@@ -18,11 +21,11 @@ class RequestSerializer(ReadOnlySerializer[WSGIRequest]):
     headers = serializers.DictField()
     body = serializers.SerializerMethodField(required=False)
 
-    def get_query_params(self, obj: WSGIRequest) -> str | None:
+    def get_query_params(self, obj: HttpRequest) -> str | None:
         """Return the query params as a string."""
         return obj.META.get("QUERY_STRING")
 
-    def get_body(self, obj: WSGIRequest) -> LiteralStr | None:
+    def get_body(self, obj: HttpRequest) -> LiteralStr | None:
         """Return the body as a YAML literal str."""
         body = obj.POST
         if not body:
@@ -38,9 +41,27 @@ class ResponseSerializer(ReadOnlySerializer[Response]):
     headers = serializers.DictField()
     body = serializers.SerializerMethodField(required=False)
 
+    def get_fields(self) -> dict[str, serializers.Field]:  # type: ignore [type-arg]
+        """Leave the body out if the include_body context is false."""
+        fields = super().get_fields()
+        if not self.context.get("include_body", True):
+            del fields["body"]
+        return fields
+
     def get_body(self, obj: Response) -> LiteralStr:
-        """Return the body as a YAML literal str."""
-        return LiteralStr(json.dumps(obj.data, indent=2))
+        """
+        Return the body as a YAML literal str, encoded by BODY_ENCODER.
+
+        If the content context is true, it's the rendered content instead,
+        as the clients receive it.
+        """
+        if self.context.get("content", False):
+            return LiteralStr(
+                obj.content.decode(obj.charset or "utf-8", errors="backslashreplace"),
+            )
+
+        encoder = cast(BodyEncoder, snap_settings.BODY_ENCODER)
+        return LiteralStr(encoder(obj.data))
 
 
 class RequestResponseSerializer(ReadOnlySerializer[Response]):
@@ -48,8 +69,16 @@ class RequestResponseSerializer(ReadOnlySerializer[Response]):
     A serializer for a request and its accompanying response.
 
     More accurately, this is a serializer for a rest_framework.response.Response
-    and its accompanying django.core.handlers.wsgi.WSGIRequest.
+    and its accompanying django.core.handlers.wsgi.WSGIRequest, or the ASGIRequest
+    of the async client.
     """
 
-    request = RequestSerializer(source="wsgi_request")
+    request = serializers.SerializerMethodField()
     response = ResponseSerializer(source="*")
+
+    def get_request(self, obj: Response) -> dict[str, Any]:
+        """Serialize the request of the response, whichever handler it went through."""
+        request = getattr(obj, "wsgi_request", None)
+        if request is None:
+            request = obj.asgi_request  # type: ignore [attr-defined]
+        return RequestSerializer(request, context=self.context).data
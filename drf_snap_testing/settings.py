@@ -36,6 +36,24 @@ class Settings(TypedDict, total=False):
     DEFAULT_SNAP_CLASS: str
     DEFAULT_BITS: list[str]
     DEFAULT_GET_SNAP_PATH: str
+    DEFAULT_SNAP_STORAGE: str
+    SNAPSHOT_DIGESTS: bool
+    SNAPSHOT_DIGESTS_PATH: str | None
+    DETECT_SNAPSHOT_COLLISIONS: bool
+    SNAPSHOT_DIFF_LIMIT: int
+    TEST_TIMINGS_PATH: str | None
+    TEST_FINGERPRINTS_PATH: str | None
+    QUERY_METRICS_PATH: str | None
+    QUERY_COUNT_TOLERANCE: int
+    QUERY_TIME_TOLERANCE: float
+    BENCHMARK_PATH: str | None
+    PROFILE_PATH: str | None
+    LOAD_PATH: str | None
+    BENCHMARK_WARMUP: int
+    BODY_ENCODER: str
+    SQL_FORMAT_CACHE_SIZE: int
+    SQL_FORMAT_CACHE_PATH: str | None
+    TEST_DATABASE_CACHE_PATH: str | None
 
 
 DEFAULTS: Settings = {
@@ -48,6 +66,24 @@ DEFAULTS: Settings = {
         "drf_snap_testing.bits.Response",
     ],
     "DEFAULT_GET_SNAP_PATH": "drf_snap_testing.bit.dynamic_path",
+    "DEFAULT_SNAP_STORAGE": "drf_snap_testing.storage.FileStorage",
+    "SNAPSHOT_DIGESTS": False,
+    "SNAPSHOT_DIGESTS_PATH": None,
+    "DETECT_SNAPSHOT_COLLISIONS": True,
+    "SNAPSHOT_DIFF_LIMIT": 50,
+    "TEST_TIMINGS_PATH": None,
+    "TEST_FINGERPRINTS_PATH": None,
+    "QUERY_METRICS_PATH": None,
+    "QUERY_COUNT_TOLERANCE": 0,
+    "QUERY_TIME_TOLERANCE": 0.5,
+    "BENCHMARK_PATH": None,
+    "PROFILE_PATH": None,
+    "LOAD_PATH": None,
+    "BENCHMARK_WARMUP": 1,
+    "BODY_ENCODER": "drf_snap_testing.encoders.json_body",
+    "SQL_FORMAT_CACHE_SIZE": 1024,
+    "SQL_FORMAT_CACHE_PATH": None,
+    "TEST_DATABASE_CACHE_PATH": None,
 }
 
 
@@ -55,11 +91,14 @@ DEFAULTS: Settings = {
 IMPORT_STRINGS = [
     "DEFAULT_BITS",
     "DEFAULT_GET_SNAP_PATH",
+    "DEFAULT_SNAP_STORAGE",
+    "BODY_ENCODER",
 ]
 
 # List of settings that may require an instanciate call
 CREATE_INSTANCES = [
     "DEFAULT_BITS",
+    "DEFAULT_SNAP_STORAGE",
 ]
 
 
@@ -119,6 +158,9 @@ class SnapSettings:
         self.import_strings = import_strings or IMPORT_STRINGS
         self.create_instances = create_instances or CREATE_INSTANCES
         self._cached_attrs: set[str] = set()
+        # Incremented on every reload, so that what's derived from the settings
+        # can be cached until they change
+        self.generation = 0
 
     @property
     def user_settings(self) -> Settings:
@@ -164,6 +206,7 @@ class SnapSettings:
         self._cached_attrs.clear()
         if hasattr(self, "_user_settings"):
             delattr(self, "_user_settings")
+        self.generation += 1
 
 
 snap_settings = SnapSettings(None, DEFAULTS, IMPORT_STRINGS)
@@ -0,0 +1,52 @@
+import functools
+import re
+from typing import Any, Iterable, TypedDict
+
+# Literals, as interpolated by Django in the queries it logs
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r"(?<![\w\"`.])\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+# Lists of literals, whose length depends on the data
+IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+VALUES_LIST = re.compile(r"\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+
+class QueryGroup(TypedDict):
+    """The queries that share a fingerprint."""
+
+    sql: str
+    count: int
+    time: float
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """
+    Normalize the SQL statement, so that it's the same for any parameters.
+
+    Literals are replaced by placeholders, and lists of them, like the ones
+    of IN clauses or multi-row INSERTs, are collapsed into a single one.
+    """
+    sql = STRING.sub("?", sql)
+    sql = NUMBER.sub("?", sql)
+    sql = IN_LIST.sub("IN (...)", sql)
+    sql = VALUES_LIST.sub("VALUES (...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def group_queries(queries: Iterable[dict[str, Any]]) -> list[QueryGroup]:
+    """
+    Group the queries by fingerprint, in the order they were first run.
+
+    Each group has the fingerprint, how many queries share it and their total time.
+    """
+    groups: dict[str, QueryGroup] = {}
+    for query in queries:
+        sql = fingerprint(query["sql"])
+        group = groups.setdefault(sql, {"sql": sql, "count": 0, "time": 0.0})
+        group["count"] += 1
+        group["time"] += float(query["time"])
+
+    for group in groups.values():
+        group["time"] = round(group["time"], 3)
+    return list(groups.values())
@@ -0,0 +1,104 @@
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+import sqlparse
+
+from .parallel import at_exit, atomic_write
+from .settings import snap_settings
+
+
+def format_sql(sql: str) -> str:
+    """Reindent the SQL statement and uppercase its keywords."""
+    formatted = sqlparse.format(sql, reindent=True, keyword_case="upper")
+    if not isinstance(formatted, str):
+        msg = "Expected a string."
+        raise TypeError(msg)
+    return formatted
+
+
+class SQLFormatCache:
+    """
+    A bounded LRU cache of formatted SQL statements, keyed by the raw SQL.
+
+    The size is set by SQL_FORMAT_CACHE_SIZE, and 0 disables the cache.
+    When SQL_FORMAT_CACHE_PATH is set, the cache is loaded from that file
+    and saved back to it when the process exits, so it's kept between runs.
+    The file is discarded if it was written by another version of sqlparse.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self.entries: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.path: Path | None = None
+        self.changed = False
+        at_exit(self.save)
+
+    def get(self, sql: str) -> str:
+        """Return the formatted SQL statement, formatting it if it isn't cached."""
+        self.configure()
+
+        formatted = self.entries.get(sql)
+        if formatted is not None:
+            self.hits += 1
+            self.entries.move_to_end(sql)
+            return formatted
+
+        self.misses += 1
+        formatted = format_sql(sql)
+        maxsize = snap_settings.SQL_FORMAT_CACHE_SIZE
+        if maxsize > 0:
+            self.entries[sql] = formatted
+            self.changed = True
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+        return formatted
+
+    def configure(self) -> None:
+        """Load the persisted cache, if its path has changed."""
+        path = snap_settings.SQL_FORMAT_CACHE_PATH
+        path = Path(path) if path is not None else None
+        if path == self.path:
+            return
+
+        self.save()
+        self.path = path
+        if path is not None:
+            self.load(path)
+
+    def load(self, path: Path) -> None:
+        """Add the entries of the persisted cache, unless they're already cached."""
+        try:
+            data = json.loads(path.read_bytes())
+        except (FileNotFoundError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("sqlparse") != sqlparse.__version__:
+            return
+
+        entries = OrderedDict(data["entries"])
+        entries.update(self.entries)
+        self.entries = entries
+        while len(self.entries) > snap_settings.SQL_FORMAT_CACHE_SIZE:
+            self.entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Persist the cache, if it has a path and has changed."""
+        if self.path is None or not self.changed:
+            return
+
+        data = {"sqlparse": sqlparse.__version__, "entries": list(self.entries.items())}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, json.dumps(data).encode())
+        self.changed = False
+
+    def clear(self) -> None:
+        """Empty the cache and reset its counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.changed = self.path is not None
+
+
+sql_format_cache = SQLFormatCache()
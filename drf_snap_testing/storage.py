@@ -0,0 +1,332 @@
+import json
+import mmap
+from collections import OrderedDict
+from pathlib import Path
+from typing import TypedDict, cast
+
+from .digests import DigestManifest, content_digest, manifest_path
+from .parallel import at_exit, atomic_write, file_lock
+from .settings import snap_settings
+
+# The snapshots written to each bundle, by key, until they're flushed to its file.
+# They're shared by the storages, as the settings may change between tests.
+_pending_writes: dict[Path, dict[str, tuple[bytes, str]]] = {}
+# Every instance of BundleStorage, to flush their bundles at once
+_bundle_storages: list["BundleStorage"] = []
+
+
+def flush_bundles() -> None:
+    """Write the pending snapshots of every bundle to their files."""
+    for storage in _bundle_storages:
+        storage.flush()
+
+
+at_exit(flush_bundles)
+
+
+class SnapshotStorage:
+    """
+    Base class for the snapshot storage backends.
+
+    Bits identify their snapshots by path, but it's up to the storage
+    to decide where and how the contents of that path are kept.
+    """
+
+    def prepare(self, directory: Path) -> None:
+        """Get ready to read and write the snapshots of a test directory."""
+
+    def read(self, path: Path) -> bytes | None:
+        """Return the contents of the snapshot, or None if there's none."""
+        raise NotImplementedError
+
+    def write(self, path: Path, content: bytes, digest: str) -> None:
+        """Save the contents of the snapshot, along with its digest."""
+        raise NotImplementedError
+
+    def get_digest(self, _path: Path) -> str | None:
+        """Return the recorded digest of the snapshot, if it's known."""
+        return None
+
+    def set_digest(self, _path: Path, _digest: str) -> None:
+        """Record the digest of the snapshot, if it exists."""
+
+
+class FileStorage(SnapshotStorage):
+    """
+    Store each snapshot in its own file.
+
+    When SNAPSHOT_DIGESTS is enabled, the digests are kept in a manifest file
+    for each test directory, out of the snapshot tree, in SNAPSHOT_DIGESTS_PATH.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the storage."""
+        self.manifest: DigestManifest | None = None
+
+    def prepare(self, directory: Path) -> None:
+        """Create the test directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def read(self, path: Path) -> bytes | None:
+        """Read the snapshot file."""
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write(self, path: Path, content: bytes, digest: str) -> None:
+        """Write the snapshot file atomically and record its digest."""
+        atomic_write(path, content)
+        self.set_digest(path, digest)
+
+    def get_digest(self, path: Path) -> str | None:
+        """Return the digest in the manifest of the snapshot's directory."""
+        if (manifest := self.get_manifest(path.parent)) is None:
+            return None
+        return manifest.get(path)
+
+    def set_digest(self, path: Path, digest: str) -> None:
+        """Record the digest in the manifest of the snapshot's directory."""
+        manifest = self.get_manifest(path.parent)
+        if manifest is not None and path.exists():
+            manifest.record(path, digest)
+
+    def get_manifest(self, directory: Path) -> DigestManifest | None:
+        """
+        Return the digest manifest of the directory, if digests are enabled.
+
+        Tests run one at a time, so only the last manifest is kept around.
+        """
+        if not snap_settings.SNAPSHOT_DIGESTS:
+            return None
+
+        if self.manifest is None or self.manifest.path != manifest_path(directory):
+            self.manifest = DigestManifest(directory)
+        return self.manifest
+
+
+BUNDLE_MAGIC = b"drf-snap-testing bundle 1\n"
+
+
+class BundleEntry(TypedDict):
+    """The location and digests of a snapshot in a bundle."""
+
+    offset: int
+    length: int
+    # The digest of the filtered render, and of the bit's configuration
+    digest: str
+    # The digest of the contents as stored, to tell if they were edited since
+    checksum: str
+
+
+class Bundle:
+    """
+    A read-only, memory-mapped view of a bundle file.
+
+    The file is made of a magic line, the length of the index, the index itself
+    as JSON and finally the contents of every snapshot, one after the other.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open and map the bundle file, if it exists."""
+        self.path = path
+        self.index: dict[str, BundleEntry] = {}
+        self.data: mmap.mmap | None = None
+        self.start = 0
+
+        try:
+            with path.open("rb") as file:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty files can't be mapped
+            return
+
+        if self.data[: len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+            self.close()
+            msg = f"{path} is not a snapshot bundle"
+            raise ValueError(msg)
+
+        length_start = len(BUNDLE_MAGIC)
+        length_end = self.data.find(b"\n", length_start)
+        index_start = length_end + 1
+        index_end = index_start + int(self.data[length_start:length_end])
+        self.index = cast(
+            dict[str, BundleEntry],
+            json.loads(self.data[index_start:index_end]),
+        )
+        self.start = index_end + 1
+
+    def read(self, key: str) -> bytes | None:
+        """Slice the contents of a snapshot out of the bundle."""
+        entry = self.index.get(key)
+        if entry is None or self.data is None:
+            return None
+
+        start = self.start + entry["offset"]
+        end = start + entry["length"]
+        return self.data[start:end]
+
+    def digest(self, key: str) -> str | None:
+        """
+        Return the digest of a snapshot, if it's still valid.
+
+        It isn't if the contents of the snapshot don't match the checksum
+        they were stored with, like after they were edited by hand.
+        """
+        entry = self.index.get(key)
+        content = self.read(key)
+        if entry is None or content is None:
+            return None
+        if entry.get("checksum") != content_digest(content):
+            return None
+        return entry["digest"]
+
+    def contents(self) -> dict[str, tuple[bytes, str]]:
+        """Return the contents and valid digest, if any, of every snapshot."""
+        return {
+            key: (cast(bytes, self.read(key)), self.digest(key) or "")
+            for key in self.index
+        }
+
+    def close(self) -> None:
+        """Unmap the bundle file."""
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+    @staticmethod
+    def dump(contents: dict[str, tuple[bytes, str]]) -> bytes:
+        """Serialize the snapshots into the bundle file format."""
+        index: dict[str, BundleEntry] = {}
+        chunks = []
+        offset = 0
+        for key in sorted(contents):
+            content, digest = contents[key]
+            index[key] = {
+                "offset": offset,
+                "length": len(content),
+                "digest": digest,
+                "checksum": content_digest(content),
+            }
+            # Separate the snapshots with a newline to keep the file readable
+            chunks.append(content + b"\n")
+            offset += len(content) + 1
+
+        index_json = json.dumps(index, indent=2).encode()
+        header = BUNDLE_MAGIC + str(len(index_json)).encode() + b"\n"
+        return header + index_json + b"\n" + b"".join(chunks)
+
+
+class BundleStorage(SnapshotStorage):
+    """
+    Store the snapshots of all the tests of a class in a single bundle file.
+
+    With the default snapshot paths, the snapshots of `tests/MyTest/test_a/`
+    are kept in `tests/MyTest.snap` instead, under `test_a/<filename>`.
+
+    Bundles are opened once and memory-mapped, and each snapshot is sliced
+    out of them. The snapshots written to a bundle are kept in memory, and
+    flushed to its file at once: when it's closed to open others, when too many
+    bundles have pending snapshots, and when the process exits. The bundle is
+    rewritten under a lock, so that tests running in other processes don't lose
+    their own writes.
+
+    When SNAPSHOT_DIGESTS is enabled, the digests are kept in the bundle index,
+    along with a checksum of each snapshot, so that the ones edited by hand
+    are compared again.
+    """
+
+    # How many path components identify a snapshot inside its bundle.
+    # 2 groups the snapshots by test class, 3 by test module.
+    depth = 2
+    # How many bundles are kept open at once
+    max_open_bundles = 16
+
+    def __init__(self) -> None:
+        """Initialize the storage."""
+        self.bundles: OrderedDict[Path, Bundle] = OrderedDict()
+        _bundle_storages.append(self)
+
+    def locate(self, path: Path) -> tuple[Path, str]:
+        """Return the bundle path and the key of a snapshot."""
+        root = path.parents[self.depth - 1]
+        return root.with_name(f"{root.name}.snap"), path.relative_to(root).as_posix()
+
+    def get_bundle(self, bundle_path: Path) -> Bundle:
+        """Return the open bundle, opening it if needed."""
+        bundle = self.bundles.pop(bundle_path, None) or Bundle(bundle_path)
+        self.bundles[bundle_path] = bundle
+
+        while len(self.bundles) > self.max_open_bundles:
+            oldest_path, oldest = self.bundles.popitem(last=False)
+            oldest.close()
+            self.flush(oldest_path)
+        return bundle
+
+    def read(self, path: Path) -> bytes | None:
+        """Read the snapshot from its bundle, or from its pending writes."""
+        bundle_path, key = self.locate(path)
+        if (pending := _pending_writes.get(bundle_path, {}).get(key)) is not None:
+            return pending[0]
+        return self.get_bundle(bundle_path).read(key)
+
+    def write(self, path: Path, content: bytes, digest: str) -> None:
+        """Write the new contents of the snapshot to its bundle, once flushed."""
+        bundle_path, key = self.locate(path)
+        _pending_writes.setdefault(bundle_path, {})[key] = (content, digest)
+
+        while len(_pending_writes) > self.max_open_bundles:
+            self.flush(next(iter(_pending_writes)))
+
+    def flush(self, bundle_path: Path | None = None) -> None:
+        """Rewrite the bundle with its pending snapshots, or every bundle."""
+        if bundle_path is None:
+            for path in list(_pending_writes):
+                self.flush(path)
+            return
+
+        if not (pending := _pending_writes.pop(bundle_path, None)):
+            return
+        bundle_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(bundle_path):
+            # Another process may have rewritten the bundle since it was opened,
+            # and it must be unmapped before it's overwritten anyway
+            if (open_bundle := self.bundles.pop(bundle_path, None)) is not None:
+                open_bundle.close()
+
+            bundle = Bundle(bundle_path)
+            contents = bundle.contents()
+            bundle.close()
+
+            contents.update(pending)
+            atomic_write(bundle_path, Bundle.dump(contents))
+
+    def get_digest(self, path: Path) -> str | None:
+        """Return the digest in the bundle index, if digests are enabled."""
+        if not snap_settings.SNAPSHOT_DIGESTS:
+            return None
+
+        bundle_path, key = self.locate(path)
+        if (pending := _pending_writes.get(bundle_path, {}).get(key)) is not None:
+            return pending[1] or None
+        return self.get_bundle(bundle_path).digest(key)
+
+    def set_digest(self, path: Path, digest: str) -> None:
+        """Record the digest in the bundle index, if it's outdated."""
+        if not snap_settings.SNAPSHOT_DIGESTS:
+            return
+
+        content = self.read(path)
+        if content is not None and self.get_digest(path) != digest:
+            self.write(path, content, digest)
+
+
+class ModuleBundleStorage(BundleStorage):
+    """
+    Store the snapshots of all the tests of a module in a single bundle file.
+
+    With the default snapshot paths, the snapshots of `tests/MyTest/test_a/`
+    are kept in `tests.snap` instead, under `MyTest/test_a/<filename>`.
+    """
+
+    depth = 3
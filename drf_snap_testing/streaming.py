@@ -0,0 +1,136 @@
+import pickle
+from collections import defaultdict
+from itertools import islice
+from tempfile import SpooledTemporaryFile
+from typing import Any, Iterable, Iterator, Type, cast
+
+from django.db.models import ManyToManyField, Model
+
+# pylint: disable=protected-access
+# ruff: noqa: SLF001
+
+Row = tuple[Any, dict[str, Any]]
+
+
+def related_pks(
+    field: "ManyToManyField[Any, Any]",
+    pks: list[Any],
+) -> dict[Any, list[Any]]:
+    """Return the primary keys related through the field to each of the rows."""
+    through = cast(Type[Model], field.remote_field.through)
+    source = field.m2m_field_name()  # type: ignore [attr-defined]
+    target = field.m2m_reverse_field_name()
+
+    related = defaultdict(list)
+    for key, related_key in (
+        through.objects.filter(**{f"{source}__in": pks})
+        .order_by(target)
+        .values_list(source, target)
+    ):
+        related[key].append(related_key)
+    return related
+
+
+def stream_rows(model: Type[Model], chunk_size: int) -> Iterator[Row]:
+    """
+    Yield the primary key and data of every row of the model, by primary key.
+
+    The data has the same fields as `model_to_dict`, but it's read with
+    `values_list()` one chunk at a time, so no model instance is ever built.
+    Many-to-many fields are lists of the related primary keys.
+    """
+    fields = [
+        field for field in model._meta.fields if field.concrete and field.editable
+    ]
+    m2m_fields = [
+        field
+        for field in model._meta.get_fields()
+        if isinstance(field, ManyToManyField) and field.editable
+    ]
+
+    rows = (
+        model.objects.order_by("pk")
+        .values_list("pk", *(field.attname for field in fields))
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        pks = [row[0] for row in chunk]
+        related = {field.name: related_pks(field, pks) for field in m2m_fields}
+
+        for key, *values in chunk:
+            data = {
+                field.name: value for field, value in zip(fields, values, strict=True)
+            }
+            for name, related_keys in related.items():
+                data[name] = related_keys.get(key, [])
+            yield key, data
+
+
+class RowSpool:
+    """
+    Keep a stream of rows to read it again later, without holding it in memory.
+
+    Rows are pickled one after the other into a temporary file,
+    which only stays in memory while it's small.
+    """
+
+    max_memory_size = 2**20
+
+    def __init__(self, rows: Iterable[Row]) -> None:
+        """Write the rows to the spool."""
+        self.file = SpooledTemporaryFile(  # pylint: disable=consider-using-with
+            max_size=self.max_memory_size,
+        )
+        pickler = pickle.Pickler(self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        for row in rows:
+            pickler.dump(row)
+            # The memo would keep every row alive
+            pickler.clear_memo()
+
+    def __iter__(self) -> Iterator[Row]:
+        """Read the rows back, in the order they were written."""
+        self.file.seek(0)
+        while True:
+            try:
+                # The spool only ever holds rows it pickled itself
+                yield cast(Row, pickle.load(self.file))  # ruff: noqa: S301
+            except EOFError:
+                return
+
+    def close(self) -> None:
+        """Discard the spooled rows."""
+        self.file.close()
+
+
+def merge_rows(
+    old_rows: Iterable[Row],
+    new_rows: Iterable[Row],
+) -> Iterator[tuple[Any, dict[str, Any] | None, dict[str, Any] | None]]:
+    """
+    Pair up the rows of two streams sorted by primary key.
+
+    Yield the primary key with its old and new data, either being None
+    when the row is missing from that stream.
+    """
+    old_iter, new_iter = iter(old_rows), iter(new_rows)
+    old, new = next(old_iter, None), next(new_iter, None)
+    previous: Any = None
+
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            key, old_data, new_data = old[0], old[1], None  # type: ignore [index]
+            old = next(old_iter, None)
+        elif old is None or new[0] < old[0]:
+            key, old_data, new_data = new[0], None, new[1]
+            new = next(new_iter, None)
+        else:
+            key, old_data, new_data = old[0], old[1], new[1]
+            old, new = next(old_iter, None), next(new_iter, None)
+
+        # The streams are sorted by the database, which must agree with Python
+        if previous is not None and not previous < key:
+            msg = "Primary keys must sort the same way in the database and in Python"
+            raise AssertionError(msg)
+        previous = key
+
+        yield key, old_data, new_data
@@ -1,24 +1,57 @@
 import inspect
 import re
+import time
 import unittest
 from collections import OrderedDict
-from contextlib import ExitStack, contextmanager
+from contextlib import (
+    AsyncExitStack,
+    ExitStack,
+    asynccontextmanager,
+    contextmanager,
+    nullcontext,
+)
 from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Iterable, Iterator, Mapping, Type, TypeVar, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Iterable,
+    Iterator,
+    Mapping,
+    Type,
+    TypeVar,
+    cast,
+)
 
 import django
 import rest_framework.test
+from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import LiveServerTestCase
 from django.test.utils import override_settings
 from django.urls import reverse
 from rest_framework.response import Response
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 
+from .benchmark import benchmark_results, get_benchmark, run_benchmark
 from .bit import Bit
-from .bits import Starter
+from .bits import Queries
+from .client import AsyncAPIClient
+from .diff import diff_renders
+from .impact import skip_unchanged, test_fingerprint, test_fingerprints
+from .load import get_load, load_request, login, run_load
+from .metrics import test_metrics
+from .parallel import get_snapshot_claims
+from .reset import database_snapshots
 from .settings import snap_settings
+from .storage import SnapshotStorage
+from .timings import test_timings
 
 
 @contextmanager
@@ -36,6 +69,26 @@ def multi_context_manager(*cms: Any) -> Any:
         ]
 
 
+@asynccontextmanager
+async def async_multi_context_manager(*cms: Any) -> AsyncIterator[list[Any]]:
+    """
+    Enter the context managers from an async test, like multi_context_manager.
+
+    Async context managers are entered as such. The others are entered in the
+    thread sync code runs in, as sync_to_async does, which is the one the ORM
+    queries of the views run in, so that the bits capture them.
+    """
+    async with AsyncExitStack() as stack:
+        entered = []
+        for manager in cms:
+            if hasattr(manager, "__aenter__") and hasattr(manager, "__aexit__"):
+                entered.append(await stack.enter_async_context(manager))
+            elif hasattr(manager, "__enter__") and hasattr(manager, "__exit__"):
+                entered.append(await sync_to_async(manager.__enter__)())
+                stack.push_async_exit(sync_to_async(manager.__exit__))
+        yield entered
+
+
 SNAKE_CASE = re.compile("((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))")
 
 TEST_KEYS = (
@@ -49,6 +102,9 @@ TEST_KEYS = (
     "format",
     "content_type",
     "wsgi_request_extra",
+    "query_budget",
+    "benchmark",
+    "load",
 )
 
 _ATC_co = TypeVar("_ATC_co", bound="SnapAPITestCase", covariant=True)
@@ -77,6 +133,15 @@ class SnapTestCaseMetaclass(type):
 
         # Build the test attributes mapping
         attrs["test_attributes_mapping"] = {}
+        # The bit templates of each test, resolved on first use
+        attrs["bit_templates"] = {}
+
+        # The tests are coroutines in the async test cases
+        async_tests = attrs.get(
+            "async_tests",
+            any(getattr(base, "async_tests", False) for base in bases),
+        )
+        wrapper = mcs.async_generic_wrapper if async_tests else mcs.generic_wrapper
 
         # Iterate through the test attributes
         for test_name, test_docstring, test_attrs in mcs.resolve_test_attrs(attrs):
@@ -85,7 +150,7 @@ class SnapTestCaseMetaclass(type):
                 raise AssertionError
 
             # Make a brand new test method with the test attributes information
-            test_function = mcs.generic_wrapper(test_name=test_name)
+            test_function = wrapper(test_name=test_name)
             test_function.__name__ = test_name
             test_function.__doc__ = test_docstring
             test_function.__qualname__ = f"{clsname}.{test_name}"
@@ -206,7 +271,6 @@ class SnapTestCaseMetaclass(type):
         variables can be included in it at "build time".
         """
 
-        @override_settings(DEBUG=True)
         def generic(self: "SnapAPITestCase") -> None:
             """
             Source generic test method for the test methods of the SnapTestCase classes.
@@ -218,35 +282,80 @@ class SnapTestCaseMetaclass(type):
 
             It will then assert that the collected data matches the recorded data.
             """
-            # Get the test attributes
-            tam = self.test_attributes_mapping[test_name]
+            start = time.perf_counter()
 
-            # Authenticate and build the request
-            SnapGenericHelper.authenticate(self.client, tam)
-            request = SnapGenericHelper.build_request(self.client, tam)
-            bits = SnapGenericHelper.get_bit_instances(tam)
-
-            # Get the test directory and set it for each bit
-            test_directory = SnapGenericHelper.get_test_directory(self, tam)
-            test_directory.mkdir(parents=True, exist_ok=True)
-            for _, bit in bits.items():
-                bit.directory = test_directory
+            # Get the test attributes, the request and the bits
+            tam, request, bits = SnapGenericHelper.prepare(self, test_name, self.client)
+            fingerprint = SnapGenericHelper.fingerprint(self, tam, bits)
 
             # It's important to retrieve the bits inside snap's context manager
             # as some bits have __enter__ and __exit__ methods that need to be
             # called.
-            with multi_context_manager(*bits.values()):
+            with SnapGenericHelper.debug(bits), multi_context_manager(*bits.values()):
                 # Execute the request
                 response = request()
-                # Set the value of each bit
-                bits.get("response", Starter()).value = response
-                bits.get("testinfo", Starter()).value = self
-                bits.get("mailbox", Starter()).value = mail.outbox
+                SnapGenericHelper.set_values(self, bits, response)
 
             # It's important to do this outside of the context manager
             # as the context manager closing may change the state of the
             # objects being snapshotted.
-            self.assertSnapEquals(bits.values())
+            try:
+                SnapGenericHelper.load(self, bits, tam)
+                self.assertSnapEquals(bits.values())
+                SnapGenericHelper.benchmark(self, request, tam)
+                SnapGenericHelper.record_fingerprint(self, fingerprint)
+            finally:
+                SnapGenericHelper.record(self, bits, start)
+
+        return generic
+
+    @staticmethod
+    def async_generic_wrapper(test_name: str) -> Callable[[Any], Awaitable[None]]:
+        """
+        Create a generic test coroutine for the tests of the async test cases.
+
+        It's the async version of the generic test, making the request through
+        the async client. The ORM is sync only, so everything that may query
+        the database runs in the thread sync code runs in, as the views do.
+        """
+
+        async def generic(self: "SnapAsyncAPITestCase") -> None:
+            """
+            Source generic test coroutine for the tests of the async test cases.
+
+            It takes its test attributes from test_attributes_mapping class attribute,
+            and performs the request through the async client, under the bits.
+
+            It will then assert that the collected data matches the recorded data.
+            """
+            start = time.perf_counter()
+
+            # Get the test attributes, the request and the bits
+            tam, request, bits = await sync_to_async(SnapGenericHelper.prepare)(
+                self,
+                test_name,
+                self.async_client,
+            )
+            fingerprint = SnapGenericHelper.fingerprint(self, tam, bits)
+
+            debug = SnapGenericHelper.debug(bits)
+            async with async_multi_context_manager(debug, *bits.values()):
+                # Execute the request
+                response = await request()
+                SnapGenericHelper.set_values(self, bits, response)
+
+            # The renders may query the database, like for the request user
+            try:
+                await sync_to_async(SnapGenericHelper.load)(self, bits, tam)
+                await sync_to_async(self.assertSnapEquals)(bits.values())
+                await sync_to_async(SnapGenericHelper.benchmark)(
+                    self,
+                    async_to_sync(request),
+                    tam,
+                )
+                SnapGenericHelper.record_fingerprint(self, fingerprint)
+            finally:
+                SnapGenericHelper.record(self, bits, start)
 
         return generic
 
@@ -260,7 +369,62 @@ class SnapGenericHelper:
     """
 
     @staticmethod
-    def authenticate(client: APIClient, tam: Mapping[str, Any]) -> None:
+    def prepare(
+        test: "SnapTestCase",
+        test_name: str,
+        client: APIClient | AsyncAPIClient,
+    ) -> tuple[Mapping[str, Any], Callable[[], Any], OrderedDict[str, Bit]]:
+        """
+        Get the test attributes, the request and the bits of a test.
+
+        The client is authenticated, and the bits are ready to be entered,
+        with their directory and storage set.
+        """
+        tam = test.test_attributes_mapping[test_name]
+
+        # Authenticate and build the request
+        SnapGenericHelper.authenticate(client, tam)
+        request = SnapGenericHelper.build_request(client, tam)
+        bits = SnapGenericHelper.get_bits(test, test_name, tam)
+        SnapGenericHelper.set_query_budget(bits, tam)
+
+        # Get the test directory and storage and set them for each bit
+        test_directory = SnapGenericHelper.get_test_directory(test, tam)
+        storage = SnapGenericHelper.get_storage()
+        storage.prepare(test_directory)
+        for _, bit in bits.items():
+            bit.directory = test_directory
+            bit.storage = storage
+
+        return tam, request, bits
+
+    @staticmethod
+    def set_values(test: Any, bits: Mapping[str, Bit], response: Any) -> None:
+        """Set the value of each bit, by what it takes as its value."""
+        values = {
+            "response": response,
+            "testinfo": test,
+            "mailbox": mail.outbox,
+        }
+        for key, bit in bits.items():
+            if (source := bit.source or key) in values:
+                bit.value = values[source]
+
+    @staticmethod
+    def record(test: unittest.TestCase, bits: Mapping[str, Bit], start: float) -> None:
+        """Record how long the test took, and the cost of its queries."""
+        # Record how long the test took, to schedule the next runs
+        test_timings.record(test.id(), time.perf_counter() - start)
+        # Record the cost of its queries, to review the query budgets
+        queries = bits.get("queries")
+        if isinstance(queries, Queries) and queries.value is not None:
+            test_metrics.record(test.id(), queries.metrics)
+
+    @staticmethod
+    def authenticate(
+        client: APIClient | AsyncAPIClient,
+        tam: Mapping[str, Any],
+    ) -> None:
         """
         Authenticate the client using the user specified in the test attributes.
 
@@ -270,19 +434,29 @@ class SnapGenericHelper:
             - Get the user from the database
             - Authenticate the client using the user
         """
-        request_user_filters = tam.get("user")
-        if request_user_filters is not None:
-            user = get_user_model().objects.get(**request_user_filters)
+        user = SnapGenericHelper.get_user(tam)
+        if user is not None:
             client.force_authenticate(user)
 
+    @staticmethod
+    def get_user(tam: Mapping[str, Any]) -> Any:
+        """Get the user specified in the test attributes, by its filters, if any."""
+        request_user_filters = tam.get("user")
+        if request_user_filters is None:
+            return None
+        return get_user_model().objects.get(**request_user_filters)
+
     @staticmethod
     def build_request(
-        client: APIClient,
+        client: APIRequestFactory,
         tam: Mapping[str, Any],
-    ) -> Callable[[], Response]:
+    ) -> Callable[[], Any]:
         """
         Build a request to the API using the test attributes.
 
+        With the async client, the request is a coroutine function,
+        and with a request factory, it only builds the request.
+
         The test attributes must contain:
             - method (default: GET)
             - url_pattern_name
@@ -329,6 +503,133 @@ class SnapGenericHelper:
         )
         return cast(Path, get_test_directory_func(test=test, test_attributes=tam))
 
+    @staticmethod
+    def get_storage() -> SnapshotStorage:
+        """Get the storage the snapshots are kept in."""
+        return cast(SnapshotStorage, snap_settings.DEFAULT_SNAP_STORAGE)
+
+    @staticmethod
+    def get_bits(
+        test: "SnapTestCase",
+        test_name: str,
+        tam: Mapping[str, Any],
+    ) -> OrderedDict[str, Bit]:
+        """
+        Get the bits of a test, cloned from the bit templates of the test.
+
+        The templates are instantiated the first time the test runs, and again
+        only when the settings change. Bits declared as instances are templates
+        too, so every test gets its own copy even if they're shared by many tests.
+        """
+        generation, templates = test.bit_templates.get(test_name, (None, None))
+        if templates is None or generation != snap_settings.generation:
+            templates = SnapGenericHelper.get_bit_instances(tam)
+            test.bit_templates[test_name] = (snap_settings.generation, templates)
+
+        return OrderedDict((key, bit.clone()) for key, bit in templates.items())
+
+    @staticmethod
+    def benchmark(
+        test: unittest.TestCase,
+        request: Callable[[], Response],
+        tam: Mapping[str, Any],
+    ) -> None:
+        """
+        Benchmark the request, if the test is to be, and record the results.
+
+        It's benchmarked with the benchmark test attribute, or for every test
+        with DRF_SNAP_TESTING_BENCHMARK, and the results go to BENCHMARK_PATH.
+        The bits aren't entered for the repeats, so what they mock, like the time
+        or HTTP requests, isn't mocked then.
+        """
+        if (benchmark := get_benchmark(tam)) is None:
+            return
+
+        if benchmark_results.path is None:
+            msg = "BENCHMARK_PATH must be set to benchmark the tests"
+            raise AssertionError(msg)
+
+        db_aliases = getattr(test, "databases", {DEFAULT_DB_ALIAS})
+        result = run_benchmark(request, db_aliases, *benchmark)
+        benchmark_results.record(test.id(), result)
+
+    @staticmethod
+    def load(test: Any, bits: Mapping[str, Bit], tam: Mapping[str, Any]) -> None:
+        """
+        Send the request of the test from many threads at once, if it's to be loaded.
+
+        It's sent to the live server of the test case, as the user of the test,
+        logged in with a session, and the outcome is set on the Load bit.
+        """
+        if (load := get_load(tam)) is None:
+            return
+
+        if "load" not in bits:
+            msg = "A load requires the Load bit"
+            raise AssertionError(msg)
+        live_server_url = getattr(test, "live_server_url", None)
+        if live_server_url is None:
+            msg = "A load requires a live server, like SnapLiveServerTestCase's"
+            raise AssertionError(msg)
+
+        request = SnapGenericHelper.build_request(APIRequestFactory(), tam)()
+        headers = login(SnapGenericHelper.get_user(tam))
+        load_result = run_load(load_request(request, live_server_url, headers), *load)
+        bits["load"].value = load_result
+
+    @staticmethod
+    def fingerprint(
+        test: unittest.TestCase,
+        tam: Mapping[str, Any],
+        bits: Mapping[str, Bit],
+    ) -> str | None:
+        """
+        Fingerprint the inputs of the test, if the fingerprints are recorded.
+
+        With DRF_SNAP_TESTING_SKIP_UNCHANGED set, the test is skipped if it passed
+        the last time with the same fingerprint.
+        """
+        if test_fingerprints.path is None:
+            return None
+
+        fingerprint = test_fingerprint(test, tam, bits)
+        if skip_unchanged() and test_fingerprints.unchanged(test.id(), fingerprint):
+            test.skipTest("Its inputs didn't change since it last passed")
+        return fingerprint
+
+    @staticmethod
+    def record_fingerprint(test: unittest.TestCase, fingerprint: str | None) -> None:
+        """Record the fingerprint of the test, as it passed."""
+        if fingerprint is not None:
+            test_fingerprints.record(test.id(), fingerprint)
+
+    @staticmethod
+    def debug(bits: Mapping[str, Bit]) -> ContextManager[Any]:
+        """
+        Turn on DEBUG during the request, only if any of the bits requires it.
+
+        Otherwise, the request is handled the way Django's test runner sets it up,
+        usually with DEBUG=False, as in production.
+        """
+        if any(bit.requires_debug for bit in bits.values()):
+            return override_settings(DEBUG=True)
+        return nullcontext()
+
+    @staticmethod
+    def set_query_budget(bits: Mapping[str, Bit], tam: Mapping[str, Any]) -> None:
+        """
+        Set the query budget of the test on its Queries bit, which enforces it.
+
+        The budget is taken from the query_budget test attribute, if there's one.
+        """
+        if (budget := tam.get("query_budget")) is None:
+            return
+
+        if "queries" not in bits:
+            msg = "A query_budget requires the Queries bit"
+            raise AssertionError(msg)
+        cast(Queries, bits["queries"]).budget = budget
+
     @staticmethod
     def get_bit_instances(tam: Mapping[str, Any]) -> OrderedDict[str, Bit]:
         """Get the bits from the test attributes. Instantiate them if necessary."""
@@ -354,21 +655,88 @@ class SnapTestCase(unittest.TestCase, metaclass=SnapTestCaseMetaclass):
     """
 
     test_attributes_mapping: dict[str, Any]
+    bit_templates: dict[str, tuple[int, OrderedDict[str, Bit]]]
+    # Whether the generated tests are coroutines, run through the async client
+    async_tests = False
 
     # pylint: disable=invalid-name
     def assertSnapEquals(self, bits: Iterable[Bit]) -> None:  # ruff: noqa: N802
-        """Assert that the snapshots in the Snap are equal to the ones on file."""
+        """
+        Assert that the snapshots in the Snap are equal to the ones on file.
+
+        The bits' own checks must pass as well.
+        """
+        bits = list(bits)
+        if snap_settings.DETECT_SNAPSHOT_COLLISIONS:
+            self.assertSnapPathsUnique(bits)
+
         last_err = None
         for bit in bits:
             try:
-                self.assertEqual(bit.render, bit.previous_render)
+                bit.check()
+            except AssertionError as err:
+                last_err = err
+
+            if not bit.compared:
+                bit.record(self.id())
+                continue
+
+            # Matching digests mean matching renders,
+            # so there's no need to read and filter the file
+            if bit.digest == bit.previous_digest:
+                continue
+
+            try:
+                self.assertRenderEquals(bit)
             except AssertionError as err:
                 last_err = err
                 bit.write()
+            else:
+                bit.record_digest()
 
         if last_err is not None:
             raise last_err
 
+    # pylint: disable=invalid-name
+    def assertRenderEquals(self, bit: Bit) -> None:  # ruff: noqa: N802
+        """
+        Assert that the render of the bit is equal to the one on file.
+
+        On a mismatch, the differences are listed by path, up to SNAPSHOT_DIFF_LIMIT,
+        as a diff of the whole renders is slow and unreadable for big ones.
+        If they can't be parsed, they're compared as the bit displays them,
+        and as they are if they display the same.
+        """
+        render, previous_render = bit.render, bit.previous_render
+        if render == previous_render:
+            return
+        if not previous_render:
+            msg = f"The snapshot {bit.path} didn't exist"
+            raise AssertionError(msg)
+
+        found = diff_renders(previous_render, render, snap_settings.SNAPSHOT_DIFF_LIMIT)
+        if found is not None:
+            msg = f"The snapshot {bit.path} doesn't match (snapshot -> render):\n"
+            raise AssertionError(msg + "\n".join(found))
+
+        self.assertEqual(bit.display(render), bit.display(previous_render))
+        self.assertEqual(render, previous_render)
+
+    # pylint: disable=invalid-name
+    def assertSnapPathsUnique(self, bits: Iterable[Bit]) -> None:  # ruff: noqa: N802
+        """
+        Assert that no other test of the run uses the same snapshot paths.
+
+        Tests running in other processes are checked too,
+        so two workers never write to the same snapshot.
+        """
+        snapshot_claims = get_snapshot_claims()
+        for bit in bits:
+            claimant = snapshot_claims.claim(bit.path, f"{self.id()} ({bit.key})")
+            if claimant is not None:
+                msg = f"The snapshot {bit.path} is also used by {claimant}"
+                raise AssertionError(msg)
+
 
 class SnapDjangoTestCase(SnapTestCase, django.test.TestCase):
     """
@@ -386,3 +754,91 @@ class SnapAPITestCase(SnapTestCase, rest_framework.test.APITestCase):
     It's recommended to use this class instead of SnapTestCase, as it provides
     some additional functionality.
     """
+
+
+class SnapAsyncAPITestCase(SnapAPITestCase):
+    """
+    SnapAPITestCase subclass whose generated tests are coroutines.
+
+    They make the requests through an async version of DRF's APIClient,
+    which goes through the ASGI handler, as async views are deployed.
+    The bits are entered in the thread the ORM runs in, so they capture
+    the queries of the views, whether sync or async.
+    """
+
+    async_tests = True
+    async_client_class = AsyncAPIClient
+    async_client: AsyncAPIClient
+
+
+class SnapTransactionAPITestCase(
+    SnapTestCase,
+    rest_framework.test.APITransactionTestCase,
+):
+    """
+    TestCase subclass that adds the SnapTestCase functionality to transactions.
+
+    It's based on DRF's APITransactionTestCase, for the views that need
+    their transactions to really commit, like the ones with
+    transaction.on_commit callbacks, or that use many connections.
+    Rather than flushed, the databases are restored after each test from
+    a snapshot taken before the first test case of the kind, which keeps
+    the data of the migrations. It's much faster on SQLite and PostgreSQL,
+    and the other databases are flushed as by Django's TransactionTestCase.
+
+    The snapshot is of the databases as the first test case finds them, so
+    SnapDiscoverRunner runs these before the other TransactionTestCase ones.
+    """
+
+    @classmethod
+    def setUpClass(cls: Type["SnapTransactionAPITestCase"]) -> None:
+        """Take the snapshots of the databases, unless taken already."""
+        super().setUpClass()
+        for alias in cls.database_aliases():
+            database_snapshots.take(alias)
+
+    @classmethod
+    def database_aliases(cls: Type["SnapTransactionAPITestCase"]) -> list[str]:
+        """Return the aliases of the databases of the tests, but the mirrors."""
+        return [
+            alias
+            for alias in connections
+            if alias in cls.databases
+            and not connections[alias].settings_dict["TEST"]["MIRROR"]
+        ]
+
+    def _fixture_teardown(self) -> None:
+        """Restore the databases from their snapshots, flushing the others."""
+        for alias in self.database_aliases():
+            if database_snapshots.restore(alias):
+                continue
+
+            # As TransactionTestCase does
+            inhibit_post_migrate = self.available_apps is not None or (
+                self.serialized_rollback
+                and hasattr(connections[alias], "_test_serialized_contents")
+            )
+            call_command(
+                "flush",
+                verbosity=0,
+                interactive=False,
+                database=alias,
+                reset_sequences=False,
+                allow_cascade=self.available_apps is not None,
+                inhibit_post_migrate=inhibit_post_migrate,
+            )
+
+
+class SnapLiveServerTestCase(
+    SnapTestCase,
+    rest_framework.test.APITransactionTestCase,
+    LiveServerTestCase,
+):
+    """
+    TestCase subclass that adds the SnapTestCase functionality to a live server.
+
+    Tests with the load test attribute send their request to the live server
+    from many threads at once, as clients would, for the Load bit. As it's a
+    TransactionTestCase, the requests see each other's writes, and contend for
+    the same rows and connections.
+    """
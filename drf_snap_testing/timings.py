@@ -0,0 +1,102 @@
+import heapq
+from typing import Hashable, Iterable, Mapping, Sequence, TypeVar
+
+from .records import TestRecords
+
+_K = TypeVar("_K")
+_T = TypeVar("_T", bound=Hashable)
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard given as INDEX/COUNT, e.g. 1/4, into a 0-based index and count."""
+    index, _, count = value.partition("/")
+    shard = int(index) - 1, int(count)
+    if not 0 <= shard[0] < shard[1]:
+        msg = f"Invalid shard {value}, it must be INDEX/COUNT with 1 <= INDEX <= COUNT"
+        raise ValueError(msg)
+    return shard
+
+
+def lpt_schedule(costs: Mapping[_K, float], bins: int) -> list[list[_K]]:
+    """
+    Split the items into bins of similar total cost.
+
+    It's the longest-processing-time-first heuristic: from the most to the least
+    expensive, each item goes to the bin with the lowest total cost so far.
+    Ties are broken by the items themselves, so the schedule is deterministic.
+    """
+    schedule: list[list[_K]] = [[] for _ in range(bins)]
+    totals = [(0.0, index) for index in range(bins)]
+    for item in sorted(costs, key=lambda item: (-costs[item], str(item))):
+        total, index = heapq.heappop(totals)
+        schedule[index].append(item)
+        heapq.heappush(totals, (total + costs[item], index))
+    return schedule
+
+
+def split_schedule(
+    groups: Mapping[_K, Sequence[_T]],
+    costs: Mapping[_T, float],
+    bins: int,
+) -> list[dict[_K, list[_T]]]:
+    """
+    Split the groups of tests into bins of similar total cost.
+
+    The tests of a group are kept together, so that their class-level setup runs
+    once, unless the group costs more than the average bin. Its tests are then
+    scheduled one by one, as the group alone would unbalance the bins.
+    Each bin maps the groups to their tests in it, in their order.
+    """
+    limit = sum(costs[test] for tests in groups.values() for test in tests) / bins
+    # Keyed by the tests themselves, so the schedule doesn't depend on their order
+    units: dict[tuple[_K, _T | None], list[_T]] = {}
+    for group, tests in groups.items():
+        if len(tests) > 1 and sum(costs[test] for test in tests) > limit:
+            units.update({(group, test): [test] for test in tests})
+        else:
+            units[group, None] = list(tests)
+
+    unit_bins = {
+        unit: index
+        for index, scheduled in enumerate(
+            lpt_schedule(
+                {
+                    unit: sum(costs[test] for test in tests)
+                    for unit, tests in units.items()
+                },
+                bins,
+            ),
+        )
+        for unit in scheduled
+    }
+    schedule: list[dict[_K, list[_T]]] = [{} for _ in range(bins)]
+    for (group, test), tests in units.items():
+        schedule[unit_bins[group, test]].setdefault(group, []).extend(tests)
+    return schedule
+
+
+class TestTimings(TestRecords[float]):
+    """
+    The durations of the snapshot tests, in seconds, by test id.
+
+    They're kept in the JSON file set by TEST_TIMINGS_PATH.
+    """
+
+    setting = "TEST_TIMINGS_PATH"
+
+    def record(self, test_id: str, value: float) -> None:
+        """Record the duration of a test, if timings are enabled."""
+        super().record(test_id, round(value, 6))
+
+    def estimates(self, test_ids: Iterable[str]) -> dict[str, float]:
+        """
+        Estimate the cost of each test, by its timing.
+
+        Tests that were never timed are assumed to take the average time.
+        """
+        timings = self.load()
+        default = sum(timings.values()) / len(timings) if timings else 1.0
+        return {test_id: timings.get(test_id, default) for test_id in test_ids}
+
+
+test_timings = TestTimings()
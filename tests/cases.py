@@ -0,0 +1,45 @@
+"""Test cases for the runner's scheduling, which are discovered, not collected."""
+from django.test import SimpleTestCase
+
+# The recorded timings of the tests, that aren't given for the others
+TIMINGS = {
+    "tests.cases.Heavy.test_1": 4.0,
+    "tests.cases.Heavy.test_2": 4.0,
+    "tests.cases.Heavy.test_3": 4.0,
+    "tests.cases.Heavy.test_4": 4.0,
+    "tests.cases.Light.test_1": 1.0,
+    "tests.cases.Light.test_2": 1.0,
+}
+
+
+class Heavy(SimpleTestCase):
+    """A test case that costs more than a shard."""
+
+    def test_1(self) -> None:
+        """Pass."""
+
+    def test_2(self) -> None:
+        """Pass."""
+
+    def test_3(self) -> None:
+        """Pass."""
+
+    def test_4(self) -> None:
+        """Pass."""
+
+
+class Light(SimpleTestCase):
+    """A test case that costs less than a shard."""
+
+    def test_1(self) -> None:
+        """Pass."""
+
+    def test_2(self) -> None:
+        """Pass."""
+
+
+class Untimed(SimpleTestCase):
+    """A test case that was never timed."""
+
+    def test_1(self) -> None:
+        """Pass."""
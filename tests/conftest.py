@@ -0,0 +1,43 @@
+"""Configure Django with the settings of the tests, and create their database."""
+import os
+from pathlib import Path
+from typing import Iterator
+
+import django
+import pytest
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+# For the tests of the pytest plugin
+pytest_plugins = ["pytester"]
+
+
+def pytest_configure() -> None:
+    """Set up Django before the test modules import it."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+    django.setup()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _test_database() -> Iterator[None]:
+    """Create the default test database, once for all the tests."""
+    setup_test_environment()
+    old_config = setup_databases(
+        verbosity=0,
+        interactive=False,
+        aliases={"default"},  # type: ignore [arg-type]
+    )
+    yield
+    teardown_databases(old_config, verbosity=0)
+    teardown_test_environment()
+
+
+@pytest.fixture()
+def snapshot_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the snapshots of the cases run by the test in its directory."""
+    monkeypatch.setattr("tests.utils.SNAPSHOT_DIRECTORY", tmp_path)
+    return tmp_path
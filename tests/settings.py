@@ -0,0 +1,32 @@
+"""Django settings for the tests."""
+SECRET_KEY = "drf-snap-testing"  # ruff: noqa: S105
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "rest_framework",
+    "tests.testapp",
+]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
+    # Only created by the tests of the database cache
+    "cached": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
+}
+
+ROOT_URLCONF = "tests.testapp.urls"
+USE_TZ = True
+DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+
+DRF_SNAP_TESTING = {
+    "DEFAULT_BITS": [
+        "drf_snap_testing.bits.Queries",
+        "drf_snap_testing.bits.Response",
+    ],
+}
@@ -0,0 +1,145 @@
+# ruff: noqa: A003, D106
+
+import asyncio
+import datetime
+import time
+import types
+from pathlib import Path
+from typing import Any
+
+import pytest
+from django.test import override_settings
+from freezegun import freeze_time
+
+from drf_snap_testing import bits
+from drf_snap_testing.bits.freezegun import FreezeGun
+from drf_snap_testing.testcase import SnapAPITestCase, SnapAsyncAPITestCase
+
+from .testapp.models import Item
+from .utils import SNAP_SETTINGS, failures, run_case
+
+
+def item_case(name: str, base: type[SnapAPITestCase]) -> type[SnapAPITestCase]:
+    """Return a case of the base, with the item tests."""
+    attrs = {
+        key: value for key, value in vars(ItemTests).items() if not key.startswith("__")
+    }
+    return types.new_class(name, (base,), exec_body=lambda ns: ns.update(attrs))
+
+
+class ItemTests:
+    """The tests of the items, declared as on a case, for the sync and async ones."""
+
+    url_pattern_name = "item-list"
+    user = None
+    bits = [
+        bits.Queries,
+        bits.Response,
+        bits.DatabaseDiff(models=[Item], capture="signals"),
+    ]
+
+    class ListItems:
+        pass
+
+    class CreateItem:
+        method = "POST"
+        data = {"name": "posted", "count": 3}
+
+    class CreateItemJson:
+        method = "POST"
+        format = "json"
+        data = {"name": "posted", "count": 3}
+
+    class InvalidItem:
+        method = "POST"
+        data = {"count": "many"}
+
+    class ListItemsInFrench:
+        wsgi_request_extra = {"HTTP_ACCEPT_LANGUAGE": "fr"}
+
+    class RetrieveItem:
+        url_pattern_name = "item-detail"
+        url_kwargs = {"pk": 1}
+
+
+TEST_NAMES = [
+    "test_create_item",
+    "test_create_item_json",
+    "test_invalid_item",
+    "test_list_items",
+    "test_list_items_in_french",
+    "test_retrieve_item",
+]
+
+
+@override_settings(DRF_SNAP_TESTING=SNAP_SETTINGS)
+def test_async_matches_sync(snapshot_directory: Path) -> None:
+    """The async tests match the snapshots of the sync ones, and the other way."""
+    sync_case = item_case("SyncItems", SnapAPITestCase)
+    async_case = item_case("AsyncItems", SnapAsyncAPITestCase)
+
+    # The first run writes the snapshots, as none existed
+    first_run = run_case(sync_case)
+    assert first_run.testsRun == len(TEST_NAMES)
+    assert all("didn't exist" in message for message in failures(first_run))
+    assert sorted(path.name for path in snapshot_directory.iterdir()) == TEST_NAMES
+    assert failures(run_case(sync_case)) == []
+
+    snapshots = {path: path.read_bytes() for path in snapshot_directory.rglob("*.yaml")}
+    async_run = run_case(async_case)
+    assert async_run.testsRun == len(TEST_NAMES)
+    assert failures(async_run) == []
+    assert {
+        path: path.read_bytes() for path in snapshot_directory.rglob("*.yaml")
+    } == snapshots
+
+
+@pytest.mark.skipif(
+    not hasattr(freeze_time(), "real_asyncio"),
+    reason="Only freezegun 1.3 and later leave the event loop on real time",
+)
+def test_freeze_gun_clones() -> None:
+    """The event loop sees the real time in the async tests only, for every clone."""
+    freeze_gun = FreezeGun()
+    clone = freeze_gun.clone()
+
+    async def frozen() -> None:
+        async with clone:
+            assert clone.freezer.real_asyncio is True
+            # The timers of the event loop still fire
+            await asyncio.sleep(0.01)
+
+    asyncio.run(frozen())
+    assert freeze_gun.freezer.real_asyncio is False
+    with freeze_gun:
+        assert time.monotonic() == time.monotonic()
+
+
+class OldFreezer:
+    """A freezer as in freezegun 1.2, without the real_asyncio flag."""
+
+    def __init__(self, *args: Any) -> None:
+        """Wrap a freezer of the installed freezegun."""
+        self.freezer = freeze_time(*args)
+
+    def start(self) -> object:
+        """Start the wrapped freezer."""
+        return self.freezer.start()
+
+    def stop(self) -> None:
+        """Stop the wrapped freezer."""
+        self.freezer.stop()
+
+
+def test_freeze_gun_without_real_asyncio(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The freezers of freezegun before 1.3 freeze the async tests as they can."""
+    monkeypatch.setattr("drf_snap_testing.bits.freezegun.freeze_time", OldFreezer)
+    freeze_gun = FreezeGun()
+
+    async def frozen() -> datetime.datetime:
+        async with freeze_gun:
+            return datetime.datetime.now(tz=datetime.timezone.utc)
+
+    frozen_at = datetime.datetime(2020, 3, 1, 1, 2, 3, tzinfo=datetime.timezone.utc)
+    assert asyncio.run(frozen()) == frozen_at
+    assert not hasattr(freeze_gun.freezer, "real_asyncio")
@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from drf_snap_testing.bit import compile_ignore_list
+from drf_snap_testing.bits import Queries, Response
+from drf_snap_testing.serializers import QueryGroupSerializer
+from drf_snap_testing.testcase import SnapGenericHelper
+
+LINES = [b"abab", b"abcd", b"Time: 3", b"- 1", b"x 1"]
+
+
+@pytest.mark.parametrize(
+    ("ignore_list", "ignored"),
+    [
+        ((), []),
+        ((rb"ab",), [b"abab", b"abcd"]),
+        ((rb"ab\b", rb"time"), []),
+        ((rb"abcd", rb"- "), [b"abcd", b"- 1"]),
+        # A backreference, which would refer to another group in the alternation
+        ((rb"time", rb"(ab)\1"), [b"abab"]),
+        # The same named group in two patterns
+        ((rb"(?P<sign>-) ", rb"(?P<sign>x) "), [b"- 1", b"x 1"]),
+        # Global flags, which can't be in the middle of the alternation
+        ((rb"abcd", rb"(?i)time"), [b"abcd", b"Time: 3"]),
+        ((rb"(?i:time)", rb"x"), [b"Time: 3", b"x 1"]),
+    ],
+)
+def test_compile_ignore_list(
+    ignore_list: tuple[bytes, ...],
+    ignored: list[bytes],
+) -> None:
+    """The lines matched by any of the patterns, as they'd match on their own."""
+    match = compile_ignore_list(ignore_list)
+    if match is None:
+        assert ignored == []
+    else:
+        assert [line for line in LINES if match(line)] == ignored
+
+
+def queries(*sql: str) -> dict[str, list[dict[str, str]]]:
+    """Return the queries of the default database, as a queries bit takes them."""
+    return {"default": [{"sql": statement, "time": "0.001"} for statement in sql]}
+
+
+def test_clone() -> None:
+    """Clones share the configuration of the bit, but none of its renders."""
+    bit = Queries(fingerprint=True, max_repeats=2)
+    bit.value = queries("SELECT 1", "SELECT 2")
+    assert bit.query_groups["default"][0]["count"] == 2  # noqa: PLR2004
+    render = bit.render
+
+    clone = bit.clone()
+    assert (clone.fingerprint, clone.max_repeats) == (True, 2)
+    assert clone.value is None
+    assert "query_groups" not in vars(clone)
+    assert "render" not in vars(clone)
+
+    clone.value = queries("SELECT 3")
+    assert clone.query_groups["default"][0]["count"] == 1
+    assert clone.render != render
+    # Nor do the renders of the clones leak back into the bit
+    assert bit.render == render
+    assert bit.query_groups["default"][0]["count"] == 2  # noqa: PLR2004
+
+
+def test_reset() -> None:
+    """Reset bits forget their value and every cached property."""
+    bit = Queries()
+    bit.value = queries("SELECT 1")
+    assert bit.digest
+    assert bit.metrics["default"]["count"] == 1
+
+    bit.reset()
+    assert bit.value is None
+    assert not {"render", "unfiltered_render", "digest", "metrics"} & set(vars(bit))
+    bit.value = queries("SELECT 1", "SELECT 2")
+    assert bit.metrics["default"]["count"] == 2  # noqa: PLR2004
+
+
+def test_digest() -> None:
+    """The digest changes with the configuration, even if the render doesn't."""
+    bits = [
+        Queries(),
+        Queries(ignore_list=[*Queries.ignore_list, rb"^# "]),
+        Queries(serializer_class=QueryGroupSerializer),
+    ]
+    for bit in bits:
+        bit.value = {}
+    assert len({bit.render for bit in bits}) == 1
+    assert len({bit.digest for bit in bits}) == len(bits)
+
+    json_bit = Queries(renderer=JSONRenderer())
+    json_bit.value = {}
+    assert json_bit.digest not in {bit.digest for bit in bits}
+
+    same = Queries()
+    same.value = {}
+    assert same.digest == bits[0].digest
+
+
+def test_get_bits() -> None:
+    """The bits of a test are cloned from its templates, until the settings change."""
+    test: Any = SimpleNamespace(bit_templates={})
+    instance = Queries()
+    tam = {"bits": [instance, Response]}
+
+    bits = SnapGenericHelper.get_bits(test, "test_a", tam)
+    assert list(bits) == ["queries", "response"]
+    generation, templates = test.bit_templates["test_a"]
+    assert templates["queries"] is instance
+    assert bits["queries"] is not instance
+
+    again = SnapGenericHelper.get_bits(test, "test_a", tam)
+    assert test.bit_templates["test_a"] == (generation, templates)
+    assert again["response"] is not bits["response"]
+
+    with override_settings(
+        DRF_SNAP_TESTING={"DEFAULT_BITS": ["drf_snap_testing.bits.Response"]},
+    ):
+        assert list(SnapGenericHelper.get_bits(test, "test_a", {})) == ["response"]
+        assert test.bit_templates["test_a"][0] != generation
+    # The templates are rebuilt from the restored settings too
+    assert list(SnapGenericHelper.get_bits(test, "test_a", {})) == [
+        "queries",
+        "response",
+    ]
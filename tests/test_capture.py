@@ -0,0 +1,59 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from drf_snap_testing.capture import QueryCapture, is_unlogged, unlogged
+
+from .testapp.models import Item, Tag
+
+
+@override_settings(DEBUG=False)
+class QueryCaptureTests(TestCase):
+    """Capture the queries with an execute wrapper, and keep some out of it."""
+
+    def test_capture_without_debug(self) -> None:
+        """The queries are captured as Django logs them, even with DEBUG=False."""
+        connection = connections["default"]
+        with QueryCapture(["default"]) as capture:
+            Item.objects.filter(name="item").count()
+            Tag.objects.bulk_create([Tag(name="a"), Tag(name="b")])
+        Item.objects.count()
+
+        self.assertEqual(connection.queries, [])
+        queries = capture.queries["default"]
+        self.assertEqual(len(queries), 2)
+        self.assertIn("""WHERE "testapp_item"."name" = 'item'""", queries[0]["sql"])
+        self.assertIn('INSERT INTO "testapp_tag"', queries[1]["sql"])
+        self.assertRegex(queries[0]["time"], r"^\d+\.\d{3}$")
+
+    def test_cleared_on_request_started(self) -> None:
+        """The queries run before the request aren't part of it."""
+        with QueryCapture(["default"]) as capture:
+            Item.objects.count()
+            request_started.send(sender=self.__class__)
+            Tag.objects.count()
+        request_started.send(sender=self.__class__)
+
+        self.assertEqual(len(capture.queries["default"]), 1)
+        self.assertIn('FROM "testapp_tag"', capture.queries["default"][0]["sql"])
+
+    def test_nested_unlogged(self) -> None:
+        """Queries stay unlogged until the outermost unlogged block is left."""
+        connection = connections["default"]
+        with (
+            QueryCapture(["default"]) as capture,
+            CaptureQueriesContext(connection) as context,
+        ):
+            with unlogged(connection):
+                Item.objects.count()
+                with unlogged(connection):
+                    Item.objects.count()
+                self.assertTrue(is_unlogged(connection))
+                Item.objects.count()
+            self.assertFalse(is_unlogged(connection))
+            Tag.objects.count()
+
+        self.assertEqual(len(capture.queries["default"]), 1)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertIn('FROM "testapp_tag"', context.captured_queries[0]["sql"])
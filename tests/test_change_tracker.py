@@ -0,0 +1,189 @@
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from drf_snap_testing.change_tracker import ChangeTracker, table_name
+
+from .testapp.models import Item, Tag
+
+
+class ChangeTrackerTests(TestCase):
+    """Track the rows that change, through the signals or the raw SQL."""
+
+    @classmethod
+    def setUpTestData(cls: type["ChangeTrackerTests"]) -> None:
+        """Add items besides the one of the migrations, which has a tag."""
+        cls.item = Item.objects.create(name="item", count=2)
+        cls.other = Item.objects.create(name="other")
+        cls.tag = Tag.objects.create(name="tag")
+
+    def setUp(self) -> None:
+        """Start tracking the items."""
+        self.tracker = ChangeTracker([Item])
+        self.tracker.start()
+        self.addCleanup(self.tracker.stop)
+
+    def item_data(self, item: Item, **changes: object) -> dict[str, object]:
+        """Return the data of the item as recorded, with the changes."""
+        return {
+            "id": item.pk,
+            "name": item.name,
+            "count": item.count,
+            "tags": list(item.tags.all()),
+            **changes,
+        }
+
+    def test_no_changes(self) -> None:
+        """Nothing is recorded until something changes."""
+        Item.objects.get(pk=self.item.pk)
+        self.assertEqual(self.tracker.changes(Item), ({}, {}))
+        self.assertEqual(self.tracker.tables, {})
+
+    def test_save(self) -> None:
+        """Only the saved row is captured, before it's saved."""
+        before = self.item_data(self.item)
+        self.item.count = 3
+        self.item.save()
+
+        self.assertEqual(
+            self.tracker.changes(Item),
+            (
+                {self.item.pk: before},
+                {self.item.pk: self.item_data(self.item, count=3)},
+            ),
+        )
+        self.assertEqual(self.tracker.tables, {})
+
+    def test_create_and_delete(self) -> None:
+        """Added rows have no data before, and deleted ones none after."""
+        before = self.item_data(self.item)
+        added = Item.objects.create(name="added")
+        self.item.delete()
+
+        self.assertEqual(
+            self.tracker.changes(Item),
+            ({before["id"]: before}, {added.pk: self.item_data(added)}),
+        )
+        self.assertEqual(self.tracker.tables, {})
+
+    def test_m2m_changed(self) -> None:
+        """Rows whose many-to-many field changes are captured before it does."""
+        before = self.item_data(self.item)
+        self.item.tags.add(self.tag)
+
+        self.assertEqual(
+            self.tracker.changes(Item),
+            (
+                {self.item.pk: before},
+                {self.item.pk: self.item_data(self.item, tags=[self.tag])},
+            ),
+        )
+        self.assertEqual(self.tracker.tables, {})
+
+    def test_queryset_update(self) -> None:
+        """Writes without signals capture the whole table first."""
+        table = {item.pk: self.item_data(item) for item in Item.objects.all()}
+        Item.objects.filter(pk=self.item.pk).update(count=5)
+
+        self.assertEqual(list(self.tracker.tables), [Item])
+        before, after = self.tracker.changes(Item)
+        self.assertEqual(before, table)
+        self.assertEqual(after[self.item.pk], self.item_data(self.item, count=5))
+
+    def test_raw_sql(self) -> None:
+        """Raw SQL writes capture the whole table first."""
+        table = {item.pk: self.item_data(item) for item in Item.objects.all()}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE "testapp_item" SET "count" = 7 WHERE "id" = %s',
+                [self.item.pk],
+            )
+            cursor.execute("DELETE FROM testapp_item WHERE name = 'other'")
+
+        before, after = self.tracker.changes(Item)
+        self.assertEqual(before, table)
+        self.assertEqual(after[self.item.pk], self.item_data(self.item, count=7))
+        self.assertEqual(list(after), [pk for pk in table if pk != self.other.pk])
+
+    def test_qualified_table_names(self) -> None:
+        """Writes to tables qualified by their schema, or quoted, are spotted."""
+        self.assertEqual(table_name('"public"."testapp_item"'), "testapp_item")
+        self.assertEqual(table_name("main . `testapp_item`"), "testapp_item")
+        self.assertEqual(table_name("[testapp_item]"), "testapp_item")
+        self.assertEqual(table_name('"quoted""item"'), 'quoted"item')
+
+        table = {item.pk: self.item_data(item) for item in Item.objects.all()}
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE "main"."testapp_item" SET "count" = 8')
+
+        self.assertEqual(list(self.tracker.tables), [Item])
+        before, after = self.tracker.changes(Item)
+        self.assertEqual(before, table)
+        self.assertEqual(after[self.item.pk], self.item_data(self.item, count=8))
+
+    def test_unparsed_write(self) -> None:
+        """Writes whose table isn't parsed, like the ones with a CTE, capture all."""
+        tracker = ChangeTracker([Item, Tag])
+        tracker.start()
+        self.addCleanup(tracker.stop)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH counted AS (SELECT id FROM testapp_item WHERE count > 1) "
+                "UPDATE testapp_item SET count = 0 WHERE id IN counted",
+            )
+
+        self.assertEqual(set(tracker.tables), {Item, Tag})
+        before, after = tracker.changes(Item)
+        self.assertEqual(before[self.item.pk], self.item_data(self.item))
+        self.assertEqual(after[self.item.pk], self.item_data(self.item, count=0))
+
+    def test_cte_read(self) -> None:
+        """Reads with a CTE capture nothing."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH counted AS (SELECT id FROM testapp_item) SELECT * FROM counted",
+            )
+
+        self.assertEqual(self.tracker.tables, {})
+
+    def test_signals_then_raw_sql(self) -> None:
+        """Rows saved before the table is captured keep their older data."""
+        before = self.item_data(self.item)
+        self.item.count = 3
+        self.item.save()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE testapp_item SET count = count + 1")
+
+        before_data, after = self.tracker.changes(Item)
+        self.assertEqual(before_data[self.item.pk], before)
+        self.assertEqual(after[self.item.pk], self.item_data(self.item, count=4))
+
+    def test_failed_save_then_raw_sql(self) -> None:
+        """A save that raises doesn't explain the raw writes that follow."""
+        table = {item.pk: self.item_data(item) for item in Item.objects.all()}
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Item(pk=self.item.pk, name="duplicate").save(force_insert=True)
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE testapp_item SET count = 9")
+
+        self.assertEqual(list(self.tracker.tables), [Item])
+        before, after = self.tracker.changes(Item)
+        self.assertEqual(before, table)
+        self.assertEqual(after[self.other.pk], self.item_data(self.other, count=9))
+
+    def test_untracked_tables(self) -> None:
+        """Writes to the tables of other models aren't captured."""
+        Tag.objects.filter(pk=self.tag.pk).update(name="renamed")
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE testapp_tag SET name = 'raw'")
+
+        self.assertEqual(self.tracker.tables, {})
+        self.assertEqual(self.tracker.changes(Item), ({}, {}))
+
+    def test_stopped(self) -> None:
+        """Nothing is captured once the tracker is stopped."""
+        self.tracker.stop()
+        self.item.save()
+        Item.objects.update(count=0)
+
+        self.assertEqual(self.tracker.before[Item], {})
+        self.assertEqual(self.tracker.tables, {})
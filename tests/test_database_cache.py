@@ -0,0 +1,119 @@
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from django.db import connections
+from django.db.backends.base.creation import BaseDatabaseCreation
+from django.test import override_settings
+
+from drf_snap_testing.database_cache import SQLiteCachedDatabase, cached_test_databases
+
+from .testapp.models import Item
+
+MIGRATIONS = Path(__file__).parent / "testapp" / "migrations"
+
+
+class Calls:
+    """Count the calls of a method, and still make them."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch, cls: type, name: str) -> None:
+        """Wrap the method of the class."""
+        self.count = 0
+        method = getattr(cls, name)
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            self.count += 1
+            return method(*args, **kwargs)
+
+        monkeypatch.setattr(cls, name, wrapper)
+
+
+@pytest.fixture(name="cache_directory")
+def fixture_cache_directory(tmp_path: Path) -> Iterator[Path]:
+    """Cache the migrated test databases in the directory of the test."""
+    directory = tmp_path / "cache"
+    with override_settings(
+        DRF_SNAP_TESTING={"TEST_DATABASE_CACHE_PATH": str(directory)},
+    ):
+        yield directory
+
+
+@pytest.fixture(name="migrations")
+def fixture_migrations(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[Path]:
+    """Migrate the test app with a copy of its migrations, that can be changed."""
+    shutil.copytree(MIGRATIONS, tmp_path / "copied_migrations")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    with override_settings(MIGRATION_MODULES={"testapp": "copied_migrations"}):
+        yield tmp_path / "copied_migrations"
+    for name in [name for name in sys.modules if name.startswith("copied_migrations")]:
+        del sys.modules[name]
+
+
+def create_cached_database() -> None:
+    """Create the test database of the cached alias, and check its data, once."""
+    connection = connections["cached"]
+    name = connection.settings_dict["NAME"]
+    with cached_test_databases():
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        assert Item.objects.using("cached").get().name == "migrated"
+        assert Item.objects.using("cached").get().tags.get().name == "migrated"
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+
+
+def test_cache_hit(cache_directory: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The database is migrated once, and copied from the cache afterwards."""
+    migrations = Calls(monkeypatch, BaseDatabaseCreation, "create_test_db")
+    loads = Calls(monkeypatch, SQLiteCachedDatabase, "load")
+
+    create_cached_database()
+    assert (migrations.count, loads.count) == (1, 0)
+    cached = list(cache_directory.iterdir())
+    assert [path.name.split("-")[0] for path in cached] == ["cached"]
+
+    create_cached_database()
+    create_cached_database()
+    assert (migrations.count, loads.count) == (1, 2)
+    assert list(cache_directory.iterdir()) == cached
+
+
+@pytest.mark.usefixtures("cache_directory")
+def test_migration_change(
+    migrations: Path,
+    cache_directory: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A change of the migrations invalidates the cached database."""
+    migrated = Calls(monkeypatch, BaseDatabaseCreation, "create_test_db")
+
+    create_cached_database()
+    create_cached_database()
+    assert migrated.count == 1
+    cached = list(cache_directory.iterdir())
+
+    with (migrations / "0002_create_items.py").open("a") as file:
+        file.write("# Changed\n")
+    create_cached_database()
+    assert migrated.count == 2  # noqa: PLR2004
+    # The database of the older migrations is replaced
+    changed = list(cache_directory.iterdir())
+    assert len(changed) == 1
+    assert changed != cached
+
+    create_cached_database()
+    assert migrated.count == 2  # noqa: PLR2004
+
+
+def test_no_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without TEST_DATABASE_CACHE_PATH, the database is migrated every time."""
+    migrated = Calls(monkeypatch, BaseDatabaseCreation, "create_test_db")
+    create_cached_database()
+    create_cached_database()
+    assert migrated.count == 2  # noqa: PLR2004
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,145 @@
+from operator import itemgetter
+from typing import Any
+
+import pytest
+from django.db import connection, transaction
+from django.db.models import Model
+from django.test import TestCase
+
+from drf_snap_testing.bits import DatabaseDiff
+from drf_snap_testing.streaming import RowSpool, merge_rows, stream_rows
+
+from .testapp.models import Item, Tag
+
+
+def pks(data: Any) -> Any:
+    """Replace the model instances in the data by their primary keys."""
+    if isinstance(data, Model):
+        return data.pk
+    if isinstance(data, dict):
+        return {key: pks(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [pks(value) for value in data]
+    return data
+
+
+class SmallRowSpool(RowSpool):
+    """A spool that's written to disk right away."""
+
+    max_memory_size = 1
+
+
+def test_row_spool() -> None:
+    """The spooled rows are read back in order, as many times as needed."""
+    rows = [(key, {"name": f"row {key}", "tags": [key, key + 1]}) for key in range(50)]
+    spool = SmallRowSpool(iter(rows))
+
+    assert spool.file._rolled  # type: ignore [attr-defined] # noqa: SLF001
+    assert list(spool) == rows
+    assert list(spool) == rows
+    spool.close()
+
+
+def test_empty_row_spool() -> None:
+    """An empty stream is spooled as such."""
+    spool = RowSpool(iter([]))
+    assert list(spool) == []
+    spool.close()
+
+
+def test_merge_rows() -> None:
+    """The rows are paired up by primary key, whichever stream they're missing from."""
+    old = [(1, {"a": 1}), (2, {"a": 2}), (4, {"a": 4})]
+    new = [(2, {"a": 3}), (3, {"a": 3}), (4, {"a": 4}), (5, {"a": 5})]
+    assert list(merge_rows(old, new)) == [
+        (1, {"a": 1}, None),
+        (2, {"a": 2}, {"a": 3}),
+        (3, None, {"a": 3}),
+        (4, {"a": 4}, {"a": 4}),
+        (5, None, {"a": 5}),
+    ]
+    assert list(merge_rows([], new[:1])) == [(2, None, {"a": 3})]
+    assert list(merge_rows(old[:1], [])) == [(1, {"a": 1}, None)]
+
+
+def test_merge_unsorted_rows() -> None:
+    """Streams that aren't sorted like in Python are refused."""
+    with pytest.raises(AssertionError, match="sort the same way"):
+        list(merge_rows([(2, {}), (1, {})], []))
+
+
+class StreamTests(TestCase):
+    """The streaming capture diffs the tables like the full one does."""
+
+    @classmethod
+    def setUpTestData(cls: type["StreamTests"]) -> None:
+        """Add enough rows to be read in several chunks."""
+        cls.tags = [Tag.objects.create(name=f"tag {index}") for index in range(3)]
+        cls.items = [
+            Item.objects.create(name=f"item {index}", count=index) for index in range(7)
+        ]
+        cls.items[0].tags.set(cls.tags[:2])
+        cls.items[3].tags.set(cls.tags[1:])
+
+    def change(self) -> None:
+        """Add, alter and remove some rows, with and without signals."""
+        items = list(Item.objects.filter(pk__in=[item.pk for item in self.items]))
+        Item.objects.create(name="added", count=10).tags.add(self.tags[0])
+        items[1].name = "renamed"
+        items[1].save()
+        items[2].delete()
+        items[3].tags.remove(self.tags[1])
+        items[4].tags.add(self.tags[2])
+        Item.objects.filter(pk=items[5].pk).update(count=50)
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM testapp_item WHERE id = %s", [items[6].pk])
+
+    def diff(self, capture: str, chunk_size: int = 2000) -> Any:
+        """Return the differences captured that way, rolling the changes back."""
+        bit = DatabaseDiff(models=[Item, Tag], capture=capture, chunk_size=chunk_size)
+        with transaction.atomic():
+            with bit:
+                self.change()
+            transaction.set_rollback(rollback=True)
+        # The rows are listed in the order they were captured in
+        return [
+            {
+                **model_diff,
+                "added": sorted(model_diff["added"], key=itemgetter("id")),
+                "removed": sorted(model_diff["removed"], key=itemgetter("id")),
+            }
+            for model_diff in pks(bit.data)
+        ]
+
+    def test_stream_rows(self) -> None:
+        """The rows are streamed by primary key, with the data of model_to_dict."""
+        rows = list(stream_rows(Item, 2))
+        assert [key for key, _ in rows] == sorted(
+            Item.objects.values_list("pk", flat=True),
+        )
+        assert dict(rows)[self.items[0].pk] == {
+            "id": self.items[0].pk,
+            "name": "item 0",
+            "count": 0,
+            "tags": [tag.pk for tag in self.tags[:2]],
+        }
+
+    def test_stream_matches_full(self) -> None:
+        """Streaming in small chunks finds the same differences as the full capture."""
+        full = self.diff("full")
+        stream = self.diff("stream", chunk_size=2)
+
+        assert stream == full
+        item_diff = full[0]
+        assert [item["name"] for item in item_diff["added"]] == ["added"]
+        assert [item["name"] for item in item_diff["removed"]] == [
+            "item 2",
+            "item 6",
+        ]
+        assert set(item_diff["altered"]) == {
+            self.items[index].pk for index in (1, 3, 4, 5)
+        }
+
+    def test_signals_match_full(self) -> None:
+        """Tracking the changes finds the same differences as the full capture."""
+        assert self.diff("signals") == self.diff("full")
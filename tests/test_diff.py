@@ -0,0 +1,90 @@
+import json
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from django.test import override_settings
+
+from drf_snap_testing.diff import diff_renders
+from drf_snap_testing.testcase import SnapTestCase
+
+
+def render(data: Any) -> bytes:
+    """Render the data as JSON."""
+    return json.dumps(data).encode()
+
+
+def test_diff_renders() -> None:
+    """The differences are listed by path, including within JSON strings."""
+    old = b"""
+status: 200
+body: '{"results": [{"price": 1}, {"price": 2}], "name": "a"}'
+text: "first\\nsecond"
+"""
+    new = b"""
+status: 201
+body: '{"results": [{"price": 1}, {"price": 3}, {"price": 4}]}'
+text: "first\\nthird"
+headers: {}
+"""
+    assert diff_renders(old, new, 50) == [
+        "status: 200 -> 201",
+        "body.results[1].price: 2 -> 3",
+        "body.results[2]: added {'price': 4}",
+        "body.name: removed 'a'",
+        "text, line 2: 'second' -> 'third'",
+        "headers: added {}",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        # The same data, rendered differently
+        (b'{"a": [1, 2]}', b"a:\n- 1\n- 2\n"),
+        (b"a: 1\n", b"a: [\n"),
+    ],
+)
+def test_no_differences(old: bytes, new: bytes) -> None:
+    """Renders that aren't parsed, or have the same data, have no diff."""
+    assert diff_renders(old, new, 50) is None
+
+
+def test_limit() -> None:
+    """Only the first differences of large renders are listed, and it says so."""
+    old = render({"results": [{"price": price} for price in range(10_000)]})
+    new = render({"results": [{"price": price + 1} for price in range(10_000)]})
+    assert diff_renders(old, new, 3) == [
+        "results[0].price: 0 -> 1",
+        "results[1].price: 1 -> 2",
+        "results[2].price: 2 -> 3",
+        "... and more differences, past the first 3",
+    ]
+    # Up to the limit, they're all listed
+    old = render({"results": [{"price": price} for price in range(3)]})
+    new = render({"results": [{"price": price + 1} for price in range(3)]})
+    assert diff_renders(old, new, 3) == [
+        "results[0].price: 0 -> 1",
+        "results[1].price: 1 -> 2",
+        "results[2].price: 2 -> 3",
+    ]
+
+
+@override_settings(DRF_SNAP_TESTING={"SNAPSHOT_DIFF_LIMIT": 2})
+def test_snapshot_diff_limit() -> None:
+    """Mismatching snapshots are described by their first SNAPSHOT_DIFF_LIMIT paths."""
+    bit: Any = SimpleNamespace(
+        path=Path("snapshots") / "response.yaml",
+        previous_render=render(list(range(1000))),
+        render=render([-number for number in range(1000)]),
+    )
+    with pytest.raises(AssertionError) as info:
+        SnapTestCase.assertRenderEquals(unittest.TestCase(), bit)
+    assert str(info.value) == (
+        f"The snapshot {bit.path} doesn't match (snapshot -> render):\n"
+        "[1]: 1 -> -1\n"
+        "[2]: 2 -> -2\n"
+        "... and more differences, past the first 2"
+    )
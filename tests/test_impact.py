@@ -0,0 +1,97 @@
+# ruff: noqa: D101,D106
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from rest_framework import pagination, permissions, serializers, viewsets
+
+from drf_snap_testing.impact import (
+    SKIP_UNCHANGED_VARIABLE,
+    check_skip_unchanged,
+    view_objects,
+)
+
+from .testapp.models import Item, Tag
+
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ["id", "name"]
+
+
+class NameField(serializers.CharField):
+    pass
+
+
+class NestedItemSerializer(serializers.ModelSerializer):
+    name = NameField()
+    tags = TagSerializer(many=True)
+
+    class Meta:
+        model = Item
+        fields = ["id", "name", "tags"]
+
+
+class IsOwner(permissions.BasePermission):
+    pass
+
+
+class IsStaff(permissions.BasePermission):
+    pass
+
+
+class Pagination(pagination.PageNumberPagination):
+    pass
+
+
+class NestedItemViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Item.objects.all()
+    serializer_class = NestedItemSerializer
+    permission_classes = [IsOwner | ~IsStaff]
+    pagination_class = Pagination
+
+
+def test_view_objects() -> None:
+    """What the view uses is part of its fingerprint, down to the nested serializers."""
+    objs = view_objects(NestedItemViewSet)
+    for obj in (
+        NestedItemViewSet,
+        NestedItemSerializer,
+        TagSerializer,
+        NameField,
+        IsOwner,
+        IsStaff,
+        Pagination,
+        Item,
+        Tag,
+    ):
+        assert obj in objs
+
+
+def test_view_objects_related_models() -> None:
+    """The models the model of the view relates to are part of it, but not reversed."""
+
+    class ItemViewSet(viewsets.ReadOnlyModelViewSet):
+        queryset = Item.objects.all()
+
+    class TagViewSet(viewsets.ReadOnlyModelViewSet):
+        queryset = Tag.objects.all()
+
+    assert Tag in view_objects(ItemViewSet)
+    assert Item not in view_objects(TagViewSet)
+
+
+@override_settings(DRF_SNAP_TESTING={"TEST_FINGERPRINTS_PATH": None})
+def test_skip_unchanged_without_fingerprints(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Skipping the unchanged tests without their fingerprints is an error."""
+    monkeypatch.delenv(SKIP_UNCHANGED_VARIABLE, raising=False)
+    check_skip_unchanged()
+
+    monkeypatch.setenv(SKIP_UNCHANGED_VARIABLE, "1")
+    with pytest.raises(ImproperlyConfigured, match="TEST_FINGERPRINTS_PATH"):
+        check_skip_unchanged()
+    with override_settings(
+        DRF_SNAP_TESTING={"TEST_FINGERPRINTS_PATH": "fingerprints.json"},
+    ):
+        check_skip_unchanged()
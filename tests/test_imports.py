@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+MODULES = [
+    "drf_snap_testing.bits",
+    "drf_snap_testing.pytest_plugin",
+    "drf_snap_testing.runner",
+    "drf_snap_testing.testcase",
+]
+
+
+def test_import_before_setup() -> None:
+    """The modules can be imported before the apps are ready, like by conftest.py."""
+    code = "from django.conf import settings\nsettings.configure()\n" + "".join(
+        f"import {module}\n" for module in MODULES
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
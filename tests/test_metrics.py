@@ -0,0 +1,99 @@
+import pytest
+from django.test import override_settings
+
+from drf_snap_testing.bits import Queries
+from drf_snap_testing.metrics import (
+    QueryBudget,
+    QueryMetrics,
+    exceeded_query_budget,
+    query_metrics,
+    resolve_query_budget,
+)
+from drf_snap_testing.testcase import SnapGenericHelper
+
+METRICS: QueryMetrics = {"count": 4, "time": 0.3, "max_query_time": 0.15}
+
+
+def test_query_metrics() -> None:
+    """The queries are counted, and their times summed up and compared."""
+    queries = [{"time": "0.100"}, {"time": "0.050"}, {"time": "0.150"}]
+    assert query_metrics(queries) == {"count": 3, "time": 0.3, "max_query_time": 0.15}
+    assert query_metrics([]) == {"count": 0, "time": 0, "max_query_time": 0}
+
+
+def test_resolve_query_budget() -> None:
+    """A plain budget is the default database's, or they're keyed by alias."""
+    assert resolve_query_budget({"count": 3}) == {"default": {"count": 3}}
+    assert resolve_query_budget({}) == {"default": {}}
+    budget: dict[str, QueryBudget] = {"default": {"time": 1.0}, "cached": {}}
+    assert resolve_query_budget(budget) == budget
+
+
+@pytest.mark.parametrize(
+    ("budget", "message"),
+    [
+        ({"other": {"count": 3}}, "there's no other database"),
+        ({"default": {"queries": 3}}, "it must be a dict of some of count,"),
+        ({"default": 3}, "it must be a dict of some of count,"),
+    ],
+)
+def test_invalid_query_budget(budget: dict[str, QueryBudget], message: str) -> None:
+    """Budgets of unknown databases, or with unknown limits, are refused."""
+    with pytest.raises(ValueError, match=message):
+        resolve_query_budget(budget)
+
+
+def test_query_budget_attribute() -> None:
+    """The query_budget test attribute replaces the budget of the Queries bit."""
+    bit = Queries(budget={"count": 1})
+    SnapGenericHelper.set_query_budget({"queries": bit}, {})
+    assert bit.budget == {"count": 1}
+
+    SnapGenericHelper.set_query_budget({"queries": bit}, {"query_budget": {"time": 2}})
+    assert bit.budget == {"time": 2}
+
+    with pytest.raises(AssertionError, match="requires the Queries bit"):
+        SnapGenericHelper.set_query_budget({}, {"query_budget": {"time": 2}})
+
+
+@override_settings(
+    DRF_SNAP_TESTING={"QUERY_COUNT_TOLERANCE": 0, "QUERY_TIME_TOLERANCE": 0},
+)
+def test_within_budget() -> None:
+    """Metrics up to each limit pass, and so do the limits that aren't set."""
+    assert exceeded_query_budget(METRICS, {}) == []
+    assert exceeded_query_budget(METRICS, {"count": 4}) == []
+    assert exceeded_query_budget(METRICS, {"time": 0.3, "max_query_time": 0.15}) == []
+
+
+@override_settings(
+    DRF_SNAP_TESTING={"QUERY_COUNT_TOLERANCE": 0, "QUERY_TIME_TOLERANCE": 0},
+)
+def test_over_budget() -> None:
+    """Each limit the metrics are over is described."""
+    assert exceeded_query_budget(
+        METRICS,
+        {"count": 3, "time": 0.3, "max_query_time": 0.1},
+    ) == [
+        "count is 4, over the budget of 3",
+        "max_query_time is 0.15, over the budget of 0.1",
+    ]
+
+
+@override_settings(DRF_SNAP_TESTING={"QUERY_COUNT_TOLERANCE": 2})
+def test_count_tolerance() -> None:
+    """The count may exceed its limit by up to QUERY_COUNT_TOLERANCE queries."""
+    assert exceeded_query_budget(METRICS, {"count": 2}) == []
+    assert exceeded_query_budget(METRICS, {"count": 1}) == [
+        "count is 4, over the budget of 1",
+    ]
+
+
+@override_settings(DRF_SNAP_TESTING={"QUERY_TIME_TOLERANCE": 0.5})
+def test_time_tolerance() -> None:
+    """The times may exceed their limits by up to QUERY_TIME_TOLERANCE of them."""
+    assert exceeded_query_budget(METRICS, {"time": 0.2, "max_query_time": 0.1}) == []
+    assert exceeded_query_budget(METRICS, {"time": 0.19, "max_query_time": 0.09}) == [
+        "time is 0.3, over the budget of 0.19",
+        "max_query_time is 0.15, over the budget of 0.09",
+    ]
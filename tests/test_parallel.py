@@ -0,0 +1,149 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from drf_snap_testing import parallel
+from drf_snap_testing.parallel import (
+    RUN_ID_VARIABLE,
+    SnapshotClaims,
+    atomic_write,
+    end_run,
+    file_lock,
+    get_run_id,
+    get_umask,
+    start_run,
+)
+
+
+@pytest.fixture(autouse=True, name="state_directory")
+def fixture_state_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the locks and claims of the tests apart."""
+    directory = tmp_path / "state"
+    monkeypatch.setattr(parallel, "STATE_DIRECTORY", directory)
+    return directory
+
+
+def test_atomic_write(tmp_path: Path) -> None:
+    """The file is replaced, with the permissions of the umask, and nothing else."""
+    path = tmp_path / "snapshot.yaml"
+    path.write_bytes(b"old")
+    atomic_write(path, b"new")
+
+    assert path.read_bytes() == b"new"
+    assert path.stat().st_mode & 0o777 == 0o666 & ~get_umask()
+    assert [child.name for child in tmp_path.iterdir()] == ["snapshot.yaml"]
+
+
+def test_atomic_write_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failed write leaves the file as it was, and no temporary file."""
+    path = tmp_path / "snapshot.yaml"
+    path.write_bytes(b"old")
+
+    def fail(*_args: object) -> None:
+        raise OSError
+
+    monkeypatch.setattr(Path, "replace", fail)
+    with pytest.raises(OSError):
+        atomic_write(path, b"new")
+
+    assert path.read_bytes() == b"old"
+    assert [child.name for child in tmp_path.iterdir()] == ["snapshot.yaml"]
+
+
+def test_get_umask() -> None:
+    """Reading the umask leaves it as it was."""
+    umask = get_umask()
+    assert os.umask(umask) == umask
+
+
+@pytest.mark.skipif(parallel.fcntl is None, reason="Nothing is locked without fcntl")
+def test_file_lock(tmp_path: Path) -> None:
+    """The lock is held by one holder at a time, even within a process."""
+    path = tmp_path / "bundle.snap"
+    events: list[str] = []
+    locked = threading.Event()
+
+    def hold() -> None:
+        with file_lock(path):
+            events.append("first")
+            locked.set()
+            # The other thread can't get the lock meanwhile
+            threading.Event().wait(0.2)
+            events.append("first done")
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    locked.wait()
+    with file_lock(path):
+        events.append("second")
+    thread.join()
+
+    assert events == ["first", "first done", "second"]
+    # The lock is kept apart, so the path can be replaced while it's held
+    assert not path.exists()
+
+
+def test_claims() -> None:
+    """A path is claimed by its first owner, across the processes of the run."""
+    claims = SnapshotClaims("run")
+    other_process = SnapshotClaims("run")
+    other_run = SnapshotClaims("other run")
+    path = Path("tests/MyTest/test_a/response.yaml")
+
+    assert claims.claim(path, "test_a (response)") is None
+    assert claims.claim(path, "test_a (response)") is None
+    assert claims.claim(path, "test_b (response)") == "test_a (response)"
+    assert other_process.claim(path, "test_a (response)") is None
+    assert other_process.claim(path, "test_c (response)") == "test_a (response)"
+    assert other_run.claim(path, "test_c (response)") is None
+    assert claims.claim(path.with_name("queries.yaml"), "test_b (queries)") is None
+
+    # No temporary file is left behind
+    assert sorted(path.suffix for path in claims.directory.iterdir()) == ["", ""]
+
+
+def test_run(monkeypatch: pytest.MonkeyPatch, state_directory: Path) -> None:
+    """The claims of a run are shared with its workers, and removed at its end."""
+    monkeypatch.delenv(RUN_ID_VARIABLE, raising=False)
+    monkeypatch.delenv(parallel.XDIST_RUN_ID_VARIABLE, raising=False)
+    assert get_run_id() is None
+
+    start_run()
+    run_id = get_run_id()
+    assert run_id is not None
+    assert os.environ[RUN_ID_VARIABLE] == run_id
+
+    claims = SnapshotClaims(run_id)
+    claims.claim(Path("response.yaml"), "test_a")
+    assert claims.directory.parent == state_directory / "runs"
+    assert claims.directory.exists()
+
+    end_run()
+    assert RUN_ID_VARIABLE not in os.environ
+    assert not claims.directory.exists()
+
+
+def test_private_claims() -> None:
+    """Without a run, the claims are the process' own, removed by it only."""
+    claims = SnapshotClaims(None)
+    claims.claim(Path("response.yaml"), "test_a")
+    assert claims.directory.exists()
+
+    claims.remove(os.getpid() + 1)
+    assert claims.directory.exists()
+    claims.remove(os.getpid())
+    assert not claims.directory.exists()
+
+
+def test_prune(state_directory: Path) -> None:
+    """The claims of old runs are removed by new runs."""
+    old = state_directory / "runs" / "old"
+    old.mkdir(parents=True)
+    os.utime(old, (0, 0))
+    recent = state_directory / "runs" / "recent"
+    recent.mkdir()
+
+    SnapshotClaims("new").claim(Path("response.yaml"), "test_a")
+    assert sorted(path.name for path in old.parent.iterdir()) == ["new", "recent"]
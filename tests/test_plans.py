@@ -0,0 +1,72 @@
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from drf_snap_testing.bits import Queries
+from drf_snap_testing.plans import PlanStep, explain
+
+from .testapp.models import Item
+
+
+class PlansTests(TestCase):
+    """Explain the queries on SQLite, and spot the full scans of large tables."""
+
+    @classmethod
+    def setUpTestData(cls: type["PlansTests"]) -> None:
+        """Add items besides the one of the migrations."""
+        Item.objects.bulk_create(Item(name=f"item {index}") for index in range(4))
+
+    def queries_bit(self, **kwargs: object) -> Queries:
+        """Return a queries bit with a scan of the items, and a search by id."""
+        bit = Queries(**kwargs)
+        with CaptureQueriesContext(connections["default"]) as context:
+            list(Item.objects.all())
+            Item.objects.get(pk=1)
+            Item.objects.get(pk=2)
+        bit.value = {"default": context.captured_queries}
+        return bit
+
+    def test_explain(self) -> None:
+        """The plan has the table fully scanned, if it is."""
+        # The connection itself, rather than its proxy
+        connection = connections["default"]
+        self.assertEqual(
+            explain(connection, 'SELECT "name" FROM "testapp_item"'),
+            [PlanStep(0, "SCAN testapp_item", "testapp_item")],
+        )
+        self.assertEqual(
+            explain(connection, 'SELECT "name" FROM "testapp_item" WHERE "id" = 1'),
+            [PlanStep(0, "SEARCH testapp_item USING INTEGER PRIMARY KEY (rowid=?)")],
+        )
+        # Statements that aren't explained, or that fail to be
+        self.assertIsNone(
+            explain(connection, "INSERT INTO testapp_tag VALUES (9, 'a')"),
+        )
+        self.assertIsNone(explain(connection, "SELECT * FROM missing_table"))
+
+    def test_snapshot_plans(self) -> None:
+        """Each distinct query is snapshotted with its plan, once it's explained."""
+        bit = self.queries_bit(explain=True, fingerprint=True)
+        self.assertEqual(
+            [(group["count"], group["plan"]) for group in bit.data["default"]],
+            [
+                (1, ["SCAN testapp_item"]),
+                (2, ["SEARCH testapp_item USING INTEGER PRIMARY KEY (rowid=?)"]),
+            ],
+        )
+        self.assertIn(b"- SCAN testapp_item\n", bit.render)
+
+    def test_full_scans_within_threshold(self) -> None:
+        """Tables with up to full_scan_threshold rows may be fully scanned."""
+        self.queries_bit(explain=True, full_scan_threshold=5).check()
+        self.queries_bit(explain=True).check()
+
+    def test_full_scans_over_threshold(self) -> None:
+        """Fully scanning a table with more rows than the threshold fails."""
+        bit = self.queries_bit(explain=True, full_scan_threshold=4)
+        with self.assertRaisesMessage(
+            AssertionError,
+            "Queries reading every row of tables with more than 4 rows:\n"
+            'testapp_item (5 rows): SELECT "testapp_item"."id"',
+        ):
+            bit.check()
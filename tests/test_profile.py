@@ -0,0 +1,40 @@
+# ruff: noqa: D106
+
+import json
+from pathlib import Path
+
+from django.test import override_settings
+
+from drf_snap_testing import bits
+from drf_snap_testing.bits.profile import test_profiles
+from drf_snap_testing.testcase import SnapAsyncAPITestCase
+
+from .utils import SNAP_SETTINGS, failures, run_case
+
+
+def test_async_profile(tmp_path: Path) -> None:
+    """The async tests profile both the event loop and the views' thread."""
+    path = tmp_path / "profiles.json"
+
+    class Items(SnapAsyncAPITestCase):
+        url_pattern_name = "item-list"
+        user = None
+        bits = [bits.Profile(top=10000)]
+
+        class ListItems:
+            pass
+
+    with override_settings(
+        DRF_SNAP_TESTING={**SNAP_SETTINGS, "PROFILE_PATH": str(path)},
+    ):
+        assert failures(run_case(Items)) == []
+        test_profiles.save()
+
+    (profile,) = json.loads(path.read_text()).values()
+    functions = [function["function"] for function in profile["functions"]]
+    # The view runs in the thread of sync_to_async, and the handler in the event loop
+    assert any(
+        "rest_framework/mixins.py" in function and function.endswith("(list)")
+        for function in functions
+    )
+    assert any(function.endswith("(get_response_async)") for function in functions)
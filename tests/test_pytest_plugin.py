@@ -0,0 +1,120 @@
+import json
+import os
+from typing import Iterator
+
+import pytest
+from django.test import override_settings
+
+from drf_snap_testing.benchmark import BENCHMARK_VARIABLE
+from drf_snap_testing.impact import SKIP_UNCHANGED_VARIABLE
+
+CASES = """
+class TestHeavy:
+    def test_1(self): pass
+    def test_2(self): pass
+    def test_3(self): pass
+    def test_4(self): pass
+
+
+class TestLight:
+    def test_1(self): pass
+    def test_2(self): pass
+
+
+def test_function(): pass
+"""
+
+TIMINGS = {
+    "test_cases.TestHeavy.test_1": 4.0,
+    "test_cases.TestHeavy.test_2": 4.0,
+    "test_cases.TestHeavy.test_3": 4.0,
+    "test_cases.TestHeavy.test_4": 4.0,
+    "test_cases.TestLight.test_1": 1.0,
+    "test_cases.TestLight.test_2": 1.0,
+    "test_cases.py::test_function": 3.0,
+}
+
+
+@pytest.fixture(name="cases")
+def fixture_cases(pytester: pytest.Pytester) -> Iterator[pytest.Pytester]:
+    """Write the test cases, and the timings they're scheduled by."""
+    pytester.makepyfile(test_cases=CASES)
+    path = pytester.path / "timings.json"
+    path.write_text(json.dumps(TIMINGS))
+    with override_settings(DRF_SNAP_TESTING={"TEST_TIMINGS_PATH": str(path)}):
+        yield pytester
+
+
+def collected(pytester: pytest.Pytester, *args: str) -> list[str]:
+    """Return the ids of the tests collected with the plugin, in their order."""
+    result = pytester.runpytest_inprocess(
+        "-p",
+        "drf_snap_testing.pytest_plugin",
+        "-p",
+        "no:django",
+        "-p",
+        "no:random_order",
+        "--collect-only",
+        "-q",
+        *args,
+    )
+    return [
+        line.removeprefix("test_cases.py::")
+        for line in result.outlines
+        if line.startswith("test_cases.py::")
+    ]
+
+
+def test_order(cases: pytest.Pytester) -> None:
+    """The most expensive classes are run first, keeping the order of their tests."""
+    assert collected(cases) == [
+        "TestHeavy::test_1",
+        "TestHeavy::test_2",
+        "TestHeavy::test_3",
+        "TestHeavy::test_4",
+        "test_function",
+        "TestLight::test_1",
+        "TestLight::test_2",
+    ]
+
+
+def test_shards(cases: pytest.Pytester) -> None:
+    """The shards split the tests, and the classes that cost more than one."""
+    assert collected(cases, "--snap-shard", "1/2") == [
+        "TestHeavy::test_1",
+        "TestHeavy::test_3",
+        "test_function",
+    ]
+    assert collected(cases, "--snap-shard", "2/2") == [
+        "TestHeavy::test_2",
+        "TestHeavy::test_4",
+        "TestLight::test_1",
+        "TestLight::test_2",
+    ]
+
+
+def test_skip_unchanged(
+    cases: pytest.Pytester,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Skipping the unchanged tests without their fingerprints is a usage error."""
+    # Unset, and restored as it was, even if the tests set it
+    monkeypatch.setenv(SKIP_UNCHANGED_VARIABLE, "")
+    result = cases.runpytest_inprocess(
+        "-p",
+        "drf_snap_testing.pytest_plugin",
+        "-p",
+        "no:django",
+        "--snap-skip-unchanged",
+    )
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(["*TEST_FINGERPRINTS_PATH*"])
+    assert os.environ[SKIP_UNCHANGED_VARIABLE] == "1"
+
+
+def test_benchmark(cases: pytest.Pytester, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The benchmarks are set for the tests, and their workers."""
+    # Unset, and restored as it was, even if the tests set it
+    monkeypatch.setenv(BENCHMARK_VARIABLE, "")
+    assert len(collected(cases, "--snap-benchmark", "3")) == len(TIMINGS)
+    assert os.environ[BENCHMARK_VARIABLE] == "3"
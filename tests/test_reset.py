@@ -0,0 +1,52 @@
+# ruff: noqa: D106
+
+from pathlib import Path
+
+from django.test import override_settings
+
+from drf_snap_testing import bits
+from drf_snap_testing.reset import database_snapshots
+from drf_snap_testing.testcase import SnapTransactionAPITestCase
+
+from .testapp.models import Item
+from .utils import SNAP_SETTINGS, failures, run_case
+
+
+@override_settings(DRF_SNAP_TESTING=SNAP_SETTINGS)
+def test_restored_between_tests(snapshot_directory: Path) -> None:
+    """The writes of each test are undone, and the data of the migrations kept."""
+
+    class Items(SnapTransactionAPITestCase):
+        url_pattern_name = "item-list"
+        user = None
+        bits = [bits.Response, bits.DatabaseDiff(models=[Item])]
+
+        class CreateItem:
+            method = "POST"
+            data = {"name": "posted", "count": 3}
+
+        class CreateItemAgain:
+            method = "POST"
+            data = {"name": "posted", "count": 3}
+
+        class ListItems:
+            pass
+
+    # The first run writes the snapshots, as none existed
+    assert all("didn't exist" in message for message in failures(run_case(Items)))
+    assert failures(run_case(Items)) == []
+    assert "default" in database_snapshots.snapshots
+
+    # Each test starts from the same database, down to the primary keys
+    created = (snapshot_directory / "test_create_item" / "response.yaml").read_text()
+    created_again = snapshot_directory / "test_create_item_again" / "response.yaml"
+    assert created_again.read_text() == created
+    assert '"name": "posted"' in created
+
+    listed = (snapshot_directory / "test_list_items" / "response.yaml").read_text()
+    assert '"name": "migrated"' in listed
+    assert '"name": "posted"' not in listed
+
+    # Nor are the writes left for the other tests
+    assert list(Item.objects.values_list("name", flat=True)) == ["migrated"]
+    assert Item.objects.get().tags.get().name == "migrated"
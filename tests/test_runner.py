@@ -0,0 +1,79 @@
+import json
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.test.runner import ParallelTestSuite
+
+from drf_snap_testing.impact import SKIP_UNCHANGED_VARIABLE
+from drf_snap_testing.runner import SnapDiscoverRunner, iter_test_cases
+
+from .cases import TIMINGS
+
+
+@pytest.fixture(autouse=True, name="timings")
+def fixture_timings(tmp_path: Path) -> Iterator[Path]:
+    """Schedule the tests by the timings of the cases."""
+    path = tmp_path / "timings.json"
+    path.write_text(json.dumps(TIMINGS))
+    with override_settings(DRF_SNAP_TESTING={"TEST_TIMINGS_PATH": str(path)}):
+        yield path
+
+
+def scheduled_ids(suite: object) -> list[str]:
+    """Return the ids of the tests of the suite, in their order."""
+    return [test.id().removeprefix("tests.cases.") for test in iter_test_cases(suite)]
+
+
+def test_arguments(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The runner's arguments are parsed, and checked."""
+    parser = ArgumentParser()
+    SnapDiscoverRunner.add_arguments(parser)
+    arguments = parser.parse_args(["--shard", "2/3", "--benchmark", "1"])
+    assert arguments.shard == (1, 3)
+    assert arguments.benchmark == 1
+    assert arguments.skip_unchanged is False
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--shard", "4/3"])
+
+    # Unset, and restored as it was, even if the tests set it
+    monkeypatch.setenv(SKIP_UNCHANGED_VARIABLE, "")
+    with pytest.raises(ImproperlyConfigured, match="TEST_FINGERPRINTS_PATH"):
+        SnapDiscoverRunner(skip_unchanged=True)
+
+
+def test_shards() -> None:
+    """The shards split the tests, and the test cases that cost more than one."""
+    first, second = (
+        scheduled_ids(SnapDiscoverRunner(shard=(index, 2)).build_suite(["tests.cases"]))
+        for index in range(2)
+    )
+    assert first == ["Heavy.test_1", "Heavy.test_3", "Untimed.test_1"]
+    assert second == ["Heavy.test_2", "Heavy.test_4", "Light.test_1", "Light.test_2"]
+
+
+def test_parallel() -> None:
+    """The workers take the most expensive parts of the test cases first."""
+    suite = SnapDiscoverRunner(parallel=2).build_suite(["tests.cases"])
+    assert isinstance(suite, ParallelTestSuite)
+    assert [scheduled_ids(subsuite) for subsuite in suite.subsuites] == [
+        ["Heavy.test_1", "Heavy.test_3"],
+        ["Heavy.test_2", "Heavy.test_4"],
+        ["Untimed.test_1"],
+        ["Light.test_1", "Light.test_2"],
+    ]
+
+
+def test_parallel_shard() -> None:
+    """The parallel workers only run the tests of the shard."""
+    suite = SnapDiscoverRunner(parallel=2, shard=(1, 2)).build_suite(["tests.cases"])
+    assert isinstance(suite, ParallelTestSuite)
+    assert scheduled_ids(suite) == [
+        "Heavy.test_2",
+        "Heavy.test_4",
+        "Light.test_1",
+        "Light.test_2",
+    ]
@@ -0,0 +1,91 @@
+import pytest
+
+from drf_snap_testing.bits import Queries
+from drf_snap_testing.sql import fingerprint, group_queries
+
+
+@pytest.mark.parametrize(
+    ("sql", "normalized"),
+    [
+        (
+            "SELECT * FROM item WHERE name = 'it''s' AND id = 12",
+            "SELECT * FROM item WHERE name = ? AND id = ?",
+        ),
+        (
+            "SELECT * FROM item WHERE count > -1.5e3 LIMIT 21",
+            "SELECT * FROM item WHERE count > -? LIMIT ?",
+        ),
+        # Numbers within identifiers, quoted or not, are kept
+        (
+            'SELECT "t1"."id", item2.count FROM "t1", item2',
+            'SELECT "t1"."id", item2.count FROM "t1", item2',
+        ),
+        # Lists of any length are collapsed, once their literals are placeholders
+        (
+            "SELECT * FROM item WHERE id IN (1, 2, 3)",
+            "SELECT * FROM item WHERE id IN (...)",
+        ),
+        (
+            "SELECT * FROM item WHERE id in (4,5) OR name IN ( 'a' )",
+            "SELECT * FROM item WHERE id IN (...) OR name IN (...)",
+        ),
+        (
+            "INSERT INTO item (name, count) VALUES ('a', 1), ('b', 2)",
+            "INSERT INTO item (name, count) VALUES (...)",
+        ),
+        (
+            "INSERT INTO item (name, count) VALUES (%s, %s)",
+            "INSERT INTO item (name, count) VALUES (...)",
+        ),
+        ("  SELECT\n  1\tFROM  item ", "SELECT ? FROM item"),
+    ],
+)
+def test_fingerprint(sql: str, normalized: str) -> None:
+    """Literals and lists of them are normalized, and so is the whitespace."""
+    assert fingerprint(sql) == normalized
+
+
+def test_group_queries() -> None:
+    """Queries that only differ in their parameters are grouped, in order."""
+    queries = [
+        {"sql": "SELECT * FROM item WHERE id = 1", "time": "0.001"},
+        {"sql": "SELECT * FROM tag", "time": "0.010"},
+        {"sql": "SELECT * FROM item WHERE id = 2", "time": "0.002"},
+        {"sql": "SELECT * FROM item WHERE id IN (1, 2)", "time": "0.003"},
+        {"sql": "SELECT * FROM item WHERE id IN (3)", "time": "0.004"},
+    ]
+    assert group_queries(queries) == [
+        {"sql": "SELECT * FROM item WHERE id = ?", "count": 2, "time": 0.003},
+        {"sql": "SELECT * FROM tag", "count": 1, "time": 0.01},
+        {"sql": "SELECT * FROM item WHERE id IN (...)", "count": 2, "time": 0.007},
+    ]
+
+
+def repeated_queries(max_repeats: int | None) -> Queries:
+    """Return a queries bit with a query run three times, by different ids."""
+    bit = Queries(max_repeats=max_repeats)
+    bit.value = {
+        "default": [
+            {"sql": "SELECT * FROM item WHERE id = 1", "time": "0.001"},
+            {"sql": "SELECT * FROM item WHERE id = 2", "time": "0.001"},
+            {"sql": "SELECT * FROM item WHERE id = 3", "time": "0.001"},
+        ],
+        "other": [{"sql": "SELECT * FROM tag", "time": "0.001"}],
+    }
+    return bit
+
+
+@pytest.mark.parametrize("max_repeats", [None, 3, 4])
+def test_repeats_allowed(max_repeats: int | None) -> None:
+    """Queries repeated up to max_repeats times, or without it, pass."""
+    repeated_queries(max_repeats).check_repeats()
+
+
+def test_repeats_exceeded() -> None:
+    """Queries repeated more than max_repeats times fail, with their fingerprint."""
+    with pytest.raises(AssertionError) as info:
+        repeated_queries(2).check_repeats()
+    assert str(info.value) == (
+        "Queries repeated more than 2 times, which is usually an N+1 problem:\n"
+        "3 x SELECT * FROM item WHERE id = ?"
+    )
@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+import pytest
+import sqlparse
+from django.test import override_settings
+
+from drf_snap_testing.sql_cache import SQLFormatCache
+
+QUERIES = [
+    "select id from item where count = 0",
+    "select id from item where count = 1",
+    "select id from item where count = 2",
+]
+FORMATTED = "SELECT id\nFROM item\nWHERE COUNT = 0"
+
+
+@pytest.fixture(name="cache")
+def fixture_cache(monkeypatch: pytest.MonkeyPatch) -> SQLFormatCache:
+    """Return a new cache, which isn't saved when the tests exit."""
+    monkeypatch.setattr("drf_snap_testing.sql_cache.at_exit", lambda _func: None)
+    return SQLFormatCache()
+
+
+@override_settings(DRF_SNAP_TESTING={"SQL_FORMAT_CACHE_SIZE": 2})
+def test_lru_eviction(cache: SQLFormatCache) -> None:
+    """The least recently used statements are evicted, and counted as misses."""
+    assert cache.get(QUERIES[0]) == FORMATTED
+    cache.get(QUERIES[1])
+    cache.get(QUERIES[0])
+    cache.get(QUERIES[2])
+    assert list(cache.entries) == [QUERIES[0], QUERIES[2]]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    cache.get(QUERIES[1])
+    cache.get(QUERIES[2])
+    assert list(cache.entries) == [QUERIES[1], QUERIES[2]]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    cache.clear()
+    assert (cache.entries, cache.hits, cache.misses) == ({}, 0, 0)
+
+
+@override_settings(DRF_SNAP_TESTING={"SQL_FORMAT_CACHE_SIZE": 0})
+def test_disabled(cache: SQLFormatCache) -> None:
+    """With a size of 0, every statement is formatted again."""
+    cache.get(QUERIES[0])
+    cache.get(QUERIES[0])
+    assert (cache.entries, cache.hits, cache.misses) == ({}, 0, 2)
+
+
+def test_persistence(cache: SQLFormatCache, tmp_path: Path) -> None:
+    """The cache is saved to its path, and loaded back by the next run."""
+    path = tmp_path / "cache" / "sql.json"
+    with override_settings(DRF_SNAP_TESTING={"SQL_FORMAT_CACHE_PATH": str(path)}):
+        formatted = [cache.get(sql) for sql in QUERIES[:2]]
+        cache.save()
+        assert json.loads(path.read_bytes())["sqlparse"] == sqlparse.__version__
+
+        loaded = SQLFormatCache()
+        assert [loaded.get(sql) for sql in QUERIES[:2]] == formatted
+        assert (loaded.hits, loaded.misses) == (2, 0)
+
+        # Unchanged caches aren't saved again
+        path.unlink()
+        loaded.save()
+        assert not path.exists()
+
+
+def test_sqlparse_version_change(cache: SQLFormatCache, tmp_path: Path) -> None:
+    """A cache saved by another version of sqlparse is discarded."""
+    path = tmp_path / "sql.json"
+    path.write_text(
+        json.dumps({"sqlparse": "0.0.1", "entries": [[QUERIES[0], "stale"]]}),
+    )
+    with override_settings(DRF_SNAP_TESTING={"SQL_FORMAT_CACHE_PATH": str(path)}):
+        assert cache.get(QUERIES[0]) == FORMATTED
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        cache.save()
+        data = json.loads(path.read_bytes())
+        assert data["sqlparse"] == sqlparse.__version__
+        assert data["entries"] == [[QUERIES[0], FORMATTED]]
@@ -0,0 +1,216 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from django.test import override_settings
+
+from drf_snap_testing import storage as storage_module
+from drf_snap_testing.storage import (
+    Bundle,
+    BundleStorage,
+    FileStorage,
+    ModuleBundleStorage,
+    flush_bundles,
+)
+
+DIGESTS = {"SNAPSHOT_DIGESTS": True}
+
+
+@pytest.fixture(autouse=True)
+def _flush_bundles() -> Iterator[None]:
+    """Flush the writes left pending by the test, in its own directory."""
+    yield
+    flush_bundles()
+
+
+def test_bundle_round_trip(tmp_path: Path) -> None:
+    """The snapshots written to a bundle are read back as they were."""
+    storage = BundleStorage()
+    snapshots = {
+        tmp_path / "tests" / "MyTest" / "test_a" / "response.yaml": b"a: 1\n",
+        tmp_path / "tests" / "MyTest" / "test_b" / "response.yaml": b"b: 2",
+        tmp_path / "tests" / "MyTest" / "test_b" / "queries.yaml": b"",
+        tmp_path / "tests" / "Other" / "test_c" / "response.yaml": b"c\n\n",
+    }
+    for path, content in snapshots.items():
+        storage.write(path, content, "digest")
+    storage.flush()
+
+    assert sorted(path.name for path in tmp_path.joinpath("tests").iterdir()) == [
+        "MyTest.snap",
+        "Other.snap",
+    ]
+    for path, content in snapshots.items():
+        assert storage.read(path) == content
+        # Read from a fresh storage as well, from the files alone
+        assert BundleStorage().read(path) == content
+    assert storage.read(tmp_path / "tests" / "MyTest" / "test_d" / "x.yaml") is None
+
+    bundle = Bundle(tmp_path / "tests" / "MyTest.snap")
+    assert sorted(bundle.index) == [
+        "test_a/response.yaml",
+        "test_b/queries.yaml",
+        "test_b/response.yaml",
+    ]
+    bundle.close()
+
+
+def test_module_bundle(tmp_path: Path) -> None:
+    """The snapshots of every test class of a module share a bundle."""
+    storage = ModuleBundleStorage()
+    storage.write(tmp_path / "tests" / "A" / "test_a" / "r.yaml", b"a", "digest")
+    storage.write(tmp_path / "tests" / "B" / "test_b" / "r.yaml", b"b", "digest")
+    storage.flush()
+
+    assert [path.name for path in tmp_path.iterdir()] == ["tests.snap"]
+    assert storage.read(tmp_path / "tests" / "A" / "test_a" / "r.yaml") == b"a"
+    assert storage.read(tmp_path / "tests" / "B" / "test_b" / "r.yaml") == b"b"
+
+
+def test_missing_bundle(tmp_path: Path) -> None:
+    """There's no snapshot in a bundle that doesn't exist."""
+    storage = BundleStorage()
+    assert storage.read(tmp_path / "tests" / "MyTest" / "test_a" / "r.yaml") is None
+    assert not tmp_path.joinpath("tests").exists()
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    """Only the bundles used last are kept open."""
+    storage = BundleStorage()
+    storage.max_open_bundles = 2
+    paths = [tmp_path / f"Test{index}" / "test_a" / "r.yaml" for index in range(3)]
+    for index, path in enumerate(paths):
+        storage.write(path, str(index).encode(), "digest")
+    storage.flush()
+
+    first, second, third = (storage.locate(path)[0] for path in paths)
+    storage.read(paths[0])
+    storage.read(paths[1])
+    first_bundle = storage.bundles[first]
+    # Using the first bundle again makes the second the least recently used
+    storage.read(paths[0])
+    storage.read(paths[2])
+
+    assert list(storage.bundles) == [first, third]
+    assert storage.bundles[first] is first_bundle
+    assert second not in storage.bundles
+
+    # The evicted bundle is unmapped, and opened again when needed
+    assert storage.read(paths[1]) == b"1"
+    assert list(storage.bundles) == [third, second]
+
+
+def test_write_keeps_other_snapshots(tmp_path: Path) -> None:
+    """Rewriting a snapshot keeps the others of the bundle, even if open."""
+    storage = BundleStorage()
+    path_a = tmp_path / "MyTest" / "test_a" / "r.yaml"
+    path_b = tmp_path / "MyTest" / "test_b" / "r.yaml"
+    storage.write(path_a, b"a", "digest")
+    storage.write(path_b, b"b", "digest")
+    storage.write(path_a, b"changed", "digest")
+
+    assert storage.read(path_a) == b"changed"
+    assert storage.read(path_b) == b"b"
+
+
+def test_buffered_writes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The snapshots are written to their bundle at once, when it's flushed."""
+    written: list[str] = []
+    monkeypatch.setattr(
+        storage_module,
+        "atomic_write",
+        lambda path, content: written.append(path.name) or path.write_bytes(content),
+    )
+    storage = BundleStorage()
+    storage.max_open_bundles = 2
+    paths = [tmp_path / "MyTest" / f"test_{index}" / "r.yaml" for index in range(10)]
+    for path in paths:
+        storage.write(path, path.parent.name.encode(), "digest")
+    assert written == []
+    # Pending writes are read back, by any storage
+    assert BundleStorage().read(paths[3]) == b"test_3"
+
+    # Too many bundles with pending writes flush the oldest
+    storage.write(tmp_path / "Other" / "test_a" / "r.yaml", b"other", "digest")
+    storage.write(tmp_path / "Last" / "test_a" / "r.yaml", b"last", "digest")
+    assert written == ["MyTest.snap"]
+
+    flush_bundles()
+    assert written == ["MyTest.snap", "Other.snap", "Last.snap"]
+    assert [BundleStorage().read(path) for path in paths[:2]] == [b"test_0", b"test_1"]
+
+    # As are the bundles that are closed to open others
+    storage.read(paths[0])
+    storage.write(paths[0], b"again", "digest")
+    storage.read(tmp_path / "Third" / "test_a" / "r.yaml")
+    assert len(written) == len(["MyTest", "Other", "Last"])
+    storage.read(tmp_path / "Fourth" / "test_a" / "r.yaml")
+    assert written[-1] == "MyTest.snap"
+    assert BundleStorage().read(paths[0]) == b"again"
+
+
+@override_settings(DRF_SNAP_TESTING=DIGESTS)
+def test_digests(tmp_path: Path) -> None:
+    """The digests are kept in the bundle, and updated when outdated."""
+    storage = BundleStorage()
+    path = tmp_path / "MyTest" / "test_a" / "r.yaml"
+    assert storage.get_digest(path) is None
+
+    storage.write(path, b"a", "first")
+    assert storage.get_digest(path) == "first"
+    storage.set_digest(path, "second")
+    assert storage.get_digest(path) == "second"
+    assert BundleStorage().get_digest(path) == "second"
+    assert storage.read(path) == b"a"
+
+
+@override_settings(DRF_SNAP_TESTING=DIGESTS)
+def test_digests_of_edited_snapshots(tmp_path: Path) -> None:
+    """The digests of the snapshots edited by hand aren't trusted."""
+    storage = BundleStorage()
+    path = tmp_path / "MyTest" / "test_a" / "r.yaml"
+    storage.write(path, b"before", "digest")
+    storage.flush()
+    bundle_path = storage.locate(path)[0]
+    bundle_path.write_bytes(bundle_path.read_bytes().replace(b"before", b"edited"))
+
+    assert storage.read(path) == b"edited"
+    assert storage.get_digest(path) is None
+    storage.set_digest(path, "digest")
+    assert storage.get_digest(path) == "digest"
+    assert storage.read(path) == b"edited"
+
+
+def test_file_digests(tmp_path: Path) -> None:
+    """The digests of the files are kept out of the snapshot tree."""
+    snapshots = tmp_path / "snapshots"
+    digests = tmp_path / "digests"
+    path = snapshots / "MyTest" / "test_a" / "r.yaml"
+    with override_settings(
+        DRF_SNAP_TESTING={**DIGESTS, "SNAPSHOT_DIGESTS_PATH": str(digests)},
+    ):
+        storage = FileStorage()
+        storage.prepare(path.parent)
+        storage.write(path, b"a", "first")
+        other = path.with_name("q.yaml")
+        storage.write(other, b"b", "other")
+
+        assert storage.get_digest(path) == "first"
+        assert FileStorage().get_digest(other) == "other"
+        assert sorted(child.name for child in path.parent.iterdir()) == [
+            "q.yaml",
+            "r.yaml",
+        ]
+        assert len(list(digests.iterdir())) == 1
+
+        # Edited by hand
+        path.write_bytes(b"edited")
+        assert FileStorage().get_digest(path) is None
+
+
+def test_digests_disabled(tmp_path: Path) -> None:
+    """Without SNAPSHOT_DIGESTS, no digest is ever known."""
+    storage = BundleStorage()
+    path = tmp_path / "MyTest" / "test_a" / "r.yaml"
+    storage.write(path, b"a", "digest")
+    assert storage.get_digest(path) is None
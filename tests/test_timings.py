@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+import pytest
+from django.test import override_settings
+
+from drf_snap_testing.timings import (
+    lpt_schedule,
+    parse_shard,
+    split_schedule,
+    test_timings,
+)
+
+
+def test_parse_shard() -> None:
+    """The shards are given 1-based, and kept 0-based."""
+    assert parse_shard("1/4") == (0, 4)
+    assert parse_shard("4/4") == (3, 4)
+    for value in ("0/4", "5/4", "1/0", "1", "a/b"):
+        with pytest.raises(ValueError, match="Invalid shard|invalid literal"):
+            parse_shard(value)
+
+
+def test_lpt_schedule() -> None:
+    """The most expensive items go first, each to the cheapest bin so far."""
+    costs = {"a": 5.0, "b": 4.0, "c": 3.0, "d": 3.0, "e": 1.0}
+    assert lpt_schedule(costs, 2) == [["a", "d"], ["b", "c", "e"]]
+    assert lpt_schedule(costs, 1) == [["a", "b", "c", "d", "e"]]
+    assert lpt_schedule(costs, 6)[5] == []
+    assert lpt_schedule(costs, 2) == lpt_schedule(dict(reversed(costs.items())), 2)
+
+
+def test_split_schedule() -> None:
+    """The groups are kept whole, unless they cost more than a bin."""
+    groups = {
+        "Heavy": ["heavy_1", "heavy_2", "heavy_3", "heavy_4"],
+        "Light": ["light_1", "light_2"],
+        "Other": ["other_1"],
+    }
+    costs = {
+        "heavy_1": 4.0,
+        "heavy_2": 4.0,
+        "heavy_3": 4.0,
+        "heavy_4": 4.0,
+        "light_1": 1.0,
+        "light_2": 1.0,
+        "other_1": 2.0,
+    }
+    schedule = split_schedule(groups, costs, 2)
+    assert schedule == [
+        {"Heavy": ["heavy_1", "heavy_3"], "Light": ["light_1", "light_2"]},
+        {"Heavy": ["heavy_2", "heavy_4"], "Other": ["other_1"]},
+    ]
+    # Classes scheduled whole couldn't do better than 16 against 4
+    totals = [
+        sum(costs[test] for tests in scheduled.values() for test in tests)
+        for scheduled in schedule
+    ]
+    assert totals == [10.0, 10.0]
+
+    # With bins enough for it, the heavy group is kept whole
+    assert split_schedule(groups, costs, 1) == [groups]
+
+
+def test_estimates(tmp_path: Path) -> None:
+    """The tests that were never timed are assumed to take the average time."""
+    path = tmp_path / "timings.json"
+    assert test_timings.estimates(["a"]) == {"a": 1.0}
+
+    path.write_text(json.dumps({"a": 1.0, "b": 3.0}))
+    with override_settings(DRF_SNAP_TESTING={"TEST_TIMINGS_PATH": str(path)}):
+        assert test_timings.estimates(["a", "c"]) == {"a": 1.0, "c": 2.0}
@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+
+
+def forward(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    alias = schema_editor.connection.alias
+    Tag = apps.get_model("testapp", "Tag")
+    Item = apps.get_model("testapp", "Item")
+    tag = Tag.objects.using(alias).create(name="migrated")
+    item = Item.objects.using(alias).create(name="migrated", count=1)
+    item.tags.add(tag)
+
+
+def reverse(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    alias = schema_editor.connection.alias
+    Item = apps.get_model("testapp", "Item")
+    Tag = apps.get_model("testapp", "Tag")
+    Item.objects.using(alias).filter(name="migrated").delete()
+    Tag.objects.using(alias).filter(name="migrated").delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("testapp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, reverse),
+    ]
@@ -0,0 +1,22 @@
+# ruff: noqa: D101,D105,D106
+
+from django.db import models
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Item(models.Model):
+    name = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    tags = models.ManyToManyField(Tag, related_name="items", blank=True)
+
+    class Meta:
+        ordering = ["pk"]
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,11 @@
+# ruff: noqa: D101,D106
+
+from rest_framework import serializers
+
+from .models import Item
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["id", "name", "count", "tags"]
@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import ItemViewSet
+
+router = DefaultRouter()
+router.register(r"items", ItemViewSet, basename="item")
+
+urlpatterns = router.urls
@@ -0,0 +1,11 @@
+from rest_framework import viewsets
+
+from .models import Item
+from .serializers import ItemSerializer
+
+
+class ItemViewSet(viewsets.ModelViewSet):
+    """List, create, update and delete the items."""
+
+    queryset = Item.objects.prefetch_related("tags")
+    serializer_class = ItemSerializer
@@ -0,0 +1,30 @@
+import unittest
+from pathlib import Path
+from typing import Any
+
+# Where the tests of the cases run by the tests keep their snapshots
+SNAPSHOT_DIRECTORY = Path()
+
+# The settings the cases are run with, for snapshot_path
+SNAP_SETTINGS = {
+    "DEFAULT_GET_SNAP_PATH": "tests.utils.snapshot_path",
+    # The tests of the same name share their snapshots, whatever their case
+    "DETECT_SNAPSHOT_COLLISIONS": False,
+}
+
+
+def snapshot_path(test: Any, **_kwargs: Any) -> Path:
+    """Return the directory of the snapshots of the test, by its name alone."""
+    return SNAPSHOT_DIRECTORY / test._testMethodName  # noqa: SLF001
+
+
+def run_case(case: type[unittest.TestCase]) -> unittest.TestResult:
+    """Run the tests of the case, returning their result."""
+    result = unittest.TestResult()
+    unittest.defaultTestLoader.loadTestsFromTestCase(case).run(result)
+    return result
+
+
+def failures(result: unittest.TestResult) -> list[str]:
+    """Return the failures and errors of the result."""
+    return [message for _, message in result.failures + result.errors]